@@ -11,6 +11,47 @@ class Repository(Protocol, Generic[T]):
     async def get(self, id: str) -> T | None: ...
     @abstractmethod
     async def save(self, obj: T) -> None: ...
+    @abstractmethod
+    async def get_many(self, ids: list[str]) -> list[T]: ...
+    @abstractmethod
+    async def save_many(self, objs: list[T]) -> None: ...
+
+
+class Outbox(Protocol):
+    """Porta para eventos a publicar após o commit da unidade de trabalho."""
+
+    @abstractmethod
+    async def add(self, event: dict) -> None: ...
+
+
+class ProcessedMessages(Protocol):
+    """Porta para marcar mensagens como processadas na transação do caso de uso."""
+
+    @abstractmethod
+    async def add(self, key: str) -> None: ...
+
+
+class UnitOfWork(Protocol):
+    """Porta para o escopo transacional de um caso de uso.
+
+    Escritas em `items` ficam pendentes até `flush()`; `commit()` faz o flush e
+    confirma a transação uma única vez. Sair do bloco sem commit desfaz tudo.
+    """
+
+    items: Repository
+    outbox: Outbox
+    processed: ProcessedMessages
+
+    @abstractmethod
+    async def __aenter__(self) -> "UnitOfWork": ...
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc, tb) -> None: ...
+    @abstractmethod
+    async def flush(self) -> None: ...
+    @abstractmethod
+    async def commit(self) -> None: ...
+    @abstractmethod
+    async def rollback(self) -> None: ...
 
 
 class MessageBus(Protocol):
@@ -24,6 +65,33 @@ class MessageBus(Protocol):
     async def ack(self, message_id: str) -> None: ...
     @abstractmethod
     async def nack(self, message_id: str) -> None: ...
+    @abstractmethod
+    async def send_delayed(self, event: dict, delay: float) -> None:
+        """Publica o evento para entrega só após `delay` segundos.
+
+        O atraso fica no broker: ao retornar, o evento já está confirmado e
+        sobrevive a uma queda do processo que o publicou. Exceção: no broker em
+        memória o atraso é um timer do próprio processo e não é durável.
+        """
+
+    async def send_many(self, events: list[dict]) -> list[dict]:
+        """Publica vários eventos; retorna os que não puderam ser publicados."""
+        for event in events:
+            await self.send(event)
+        return []
+
+    async def receive_many(self, max_messages: int = 10) -> list[dict]:
+        msg = await self.receive()
+        return [msg] if msg else []
+
+    async def ack_many(self, message_ids: list[str]) -> list[str]:
+        """Confirma várias mensagens; retorna as que não puderam ser confirmadas."""
+        for message_id in message_ids:
+            await self.ack(message_id)
+        return []
+
+    async def close(self) -> None:
+        return None
 
 
 class ExternalApiClient(Protocol):
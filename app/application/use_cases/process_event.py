@@ -1,22 +1,47 @@
 from app.application.dtos import ProcessEventInput, ProcessEventOutput
-from app.application.ports import Repository, MessageBus, ExternalApiClient
-from app.infrastructure.logging.logger import configure_logger
+from app.application.ports import UnitOfWork, MessageBus, ExternalApiClient
+from app.infrastructure.logging.logger import get_logger
 from app.application.errors import ApplicationError
 from app.domain.entities import Item, Status
-from app.config.settings import Settings
+import asyncio
+import math
 import uuid
 
-settings = Settings()
-logger = configure_logger(settings.LOG_LEVEL)
+logger = get_logger()
+
+
+def _produced_at(payload: dict) -> float | None:
+    """Carimbo enviado pelo cliente: só um número finito vira `produced_at`."""
+    value = payload.get("produced_at")
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return float(value)
+    return None
+
+
+def _event(item_id: str, produced_at: float | None = None) -> dict:
+    # event_id identifica o evento mesmo se o broker ou o relay o reentregar.
+    event = {"type": "ItemToProcess", "item_id": item_id, "event_id": uuid.uuid4().hex}
+    if produced_at is not None:
+        # Carimbo do produtor original, para o lag fim a fim medido no worker.
+        event["produced_at"] = produced_at
+    return event
 
 
 class ProcessEvent:
     """Caso de uso: processar evento recebido."""
 
-    def __init__(self, repo: Repository[Item], bus: MessageBus, api: ExternalApiClient):
-        self.repo = repo
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        bus: MessageBus,
+        api: ExternalApiClient,
+        use_outbox: bool = False,
+    ):
+        self.uow = uow
         self.bus = bus
         self.api = api
+        # Com outbox o evento é gravado na transação do item e publicado pelo relay.
+        self.use_outbox = use_outbox
 
     async def execute(self, dto: ProcessEventInput) -> ProcessEventOutput:
         try:
@@ -24,22 +49,29 @@ class ProcessEvent:
             item_id = payload.get("id") or str(uuid.uuid4())
             name = payload.get("name", "unknown")
 
-            item = Item(id=item_id, name=name, status=Status("pending"))
-            await self.repo.save(item)
+            async with self.uow:
+                item = Item(id=item_id, name=name, status=Status("pending"))
+                await self.uow.items.save(item)
 
-            logger.info("Chama API externa", item_id=item.id)
-            await self.api.post(
-                "/post", {"item_id": item.id, "status": str(item.status)}
-            )
+                logger.debug("Chama API externa", item_id=item.id)
+                await self.api.post(
+                    "/post", {"item_id": item.id, "status": str(item.status)}
+                )
 
-            logger.info("Atualiza status", item_id=item.id)
-            processed_item = Item(
-                id=item.id, name=item.name, status=Status("initialized")
-            )
-            await self.repo.save(processed_item)
+                logger.debug("Atualiza status", item_id=item.id)
+                processed_item = Item(
+                    id=item.id, name=item.name, status=Status("initialized")
+                )
+                await self.uow.items.save(processed_item)
+                event = _event(item.id, _produced_at(payload))
+                if self.use_outbox:
+                    await self.uow.outbox.add(event)
+                # Os dois saves viram um único upsert e um único commit.
+                await self.uow.commit()
 
-            logger.info("Publica evento", item_id=item.id)
-            await self.bus.send({"type": "ItemToProcess", "item_id": item.id})
+            if not self.use_outbox:
+                logger.info("Publica evento", item_id=item.id)
+                await self.bus.send(event)
 
             return ProcessEventOutput(
                 success=True, message="initialized", item_id=item.id
@@ -47,3 +79,76 @@ class ProcessEvent:
         except Exception as e:
             logger.error("Erro ao processar evento", error=str(e))
             raise ApplicationError(f"Erro ao processar evento: {e}")
+
+    async def execute_many(self, dtos: list[ProcessEventInput]) -> list[ProcessEventOutput]:
+        """Processa um lote com um upsert, um commit e uma publicação em lote.
+
+        As chamadas à API externa do lote rodam em paralelo. Registros cuja
+        chamada falha (ou cujo evento não pôde ser publicado) retornam
+        success=False sem derrubar o resto do lote.
+        """
+        stamps = [_produced_at(dto.payload) for dto in dtos]
+        items = [
+            Item(
+                id=dto.payload.get("id") or str(uuid.uuid4()),
+                name=dto.payload.get("name", "unknown"),
+                status=Status("pending"),
+            )
+            for dto in dtos
+        ]
+        results = await asyncio.gather(
+            *(
+                self.api.post("/post", {"item_id": item.id, "status": str(item.status)})
+                for item in items
+            ),
+            return_exceptions=True,
+        )
+        outputs: list[ProcessEventOutput] = []
+        processed: list[Item] = []
+        produced_at: dict[str, float | None] = {}
+        for item, result, stamp in zip(items, results, stamps):
+            if isinstance(result, Exception):
+                logger.error("Erro ao processar evento", item_id=item.id, error=str(result))
+                outputs.append(
+                    ProcessEventOutput(
+                        success=False,
+                        message=f"Erro ao processar evento: {result}",
+                        item_id=item.id,
+                    )
+                )
+            else:
+                processed.append(
+                    Item(id=item.id, name=item.name, status=Status("initialized"))
+                )
+                produced_at[item.id] = stamp
+                outputs.append(
+                    ProcessEventOutput(success=True, message="initialized", item_id=item.id)
+                )
+        if not processed:
+            return outputs
+
+        events = [_event(item.id, produced_at[item.id]) for item in processed]
+        try:
+            async with self.uow:
+                await self.uow.items.save_many(processed)
+                if self.use_outbox:
+                    for event in events:
+                        await self.uow.outbox.add(event)
+                await self.uow.commit()
+        except Exception as e:
+            logger.error("Erro ao gravar lote", size=len(processed), error=str(e))
+            raise ApplicationError(f"Erro ao processar lote: {e}")
+
+        if not self.use_outbox:
+            failed = {event["item_id"] for event in await self.bus.send_many(events)}
+            if failed:
+                logger.error("Falha ao publicar eventos", count=len(failed))
+                outputs = [
+                    ProcessEventOutput(
+                        success=False, message="Erro ao publicar evento", item_id=o.item_id
+                    )
+                    if o.success and o.item_id in failed
+                    else o
+                    for o in outputs
+                ]
+        return outputs
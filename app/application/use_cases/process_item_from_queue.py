@@ -1,21 +1,52 @@
 from app.application.dtos import ProcessEventOutput
-from app.application.ports import Repository
+from app.application.ports import UnitOfWork
 from app.domain.entities import Status
 from dataclasses import replace
 
 
 class ProcessItemFromQueue:
-    def __init__(self, repo: Repository):
-        self.repo = repo
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    async def execute(self, item_id: str) -> ProcessEventOutput:
-        item = await self.repo.get(item_id)
-        if not item:
-            raise ValueError("Item não encontrado")
-        item_processed = replace(item, status=Status("processed"))
-        await self.repo.save(item_processed)
+    async def execute(
+        self, item_id: str, message_key: str | None = None
+    ) -> ProcessEventOutput:
+        """Marca o item como processado.
+
+        Com `message_key`, a mensagem de origem é registrada como processada
+        no mesmo commit, para que redeliveries sejam descartadas.
+        """
+        async with self.uow:
+            item = await self.uow.items.get(item_id)
+            if not item:
+                raise ValueError("Item não encontrado")
+            item_processed = replace(item, status=Status("processed"))
+            await self.uow.items.save(item_processed)
+            if message_key:
+                await self.uow.processed.add(message_key)
+            await self.uow.commit()
         return ProcessEventOutput(
             success=True,
             message="Item processed",
             item_id=item.id
         )
+
+    async def execute_many(self, item_ids: list[str]) -> list[ProcessEventOutput]:
+        """Processa um lote com uma leitura e uma escrita em massa.
+
+        Ids inexistentes não derrubam o lote: retornam success=False.
+        """
+        async with self.uow:
+            items = {item.id: item for item in await self.uow.items.get_many(item_ids)}
+            await self.uow.items.save_many(
+                [replace(item, status=Status("processed")) for item in items.values()]
+            )
+            await self.uow.commit()
+        return [
+            ProcessEventOutput(success=True, message="Item processed", item_id=item_id)
+            if item_id in items
+            else ProcessEventOutput(
+                success=False, message="Item não encontrado", item_id=item_id
+            )
+            for item_id in item_ids
+        ]
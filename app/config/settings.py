@@ -1,5 +1,6 @@
-from pydantic import field_validator, ConfigDict
+from pydantic import field_validator, model_validator, ConfigDict
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 from typing import Literal
 import os
 
@@ -7,12 +8,92 @@ import os
 class Settings(BaseSettings):
     APP_ENV: str = "local"
     LOG_LEVEL: str = "INFO"
+    # Escrita dos logs em uma thread de fundo (QueueHandler/QueueListener).
+    LOG_QUEUE_ENABLED: bool = True
+    # Fração mantida por nível, ex.: {"info": 0.1}; JSON no .env.
+    LOG_SAMPLE_RATES: dict[str, float] = {}
     DB_URL: str = "sqlite+aiosqlite:///:memory:"
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
     MESSAGE_BROKER: Literal["sqs", "rabbitmq", "in_memory"] = "in_memory"
+    MESSAGE_CODEC: Literal["json", "msgpack"] = "json"
+    MESSAGE_COMPRESS_THRESHOLD: int = 0
     SQS_QUEUE_URL: str = ""
+    SQS_ENDPOINT_URL: str = ""
+    SQS_REGION: str = ""
+    SQS_WAIT_TIME_SECONDS: int = 20
+    SQS_MAX_MESSAGES: int = 10
+    SQS_VISIBILITY_TIMEOUT: int = 0
+    SQS_DEAD_LETTER_QUEUE_URL: str = ""
+    IN_MEMORY_BUS_TOPIC: str = "events"
+    IN_MEMORY_BUS_GROUP: str = "default"
+    IN_MEMORY_BUS_MAXSIZE: int = 10_000
+    IN_MEMORY_BUS_VISIBILITY_TIMEOUT: float = 30.0
+    IN_MEMORY_BUS_MAX_DELIVERIES: int = 5
+    IN_MEMORY_BUS_PUBLISH_TIMEOUT: float = 30.0
     RABBITMQ_URL: str = ""
+    RABBITMQ_QUEUE: str = "events"
+    RABBITMQ_PREFETCH: int = 100
+    RABBITMQ_PUBLISH_BATCH: int = 100
     EXTERNAL_API_BASE_URL: str = "https://httpbin.org"
+    EXTERNAL_API_MAX_CONNECTIONS: int = 100
+    EXTERNAL_API_MAX_KEEPALIVE: int = 20
+    EXTERNAL_API_KEEPALIVE_EXPIRY: float = 30.0
+    EXTERNAL_API_HTTP2: bool = False
+    EXTERNAL_API_TIMEOUT: float = 10.0
+    EXTERNAL_API_CONNECT_TIMEOUT: float = 5.0
+    EXTERNAL_API_MAX_RETRIES: int = 2
+    EXTERNAL_API_RETRY_BACKOFF: float = 0.1
+    EXTERNAL_API_RETRY_BACKOFF_MAX: float = 2.0
+    EXTERNAL_API_RETRY_BUDGET: float = 0.1
+    EXTERNAL_API_LIMITER_ENABLED: bool = True
+    EXTERNAL_API_RATE_LIMIT: float = 0.0
+    EXTERNAL_API_RATE_BURST: float = 0.0
+    EXTERNAL_API_CONCURRENCY_INITIAL: int = 20
+    EXTERNAL_API_CONCURRENCY_MIN: int = 1
+    EXTERNAL_API_CONCURRENCY_MAX: int = 100
+    EXTERNAL_API_LATENCY_THRESHOLD: float = 2.0
+    EXTERNAL_API_QUEUE_TIMEOUT: float = 5.0
+    EXTERNAL_API_CACHE_ENABLED: bool = True
+    EXTERNAL_API_CACHE_MAXSIZE: int = 10_000
+    # Validade sem Cache-Control na resposta; 0 = só guarda o que o servidor permitir.
+    EXTERNAL_API_CACHE_DEFAULT_TTL: float = 0.0
+    EXTERNAL_API_CACHE_MAX_TTL: float = 3600.0
+    EXTERNAL_API_CACHE_STALE_TTL: float = 300.0
     OTEL_ENABLED: bool = False
+    ITEM_CACHE_ENABLED: bool = False
+    ITEM_CACHE_MAXSIZE: int = 10_000
+    ITEM_CACHE_TTL: float = 30.0
+    ITEM_CACHE_NEGATIVE_TTL: float = 5.0
+    ITEM_WRITE_BEHIND_ENABLED: bool = False
+    ITEM_WRITE_BEHIND_MAX_BATCH: int = 500
+    ITEM_WRITE_BEHIND_MAX_DELAY_MS: float = 10.0
+    OUTBOX_ENABLED: bool = False
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 0.5
+    WORKER_CONCURRENCY: int = 10
+    WORKER_PREFETCH: int = 100
+    WORKER_DRAIN_TIMEOUT: float = 30.0
+    WORKER_PROCESSES: int = 0
+    WORKER_RESTART_BACKOFF: float = 1.0
+    WORKER_LAG_REPORT_INTERVAL: float = 10.0
+    RETRY_ENABLED: bool = True
+    RETRY_MAX_ATTEMPTS: int = 5
+    RETRY_BASE_DELAY: float = 1.0
+    RETRY_MAX_DELAY: float = 300.0
+    # Fila da DLQ no RabbitMQ; em memória vale a lista de dead letters do broker.
+    DEAD_LETTER_QUEUE: str = "events.dlq"
+    DEDUP_ENABLED: bool = True
+    DEDUP_CACHE_MAXSIZE: int = 100_000
+    DEDUP_CACHE_TTL: float = 3600.0
+    DEDUP_RETENTION_SECONDS: float = 7 * 24 * 3600.0
+    DEDUP_PURGE_INTERVAL: float = 3600.0
+    LAMBDA_BATCH_CONCURRENCY: int = 10
+    BATCH_CHUNK_SIZE: int = 100
 
     model_config = ConfigDict(
         env_file=os.getenv("ENV_FILE", ".env"), case_sensitive=False
@@ -24,3 +105,19 @@ class Settings(BaseSettings):
         if v not in ("sqs", "rabbitmq", "in_memory"):
             raise ValueError("MESSAGE_BROKER must be one of: sqs, rabbitmq, in_memory")
         return v
+
+    @model_validator(mode="after")
+    def validate_write_modes(self):
+        if self.OUTBOX_ENABLED and self.ITEM_WRITE_BEHIND_ENABLED:
+            # O outbox depende do item e do evento na mesma transação.
+            raise ValueError("OUTBOX_ENABLED and ITEM_WRITE_BEHIND_ENABLED are mutually exclusive")
+        return self
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Snapshot único das configurações do processo (lê env e .env uma vez).
+
+    Em testes que alteram o ambiente, use `get_settings.cache_clear()`.
+    """
+    return Settings()
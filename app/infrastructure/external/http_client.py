@@ -1,31 +1,221 @@
+from app.infrastructure.external.response_cache import ResponseCache, cache_key
+from app.infrastructure.external.limiter import ApiLimiter
+from app.infrastructure.observability.metrics import registry
+from app.infrastructure.logging.logger import get_logger
 from app.application.ports import ExternalApiClient
+from app.config.settings import Settings
+from dataclasses import dataclass
+import importlib.util
+import asyncio
+import random
+import json
 import httpx
 import os
 
+logger = get_logger()
+
+RETRY_STATUSES = {429, 502, 503, 504}
+# Erros em que a requisição comprovadamente não saiu: seguros até para POST.
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_cache_requests = registry.counter(
+    "external_api_cache_requests_total",
+    "GETs externos por resultado do cache (hit, miss, revalidated, coalesced)",
+    ("result",),
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retentativas com backoff exponencial (full jitter) e orçamento global."""
+
+    max_retries: int = 2
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    budget_ratio: float = 0.1
+    budget_min_tokens: float = 10.0
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+class RetryBudget:
+    """Limita retries a uma fração das requisições para não amplificar quedas.
+
+    Cada requisição deposita `ratio` fichas e cada retry consome uma; o saldo
+    começa (e é limitado) em `min_tokens`.
+    """
+
+    def __init__(self, ratio: float, min_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max(min_tokens, 1.0)
+        self.tokens = self.max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
 
 class HttpExternalApiClient(ExternalApiClient):
-    def __init__(self, base_url: str | None = None):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        retry_policy: RetryPolicy | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        response_cache: ResponseCache | None = None,
+        limiter: ApiLimiter | None = None,
+    ):
         self.base_url = base_url or os.getenv(
             "EXTERNAL_API_BASE_URL", "https://httpbin.org"
         )
-        self._client = httpx.AsyncClient(base_url=self.base_url)
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 solicitado mas o pacote h2 não está instalado")
+            http2 = False
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._budget = RetryBudget(
+            self.retry_policy.budget_ratio, self.retry_policy.budget_min_tokens
+        )
+        self.response_cache = response_cache
+        # Só as chamadas de rede passam pelo limiter; cache e single-flight ficam acima.
+        self.limiter = limiter
+        # GETs idênticos em andamento: os chamadores concorrentes esperam o mesmo.
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            transport=transport,
+        )
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, limiter: ApiLimiter | None = None
+    ) -> "HttpExternalApiClient":
+        return cls(
+            base_url=settings.EXTERNAL_API_BASE_URL,
+            max_connections=settings.EXTERNAL_API_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.EXTERNAL_API_MAX_KEEPALIVE,
+            keepalive_expiry=settings.EXTERNAL_API_KEEPALIVE_EXPIRY,
+            http2=settings.EXTERNAL_API_HTTP2,
+            timeout=settings.EXTERNAL_API_TIMEOUT,
+            connect_timeout=settings.EXTERNAL_API_CONNECT_TIMEOUT,
+            retry_policy=RetryPolicy(
+                max_retries=settings.EXTERNAL_API_MAX_RETRIES,
+                backoff_base=settings.EXTERNAL_API_RETRY_BACKOFF,
+                backoff_max=settings.EXTERNAL_API_RETRY_BACKOFF_MAX,
+                budget_ratio=settings.EXTERNAL_API_RETRY_BUDGET,
+            ),
+            response_cache=(
+                ResponseCache(
+                    maxsize=settings.EXTERNAL_API_CACHE_MAXSIZE,
+                    default_ttl=settings.EXTERNAL_API_CACHE_DEFAULT_TTL,
+                    max_ttl=settings.EXTERNAL_API_CACHE_MAX_TTL,
+                    stale_ttl=settings.EXTERNAL_API_CACHE_STALE_TTL,
+                )
+                if settings.EXTERNAL_API_CACHE_ENABLED
+                else None
+            ),
+            limiter=limiter,
+        )
+
+    async def _request(self, method: str, path: str, idempotent: bool, **kwargs):
+        return (await self._send(method, path, idempotent, **kwargs)).json()
+
+    async def _send(self, method: str, path: str, idempotent: bool, **kwargs) -> httpx.Response:
+        self._budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                resp = await self._network(method, path, **kwargs)
+                if not (idempotent and resp.status_code in RETRY_STATUSES):
+                    if resp.status_code != 304:
+                        resp.raise_for_status()
+                    return resp
+                if not self._can_retry(attempt):
+                    resp.raise_for_status()
+                error = f"status {resp.status_code}"
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, _NOT_SENT_ERRORS)
+                if not retryable or not self._can_retry(attempt):
+                    raise
+                error = repr(e)
+            logger.warning(
+                "Retentando chamada externa",
+                method=method,
+                path=path,
+                attempt=attempt + 1,
+                error=error,
+            )
+            await asyncio.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
+
+    async def _network(self, method: str, path: str, **kwargs) -> httpx.Response:
+        # Cada tentativa ocupa uma vaga; o backoff entre retries fica fora dela.
+        if self.limiter is None:
+            return await self._client.request(method, path, **kwargs)
+        return await self.limiter.call(lambda: self._client.request(method, path, **kwargs))
+
+    def _can_retry(self, attempt: int) -> bool:
+        return attempt < self.retry_policy.max_retries and self._budget.try_withdraw()
 
     async def get(self, path: str, params: dict | None = None):
-        resp = await self._client.get(path, params=params)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._get(path, params)
+
+    async def _get(self, path: str, params: dict | None = None):
+        """GET com cache e single-flight: uma chamada de rede por chave em andamento."""
+        key = cache_key(path, params)
+        cache = self.response_cache
+        entry = cache.get(key) if cache is not None else None
+        if entry is not None and cache.is_fresh(entry):
+            _cache_requests.inc("hit")
+            return entry.json()
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = asyncio.create_task(self._fetch(key, path, params, entry))
+            self._inflight[key] = flight
+            flight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            _cache_requests.inc("coalesced")
+        # shield: um chamador cancelado não derruba a chamada dos outros.
+        content = await asyncio.shield(flight)
+        return json.loads(content)
+
+    async def _fetch(self, key: str, path: str, params: dict | None, stale) -> bytes:
+        headers = {"If-None-Match": stale.etag} if stale is not None and stale.etag else None
+        resp = await self._send("GET", path, idempotent=True, params=params, headers=headers)
+        if resp.status_code == 304 and stale is not None:
+            _cache_requests.inc("revalidated")
+            self.response_cache.refresh(key, stale, resp.headers)
+            return stale.content
+        _cache_requests.inc("miss")
+        if self.response_cache is not None:
+            self.response_cache.store(key, resp.content, resp.headers)
+        return resp.content
 
     async def post(self, path: str, data: dict):
-        resp = await self._client.post(path, json=data)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", path, idempotent=False, json=data)
 
     async def get_json(self, path: str):
-        resp = await self._client.get(path)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._get(path)
 
     async def post_json(self, path: str, payload: dict):
-        resp = await self._client.post(path, json=payload)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", path, idempotent=False, json=payload)
+
+    async def close(self) -> None:
+        await self._client.aclose()
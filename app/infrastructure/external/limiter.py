@@ -0,0 +1,191 @@
+from app.infrastructure.observability.metrics import registry
+from typing import Awaitable, Callable, TypeVar
+from collections import deque
+import asyncio
+import httpx
+import time
+
+T = TypeVar("T")
+
+_limit_gauge = registry.gauge(
+    "external_api_concurrency_limit", "Limite adaptativo de chamadas externas simultâneas"
+)
+_inflight_gauge = registry.gauge("external_api_inflight", "Chamadas externas em andamento")
+_queued_gauge = registry.gauge(
+    "external_api_queued", "Chamadas externas aguardando vaga no limiter"
+)
+_rate_gauge = registry.gauge(
+    "external_api_rate_limit", "Taxa máxima de chamadas externas por segundo (0 = sem limite)"
+)
+_rejected = registry.counter(
+    "external_api_limiter_rejections_total", "Chamadas recusadas por espera excessiva"
+)
+
+
+class LimitExceeded(RuntimeError):
+    """A chamada esperou mais que `queue_timeout` por uma vaga."""
+
+
+class TokenBucket:
+    """Limite de taxa: `rate` fichas por segundo, acumulando até `burst`."""
+
+    def __init__(self, rate: float, burst: float | None = None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(burst or rate, 1.0)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        _rate_gauge.set(rate)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Consome uma ficha e devolve 0, ou devolve quanto falta esperar."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while wait := self.try_acquire():
+            await asyncio.sleep(wait)
+
+
+class AimdLimit:
+    """Limite de concorrência AIMD guiado por latência e erros.
+
+    Cada resposta boa soma `1/limit` (cerca de +1 por janela cheia); erro de
+    sobrecarga ou latência acima de `latency_threshold` multiplica o limite
+    por `backoff_ratio`. Só a primeira queda de cada janela reduz o limite:
+    as chamadas que já estavam em voo quando ele caiu não o derrubam de novo.
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        latency_threshold: float = 1.0,
+        backoff_ratio: float = 0.9,
+    ):
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.latency_threshold = latency_threshold
+        self.backoff_ratio = backoff_ratio
+        self.epoch = 0
+
+    def on_sample(self, epoch: int, latency: float, dropped: bool) -> None:
+        if dropped or latency > self.latency_threshold:
+            if epoch == self.epoch:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self.epoch += 1
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class AdaptiveLimiter:
+    """Semáforo cujo tamanho segue um AimdLimit; a fila de espera é FIFO."""
+
+    def __init__(self, limit: AimdLimit, queue_timeout: float = 5.0):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._publish()
+
+    def _publish(self) -> None:
+        _limit_gauge.set(int(self.limit.limit))
+        _inflight_gauge.set(self.in_flight)
+        _queued_gauge.set(len(self._waiters))
+
+    async def acquire(self) -> int:
+        """Ocupa uma vaga e devolve a janela (epoch) em que a chamada começou."""
+        if self.in_flight < int(self.limit.limit) and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return self.limit.epoch
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # A vaga chegou junto com o timeout: devolve.
+                self._release_slot()
+            else:
+                waiter.cancel()
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._publish()
+            if isinstance(e, asyncio.TimeoutError):
+                _rejected.inc()
+                raise LimitExceeded("Limite de chamadas externas atingido") from None
+            raise
+        return self.limit.epoch
+
+    def release(self, epoch: int, latency: float, dropped: bool) -> None:
+        self.limit.on_sample(epoch, latency, dropped)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._publish()
+
+
+def is_overload(error: BaseException) -> bool:
+    """Erros que indicam dependência saturada (e não requisição inválida)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return _overloaded(error.response.status_code)
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def _overloaded(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+class ApiLimiter:
+    """Limite de taxa e de concorrência adaptativa em volta de cada chamada de rede.
+
+    Fica dentro do cliente HTTP, abaixo do cache e do single-flight: acertos de
+    cache e chamadores coalescidos não gastam ficha nem vaga, e só a latência
+    de chamadas reais alimenta o AimdLimit. Respostas 429/5xx contam como
+    sobrecarga mesmo sem virar exceção.
+    """
+
+    def __init__(
+        self,
+        limiter: AdaptiveLimiter,
+        bucket: TokenBucket | None = None,
+        clock=time.monotonic,
+    ):
+        self.limiter = limiter
+        self.bucket = bucket
+        self._clock = clock
+
+    async def call(self, send: Callable[[], Awaitable[T]]) -> T:
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        epoch = await self.limiter.acquire()
+        started = self._clock()
+        dropped = False
+        try:
+            result = await send()
+            if isinstance(result, httpx.Response):
+                dropped = _overloaded(result.status_code)
+            return result
+        except Exception as e:
+            dropped = is_overload(e)
+            raise
+        finally:
+            self.limiter.release(epoch, self._clock() - started, dropped)
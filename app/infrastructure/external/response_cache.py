@@ -0,0 +1,97 @@
+from app.infrastructure.cache import MISS, TTLCache
+from urllib.parse import urlencode
+from dataclasses import dataclass
+from typing import Any, Mapping
+import json
+import time
+
+
+def cache_key(path: str, params: Mapping | None = None) -> str:
+    """Chave canônica: a ordem dos parâmetros não importa."""
+    if not params:
+        return path
+    return f"{path}?{urlencode(sorted(params.items()), doseq=True)}"
+
+
+def parse_cache_control(value: str | None) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+@dataclass
+class CachedResponse:
+    content: bytes
+    etag: str | None
+    fresh_until: float
+
+    def json(self) -> Any:
+        # Cada chamador recebe uma cópia própria: o cache não é mutável por fora.
+        return json.loads(self.content)
+
+
+class ResponseCache:
+    """Cache de respostas GET que respeita Cache-Control e ETag.
+
+    `max-age` (menos `Age`) define a validade, limitada a `max_ttl`; sem
+    Cache-Control vale `default_ttl` (0 = não guarda). `no-store` nunca é
+    guardado e `no-cache` é guardado só para revalidação. Respostas com ETag
+    ficam mais `stale_ttl` segundos após vencer, para virar um
+    `If-None-Match` barato em vez de um download completo.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        default_ttl: float = 0.0,
+        max_ttl: float = 3600.0,
+        stale_ttl: float = 300.0,
+        clock=time.monotonic,
+    ):
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries = TTLCache(maxsize=maxsize, ttl=max_ttl + stale_ttl, clock=clock)
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        return None if entry is MISS else entry
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return entry.fresh_until > self._clock()
+
+    def store(self, key: str, content: bytes, headers: Mapping[str, str]) -> CachedResponse:
+        """Guarda a resposta se os cabeçalhos permitirem; devolve a entrada de qualquer forma."""
+        directives = parse_cache_control(headers.get("cache-control"))
+        etag = headers.get("etag")
+        ttl = self._freshness(directives, headers)
+        entry = CachedResponse(content, etag, self._clock() + ttl)
+        if "no-store" in directives:
+            return entry
+        keep = ttl + (self.stale_ttl if etag else 0.0)
+        if keep > 0:
+            self._entries.set(key, entry, keep)
+        return entry
+
+    def refresh(self, key: str, entry: CachedResponse, headers: Mapping[str, str]) -> None:
+        """Após um 304: a mesma representação volta a valer pelo novo max-age."""
+        self.store(key, entry.content, {"etag": entry.etag or "", **headers})
+
+    def _freshness(self, directives: dict, headers: Mapping[str, str]) -> float:
+        if "no-store" in directives or "no-cache" in directives:
+            return 0.0
+        if "max-age" not in directives:
+            return self.default_ttl
+        try:
+            max_age = float(directives["max-age"] or 0)
+            age = float(headers.get("age") or 0)
+        except ValueError:
+            return 0.0
+        return max(min(max_age - age, self.max_ttl), 0.0)
+
+    def stats(self) -> dict:
+        return self._entries.stats()
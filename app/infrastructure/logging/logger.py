@@ -1,31 +1,143 @@
+from logging.handlers import QueueHandler, QueueListener
+from contextvars import ContextVar, Token
+from typing import Mapping, Optional
 import structlog
 import logging
+import random
+import atexit
+import queue
 import sys
-import os
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional (extra "speedups")
+    orjson = None
+    import json
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_configured = False
+_listener: QueueListener | None = None
+
+
+def set_request_id(request_id: Optional[str]) -> Token:
+    return request_id_var.set(request_id)
+
+
+def reset_request_id(token: Token) -> None:
+    request_id_var.reset(token)
 
 
 class RequestIdProcessor:
     def __call__(self, logger, method_name, event_dict):
-        request_id = event_dict.get("request_id") or os.getenv("REQUEST_ID")
+        request_id = event_dict.get("request_id") or request_id_var.get()
         if request_id:
             event_dict["request_id"] = request_id
         return event_dict
 
 
-def configure_logger(log_level: str = "INFO"):
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, log_level.upper(), logging.INFO),
-    )
+class LevelSampler:
+    """Descarta uma fração dos eventos por nível, antes de serializá-los.
+
+    `rates` mapeia nível -> fração mantida (ex.: {"info": 0.1}); níveis
+    ausentes são sempre mantidos.
+    """
+
+    def __init__(self, rates: Mapping[str, float], rand=random.random):
+        self.rates = {level.lower(): rate for level, rate in rates.items()}
+        self._rand = rand
+
+    def __call__(self, logger, method_name, event_dict):
+        rate = self.rates.get(method_name)
+        if rate is not None and rate < 1.0 and self._rand() >= rate:
+            raise structlog.DropEvent
+        return event_dict
+
+
+def _dumps(obj, **kwargs) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str)
+
+
+def _install_handler(level: int, use_queue: bool) -> None:
+    """Troca os handlers do root por um handler de stdout, atrás de uma fila se pedido.
+
+    Com a fila, quem loga só enfileira a linha; a escrita acontece na thread
+    do QueueListener, fora do event loop.
+    """
+    global _listener
+    stop_log_listener()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    if use_queue:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        root.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, stream, respect_handler_level=False)
+        _listener.start()
+    else:
+        root.addHandler(stream)
+    root.setLevel(level)
+
+
+def stop_log_listener() -> None:
+    """Escreve o que está na fila e para a thread do listener."""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+
+
+atexit.register(stop_log_listener)
+
+
+def configure_logger(
+    log_level: str = "INFO",
+    use_queue: bool = False,
+    sample_rates: Mapping[str, float] | None = None,
+    force: bool = False,
+):
+    """Configura structlog e o logging do processo uma única vez.
+
+    Chamadas seguintes só devolvem o logger, a menos que `force` seja usado.
+    Os pontos de entrada (HTTP, worker, Lambda, relay) chamam esta função; os
+    demais módulos usam `get_logger()`.
+    """
+    global _configured
+    if _configured and not force:
+        return structlog.get_logger()
+    level = getattr(logging, log_level.upper(), logging.INFO)
+    _install_handler(level, use_queue)
+    processors = []
+    if sample_rates:
+        processors.append(LevelSampler(sample_rates))
+    processors += [
+        structlog.processors.TimeStamper(fmt="iso"),
+        RequestIdProcessor(),
+        structlog.processors.JSONRenderer(serializer=_dumps),
+    ]
     structlog.configure(
-        processors=[
-            structlog.processors.TimeStamper(fmt="iso"),
-            RequestIdProcessor(),
-            structlog.processors.JSONRenderer(),
-        ],
-        wrapper_class=structlog.make_filtering_bound_logger(log_level.upper()),
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
+    _configured = True
     return structlog.get_logger()
+
+
+def configure_from_settings(settings, force: bool = False):
+    return configure_logger(
+        settings.LOG_LEVEL,
+        use_queue=settings.LOG_QUEUE_ENABLED,
+        sample_rates=settings.LOG_SAMPLE_RATES,
+        force=force,
+    )
+
+
+def get_logger(*args, **initial_values):
+    """Logger preguiçoso: resolve a configuração no primeiro uso."""
+    return structlog.get_logger(*args, **initial_values)
@@ -0,0 +1,276 @@
+from typing import Any, Iterator, Mapping
+from dataclasses import dataclass
+import importlib
+import base64
+import zlib
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional (extra "speedups")
+    orjson = None
+import json
+
+# Cabeçalhos do envelope. Valores são sempre strings, para caber em headers
+# AMQP e em MessageAttributes do SQS sem conversão.
+CODEC_HEADER = "x-codec"
+VERSION_HEADER = "x-codec-version"
+ENCODING_HEADER = "x-content-encoding"
+TRANSFER_HEADER = "x-transfer-encoding"
+ENVELOPE_VERSION = 1
+
+# Campos do evento copiados para cabeçalhos: roteamento, deduplicação e
+# tracing leem daqui sem decodificar o payload.
+HEADER_FIELDS = {
+    "type": "x-event-type",
+    "item_id": "x-item-id",
+    "event_id": "x-event-id",
+    "traceparent": "x-traceparent",
+}
+
+
+class CodecError(ValueError):
+    """Mensagem com envelope desconhecido ou payload inválido."""
+
+
+class JsonFormat:
+    name = "json"
+    content_type = "application/json"
+
+    def dumps(self, obj: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class MsgpackFormat:
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def __init__(self):
+        try:
+            self._msgpack = importlib.import_module("msgpack")
+        except ImportError as e:
+            raise ImportError(
+                "MESSAGE_CODEC=msgpack exige o pacote msgpack (extra \"msgpack\")"
+            ) from e
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+FORMATS = {"json": JsonFormat, "msgpack": MsgpackFormat}
+_legacy = JsonFormat()
+
+
+@dataclass(frozen=True)
+class Envelope:
+    body: bytes | str
+    headers: dict[str, str]
+    content_type: str
+    content_encoding: str | None = None
+
+
+def _header(headers: Mapping | None, name: str) -> str | None:
+    value = headers.get(name) if headers else None
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    return None if value is None else str(value)
+
+
+class LazyBody(Mapping):
+    """Payload decodificado só no primeiro acesso a um campo fora dos cabeçalhos.
+
+    `body.get("item_id")` e afins são respondidos pelos cabeçalhos quando o
+    produtor os enviou; qualquer outro campo dispara a decodificação completa.
+    O envelope já foi validado, mas o payload não: ler um campo fora dos
+    cabeçalhos, iterar ou fazer `dict(body)` pode levantar CodecError, inclusive
+    em `.get()` (Mapping só trata KeyError). Quem força a decodificação precisa
+    tratar esse erro; `header_fields()` nunca decodifica.
+    """
+
+    __slots__ = ("headers", "_raw", "_codec", "_value")
+
+    def __init__(self, raw: bytes, headers: dict[str, str], codec: "MessageCodec"):
+        self.headers = headers
+        self._raw = raw
+        self._codec = codec
+        self._value: dict | None = None
+
+    @property
+    def event_type(self) -> str | None:
+        return self.headers.get(HEADER_FIELDS["type"])
+
+    def header_fields(self) -> dict[str, str]:
+        """Campos do evento disponíveis nos cabeçalhos, sem tocar no payload."""
+        return {
+            field: self.headers[header]
+            for field, header in HEADER_FIELDS.items()
+            if header in self.headers
+        }
+
+    @property
+    def decoded(self) -> dict:
+        if self._value is None:
+            self._value = self._codec._load(self._raw, self.headers)
+            self._raw = b""
+        return self._value
+
+    def __getitem__(self, key: str) -> Any:
+        if self._value is None:
+            header = HEADER_FIELDS.get(key)
+            if header is not None and header in self.headers:
+                return self.headers[header]
+        return self.decoded[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.decoded)
+
+    def __len__(self) -> int:
+        return len(self.decoded)
+
+    def __reduce__(self):
+        # Entre processos (supervisor -> filho) vai o payload cru: decodifica quem usa.
+        if self._value is not None:
+            return (dict, (self._value,))
+        return (_restore_lazy_body, (self._raw, self.headers))
+
+    def __repr__(self) -> str:
+        if self._value is None:
+            return f"LazyBody(headers={self.headers!r})"
+        return f"LazyBody({self._value!r})"
+
+
+class MessageCodec:
+    """Serialização compartilhada pelos adapters de MessageBus.
+
+    O corpo vai no formato configurado (`json` ou `msgpack`) e, acima de
+    `compress_threshold` bytes, comprimido com zlib. Formato, versão e
+    compressão seguem em cabeçalhos; mensagens sem cabeçalho são tratadas como
+    JSON puro, o formato anterior ao envelope.
+    """
+
+    def __init__(
+        self, format: str = "json", compress_threshold: int = 0, compress_level: int = 6
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Codec desconhecido: {format}")
+        self.format = FORMATS[format]()
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self._formats = {format: self.format}
+
+    def encode(self, event: dict) -> Envelope:
+        body = self.format.dumps(event)
+        headers = {CODEC_HEADER: self.format.name, VERSION_HEADER: str(ENVELOPE_VERSION)}
+        for field, header in HEADER_FIELDS.items():
+            value = event.get(field)
+            if isinstance(value, str):
+                headers[header] = value
+        encoding = None
+        if self.compress_threshold and len(body) >= self.compress_threshold:
+            body = zlib.compress(body, self.compress_level)
+            encoding = headers[ENCODING_HEADER] = "zlib"
+        return Envelope(body, headers, self.format.content_type, encoding)
+
+    def encode_text(self, event: dict) -> Envelope:
+        """Como `encode`, para transportes só de texto (SQS): binário vai em base64."""
+        envelope = self.encode(event)
+        if self.format.name == "json" and envelope.content_encoding is None:
+            return Envelope(envelope.body.decode(), envelope.headers, envelope.content_type)
+        headers = {**envelope.headers, TRANSFER_HEADER: "base64"}
+        return Envelope(
+            base64.b64encode(envelope.body).decode(),
+            headers,
+            envelope.content_type,
+            envelope.content_encoding,
+        )
+
+    def decode(self, body: bytes | str, headers: Mapping | None = None) -> Any:
+        """Valida o envelope e devolve um LazyBody; sem envelope, decodifica JSON já.
+
+        Levanta CodecError para versão, formato ou compressão desconhecidos e
+        para JSON legado inválido.
+        """
+        if _header(headers, CODEC_HEADER) is None:
+            try:
+                return _legacy.loads(body)
+            except ValueError as e:
+                raise CodecError("Mensagem sem envelope e com JSON inválido") from e
+        normalized = {str(k): _header(headers, k) for k in headers if headers[k] is not None}
+        self._check(normalized)
+        if normalized.get(TRANSFER_HEADER) == "base64":
+            try:
+                body = base64.b64decode(body, validate=True)
+            except ValueError as e:
+                raise CodecError("Corpo base64 inválido") from e
+        elif isinstance(body, str):
+            body = body.encode()
+        return LazyBody(body, normalized, self)
+
+    def decode_payload(self, body: bytes | str, headers: Mapping | None = None) -> Any:
+        """Decodificação completa, sem LazyBody."""
+        value = self.decode(body, headers)
+        return value.decoded if isinstance(value, LazyBody) else value
+
+    def _load(self, body: bytes, headers: dict[str, str]) -> dict:
+        if headers.get(ENCODING_HEADER) == "zlib":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error as e:
+                raise CodecError("Corpo zlib inválido") from e
+        try:
+            value = self._format(headers[CODEC_HEADER]).loads(body)
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError("Payload inválido") from e
+        if not isinstance(value, dict):
+            raise CodecError("Payload não é um objeto")
+        return value
+
+    def _check(self, headers: dict[str, str]) -> None:
+        if headers.get(VERSION_HEADER) != str(ENVELOPE_VERSION):
+            raise CodecError(f"Versão de envelope não suportada: {headers.get(VERSION_HEADER)}")
+        if headers[CODEC_HEADER] not in FORMATS:
+            raise CodecError(f"Codec desconhecido: {headers[CODEC_HEADER]}")
+        if headers.get(ENCODING_HEADER) not in (None, "zlib"):
+            raise CodecError(f"Compressão desconhecida: {headers[ENCODING_HEADER]}")
+        if headers.get(TRANSFER_HEADER) not in (None, "base64"):
+            raise CodecError(f"Transfer encoding desconhecido: {headers[TRANSFER_HEADER]}")
+
+    def _format(self, name: str):
+        # Consumidores decodificam qualquer formato conhecido, não só o que publicam.
+        if name not in self._formats:
+            try:
+                self._formats[name] = FORMATS[name]()
+            except ImportError as e:
+                raise CodecError(str(e)) from e
+        return self._formats[name]
+
+
+def _restore_lazy_body(raw: bytes, headers: dict[str, str]) -> LazyBody:
+    return LazyBody(raw, headers, MessageCodec())
+
+
+def headers_from_attributes(attributes: Mapping | None) -> dict[str, str]:
+    """Cabeçalhos a partir de MessageAttributes do SQS (API ou evento do Lambda)."""
+    headers: dict[str, str] = {}
+    for name, attribute in (attributes or {}).items():
+        value = attribute.get("StringValue", attribute.get("stringValue"))
+        if value is not None:
+            headers[name] = value
+    return headers
+
+
+def attributes_from_headers(headers: Mapping[str, str]) -> dict[str, dict]:
+    return {
+        name: {"DataType": "String", "StringValue": value} for name, value in headers.items()
+    }
@@ -1,13 +1,83 @@
-from app.infrastructure.messaging.in_memory_bus import InMemoryMessageBus
-from app.infrastructure.messaging.rabbitmq_bus import RabbitMQMessageBus
-from app.infrastructure.messaging.sqs_bus import SqsMessageBus
+from app.infrastructure.messaging.codec import MessageCodec
 
 
-def get_message_bus(settings) -> object:
+def get_codec(settings) -> MessageCodec:
+    return MessageCodec(
+        settings.MESSAGE_CODEC, compress_threshold=settings.MESSAGE_COMPRESS_THRESHOLD
+    )
+
+
+def get_message_bus(settings, destination: str | None = None) -> object:
+    """Cria o adapter do broker configurado.
+
+    `destination` troca a fila padrão (URL no SQS, fila no RabbitMQ, tópico
+    em memória). Os imports ficam dentro de cada ramo: o SDK de um broker não
+    usado (aioboto3, aio_pika) não entra no cold start.
+    """
     broker = getattr(settings, "MESSAGE_BROKER", "in_memory")
     if broker == "sqs":
-        return SqsMessageBus(settings.SQS_QUEUE_URL)
+        from app.infrastructure.messaging.sqs_bus import SqsMessageBus
+
+        return SqsMessageBus(
+            destination or settings.SQS_QUEUE_URL,
+            endpoint_url=settings.SQS_ENDPOINT_URL,
+            region_name=settings.SQS_REGION,
+            wait_time_seconds=settings.SQS_WAIT_TIME_SECONDS,
+            max_messages=settings.SQS_MAX_MESSAGES,
+            visibility_timeout=settings.SQS_VISIBILITY_TIMEOUT or None,
+            codec=get_codec(settings),
+        )
     elif broker == "rabbitmq":
-        return RabbitMQMessageBus(settings.RABBITMQ_URL)
+        from app.infrastructure.messaging.rabbitmq_bus import RabbitMQMessageBus
+
+        return RabbitMQMessageBus(
+            settings.RABBITMQ_URL,
+            queue_name=destination or settings.RABBITMQ_QUEUE,
+            prefetch_count=settings.RABBITMQ_PREFETCH,
+            publish_batch_size=settings.RABBITMQ_PUBLISH_BATCH,
+            codec=get_codec(settings),
+            dead_letter_queue=(
+                None if destination == settings.DEAD_LETTER_QUEUE else settings.DEAD_LETTER_QUEUE
+            ),
+        )
     else:
-        return InMemoryMessageBus()
+        from app.infrastructure.messaging.in_memory_bus import InMemoryMessageBus
+
+        return InMemoryMessageBus(
+            _in_memory_broker(settings),
+            topic=destination or settings.IN_MEMORY_BUS_TOPIC,
+            group=settings.IN_MEMORY_BUS_GROUP,
+        )
+
+
+def _in_memory_broker(settings):
+    from app.infrastructure.messaging.in_memory_bus import get_broker
+
+    return get_broker(
+        maxsize=settings.IN_MEMORY_BUS_MAXSIZE,
+        visibility_timeout=settings.IN_MEMORY_BUS_VISIBILITY_TIMEOUT,
+        max_deliveries=settings.IN_MEMORY_BUS_MAX_DELIVERIES,
+        publish_timeout=settings.IN_MEMORY_BUS_PUBLISH_TIMEOUT or None,
+    )
+
+
+def get_dead_letter_bus(settings) -> object | None:
+    """Bus da DLQ; None no SQS sem SQS_DEAD_LETTER_QUEUE_URL (vale a redrive policy).
+
+    Em memória, os eventos vão para os dead letters do próprio broker (os
+    mesmos do `max_deliveries`), não para um tópico sem consumidor.
+    """
+    broker = getattr(settings, "MESSAGE_BROKER", "in_memory")
+    if broker == "sqs":
+        if not settings.SQS_DEAD_LETTER_QUEUE_URL:
+            return None
+        return get_message_bus(settings, settings.SQS_DEAD_LETTER_QUEUE_URL)
+    if broker == "rabbitmq":
+        return get_message_bus(settings, settings.DEAD_LETTER_QUEUE)
+    from app.infrastructure.messaging.in_memory_bus import InMemoryDeadLetterBus
+
+    return InMemoryDeadLetterBus(
+        _in_memory_broker(settings),
+        topic=settings.IN_MEMORY_BUS_TOPIC,
+        group=settings.IN_MEMORY_BUS_GROUP,
+    )
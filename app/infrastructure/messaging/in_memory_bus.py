@@ -1,22 +1,331 @@
 from app.application.ports import MessageBus
+from dataclasses import dataclass, field
+from collections import deque
+from typing import Any, Optional
+import itertools
 import asyncio
+import time
+
+
+@dataclass
+class _Message:
+    id: str
+    body: Any
+    deliveries: int = 0
+    receipt: Optional[str] = None
+    deadline: float = 0.0
+
+
+@dataclass
+class _Group:
+    """Fila de um consumer group: agendadas + prontas + em processamento (até o ack)."""
+
+    maxsize: int
+    ready: deque = field(default_factory=deque)
+    inflight: dict = field(default_factory=dict)
+    dead_letters: list = field(default_factory=list)
+    delayed: int = 0
+
+    def __len__(self) -> int:
+        return self.delayed + len(self.ready) + len(self.inflight)
+
+
+def _wake_all(waiters: deque) -> None:
+    while waiters:
+        waiter = waiters.popleft()
+        # O broker pode sobreviver ao loop de quem esperava (ex.: testes).
+        if not waiter.done() and not waiter.get_loop().is_closed():
+            waiter.set_result(None)
+
+
+async def _wait(waiters: deque, timeout: float | None) -> bool:
+    waiter = asyncio.get_running_loop().create_future()
+    waiters.append(waiter)
+    try:
+        await asyncio.wait_for(waiter, timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        if waiter in waiters:
+            waiters.remove(waiter)
+
+
+class BrokerFull(RuntimeError):
+    """Algum group do tópico ficou cheio por mais que `publish_timeout`."""
+
+
+class InMemoryBroker:
+    """Broker do processo: tópicos, consumer groups e filas limitadas.
+
+    Cada tópico entrega uma cópia de cada mensagem para cada group inscrito;
+    dentro de um group cada mensagem vai para um consumidor só. A capacidade
+    de um group conta as mensagens prontas e as entregues ainda sem ack, e
+    `publish` espera enquanto algum group do tópico estiver cheio, até
+    `publish_timeout` segundos (None = sem limite); depois levanta BrokerFull.
+    Com `delay`, a mensagem só entra nos groups após o atraso, mas já ocupa
+    capacidade desde o publish. O atraso é um timer do event loop: não é
+    durável, e mensagens agendadas se perdem se o loop parar antes.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        visibility_timeout: float = 30.0,
+        max_deliveries: int = 5,
+        publish_timeout: float | None = 30.0,
+        clock=time.monotonic,
+    ):
+        self.maxsize = max(maxsize, 1)
+        self.visibility_timeout = visibility_timeout
+        self.max_deliveries = max_deliveries
+        self.publish_timeout = publish_timeout
+        self._clock = clock
+        self._topics: dict[str, dict[str, _Group]] = {}
+        self._ids = itertools.count(1)
+        self._not_empty: dict[tuple[str, str], deque] = {}
+        self._not_full: dict[str, deque] = {}
+
+    def subscribe(self, topic: str, group: str, maxsize: int | None = None) -> None:
+        groups = self._topics.setdefault(topic, {})
+        if group not in groups:
+            groups[group] = _Group(maxsize=max(maxsize or self.maxsize, 1))
+
+    async def publish(self, topic: str, body: Any, delay: float = 0.0) -> str:
+        groups = self._topics.setdefault(topic, {})
+        deadline = None if self.publish_timeout is None else self._clock() + self.publish_timeout
+        while full := [name for name, g in groups.items() if len(g) >= g.maxsize]:
+            not_full = self._not_full.setdefault(topic, deque())
+            if deadline is None:
+                await _wait(not_full, None)
+                continue
+            remaining = deadline - self._clock()
+            if remaining <= 0 or not await _wait(not_full, remaining):
+                raise BrokerFull(f"Tópico {topic} cheio no group {full[0]}")
+        message_id = str(next(self._ids))
+        if delay > 0:
+            scheduled = list(groups.values())
+            for group in scheduled:
+                group.delayed += 1
+            asyncio.get_running_loop().call_later(
+                delay, self._deliver_delayed, topic, message_id, body, scheduled
+            )
+        else:
+            self._deliver(topic, message_id, body)
+        return message_id
+
+    def _deliver_delayed(
+        self, topic: str, message_id: str, body: Any, scheduled: list[_Group]
+    ) -> None:
+        for group in scheduled:
+            group.delayed -= 1
+        self._deliver(topic, message_id, body)
+
+    def _deliver(self, topic: str, message_id: str, body: Any) -> None:
+        for name, group in self._topics.setdefault(topic, {}).items():
+            group.ready.append(_Message(id=message_id, body=body))
+            _wake_all(self._not_empty.get((topic, name), deque()))
+
+    async def fetch(
+        self, topic: str, group: str, max_messages: int, timeout: float | None
+    ) -> list[dict]:
+        """Entrega até `max_messages`, esperando até `timeout` pela primeira."""
+        self.subscribe(topic, group)
+        queue = self._topics[topic][group]
+        self._requeue_expired(topic, queue)
+        while not queue.ready:
+            key = (topic, group)
+            if not await _wait(self._not_empty.setdefault(key, deque()), timeout):
+                return []
+            self._requeue_expired(topic, queue)
+        deadline = self._clock() + self.visibility_timeout
+        batch = []
+        while queue.ready and len(batch) < max_messages:
+            message = queue.ready.popleft()
+            message.deliveries += 1
+            message.receipt = f"{topic}|{group}|{message.id}|{message.deliveries}"
+            message.deadline = deadline
+            queue.inflight[message.receipt] = message
+            batch.append(
+                {
+                    "body": message.body,
+                    "receipt": message.receipt,
+                    "message_id": message.id,
+                    "deliveries": message.deliveries,
+                }
+            )
+        return batch
+
+    def ack(self, receipt: str) -> bool:
+        topic, group = receipt.split("|", 2)[:2]
+        queue = self._topics.get(topic, {}).get(group)
+        # Receipt desconhecido: já confirmado ou expirado e reentregue.
+        if queue is None or queue.inflight.pop(receipt, None) is None:
+            return False
+        _wake_all(self._not_full.get(topic, deque()))
+        return True
+
+    def nack(self, receipt: str) -> bool:
+        topic, group = receipt.split("|", 2)[:2]
+        queue = self._topics.get(topic, {}).get(group)
+        message = queue.inflight.pop(receipt, None) if queue else None
+        if message is None:
+            return False
+        self._redeliver(topic, group, queue, message)
+        return True
+
+    def _redeliver(self, topic: str, group: str, queue: _Group, message: _Message) -> None:
+        if message.deliveries >= self.max_deliveries:
+            queue.dead_letters.append(message.body)
+            _wake_all(self._not_full.get(topic, deque()))
+        else:
+            queue.ready.appendleft(message)
+            _wake_all(self._not_empty.get((topic, group), deque()))
+
+    def dead_letter(self, topic: str, group: str, body: Any) -> None:
+        """Guarda um evento na lista de dead letters do group, sem ocupar capacidade."""
+        self.subscribe(topic, group)
+        self._topics[topic][group].dead_letters.append(body)
+
+    def pop_dead_letter(self, topic: str, group: str) -> Any | None:
+        """Retira o dead letter mais antigo do group (None se não houver)."""
+        self.subscribe(topic, group)
+        dead_letters = self._topics[topic][group].dead_letters
+        return dead_letters.pop(0) if dead_letters else None
+
+    def _requeue_expired(self, topic: str, queue: _Group) -> None:
+        if not queue.inflight:
+            return
+        now = self._clock()
+        # Entregas em ordem de deadline: basta olhar o começo do dict.
+        expired = []
+        for receipt, message in queue.inflight.items():
+            if message.deadline > now:
+                break
+            expired.append(receipt)
+        for receipt in expired:
+            message = queue.inflight.pop(receipt)
+            group = receipt.split("|", 2)[1]
+            self._redeliver(topic, group, queue, message)
+
+    def stats(self) -> dict:
+        return {
+            topic: {
+                name: {
+                    "ready": len(g.ready),
+                    "inflight": len(g.inflight),
+                    "dead_letters": len(g.dead_letters),
+                }
+                for name, g in groups.items()
+            }
+            for topic, groups in self._topics.items()
+        }
+
+
+_default_broker: InMemoryBroker | None = None
+
+
+def get_broker(**options) -> InMemoryBroker:
+    """Broker compartilhado pelo processo (produtores e workers do mesmo nó).
+
+    As opções só valem na criação; pedir o broker com opções diferentes das
+    dele é ValueError, em vez de devolver silenciosamente outra configuração.
+    """
+    global _default_broker
+    if _default_broker is None:
+        _default_broker = InMemoryBroker(**options)
+        return _default_broker
+    conflicts = {
+        name: value
+        for name, value in options.items()
+        if getattr(_default_broker, name, value) != value
+    }
+    if conflicts:
+        raise ValueError(f"Broker em memória já criado com outras opções: {conflicts}")
+    return _default_broker
 
 
 class InMemoryMessageBus(MessageBus):
-    def __init__(self):
-        self._queue = asyncio.Queue()
+    """MessageBus sobre um InMemoryBroker, para um tópico e um consumer group.
+
+    Sem `broker`, usa um broker próprio (isolado). `receive` espera até
+    `receive_timeout` segundos e devolve `{}` se nada chegar.
+    """
+
+    def __init__(
+        self,
+        broker: InMemoryBroker | None = None,
+        topic: str = "events",
+        group: str = "default",
+        receive_timeout: float = 1.0,
+    ):
+        self.broker = broker or InMemoryBroker()
+        self.topic = topic
+        self.group = group
+        self.receive_timeout = receive_timeout
+        # Inscreve já: mensagens publicadas antes do primeiro receive ficam retidas.
+        self.broker.subscribe(topic, group)
+
+    async def send(self, event: dict) -> None:
+        await self.broker.publish(self.topic, event)
+
+    async def send_many(self, events: list[dict]) -> list[dict]:
+        for event in events:
+            await self.broker.publish(self.topic, event)
+        return []
+
+    async def send_delayed(self, event: dict, delay: float) -> None:
+        """Agenda a entrega no loop deste processo.
+
+        Ao contrário dos brokers externos, o atraso não é durável: se o processo
+        cair antes do prazo, a mensagem se perde.
+        """
+        await self.broker.publish(self.topic, event, delay)
+
+    async def receive(self) -> dict:
+        batch = await self.broker.fetch(self.topic, self.group, 1, self.receive_timeout)
+        return batch[0] if batch else {}
+
+    async def receive_many(self, max_messages: int = 10) -> list[dict]:
+        return await self.broker.fetch(
+            self.topic, self.group, max_messages, self.receive_timeout
+        )
+
+    async def ack(self, message_id: str) -> None:
+        self.broker.ack(message_id)
+
+    async def ack_many(self, message_ids: list[str]) -> list[str]:
+        return [receipt for receipt in message_ids if not self.broker.ack(receipt)]
+
+    async def nack(self, message_id: str) -> None:
+        self.broker.nack(message_id)
+
+
+class InMemoryDeadLetterBus(MessageBus):
+    """DLQ em memória: a mesma lista `dead_letters` usada pelo `max_deliveries`.
+
+    Um tópico de DLQ sem consumidor encheria e travaria quem publica nele;
+    aqui `send` nunca bloqueia. `receive` retira o dead letter mais antigo.
+    """
+
+    def __init__(self, broker: InMemoryBroker, topic: str = "events", group: str = "default"):
+        self.broker = broker
+        self.topic = topic
+        self.group = group
 
     async def send(self, event: dict) -> None:
-        await self._queue.put(event)
+        self.broker.dead_letter(self.topic, self.group, event)
+
+    async def send_delayed(self, event: dict, delay: float) -> None:
+        # Dead letters não são consumidos por prazo: o atraso não muda nada.
+        await self.send(event)
 
     async def receive(self) -> dict:
-        try:
-            return await asyncio.wait_for(self._queue.get(), timeout=1)
-        except asyncio.TimeoutError:
-            return {}
+        body = self.broker.pop_dead_letter(self.topic, self.group)
+        return {"body": body, "receipt": None} if body is not None else {}
 
     async def ack(self, message_id: str) -> None:
-        pass  # No-op
+        return None
 
     async def nack(self, message_id: str) -> None:
-        pass  # No-op
+        return None
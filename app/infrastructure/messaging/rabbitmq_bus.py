@@ -1,47 +1,194 @@
-from app.infrastructure.logging.logger import configure_logger
+from app.infrastructure.messaging.codec import CodecError, MessageCodec
+from app.infrastructure.logging.logger import get_logger
 from app.application.ports import MessageBus
-from app.config.settings import Settings
+from typing import AsyncIterator
 import aio_pika
-import json
+import asyncio
+import math
 
-settings = Settings()
-logger = configure_logger(settings.LOG_LEVEL)
+logger = get_logger()
+
+
+def _delay_bucket(delay: float) -> int:
+    """Menor potência de 2 (em segundos, mínimo 1) que cobre o atraso."""
+    return 1 << max(math.ceil(delay) - 1, 0).bit_length()
 
 
 class RabbitMQMessageBus(MessageBus):
-    def __init__(self, url: str | None = None, queue_name: str = "events"):
+    """Adapter RabbitMQ com consumidor persistente e publisher confirms.
+
+    O consumidor é registrado uma única vez com `basic_qos(prefetch_count)`; as
+    mensagens ficam sem ack até o chamador confirmar com `ack`/`nack` usando o
+    `receipt` retornado por `receive`. Envios com atraso vão para filas de
+    espera (TTL + dead-letter de volta para a fila principal). Mensagens que
+    não decodificam são copiadas cruas para `dead_letter_queue` antes do
+    reject; sem ela, o reject as descarta.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        queue_name: str = "events",
+        prefetch_count: int = 100,
+        publish_batch_size: int = 100,
+        codec: MessageCodec | None = None,
+        dead_letter_queue: str | None = None,
+    ):
         self.url = url
         self.queue_name = queue_name
+        self.prefetch_count = prefetch_count
+        self.publish_batch_size = max(publish_batch_size, 1)
+        self.codec = codec or MessageCodec()
+        self.dead_letter_queue = dead_letter_queue
         self._conn = None
         self._channel = None
         self._queue = None
+        self._connect_lock = asyncio.Lock()
+        self._incoming: asyncio.Queue | None = None
+        self._consumer_tag: str | None = None
+        self._delay_queues: dict[int, str] = {}
+        self._dead_letter_declared = False
 
     async def _connect(self):
-        if not self._conn:
-            self._conn = await aio_pika.connect_robust(self.url)
-            self._channel = await self._conn.channel()
-            self._queue = await self._channel.declare_queue(
-                self.queue_name, durable=True
-            )
+        if self._conn:
+            return
+        async with self._connect_lock:
+            if not self._conn:
+                conn = await aio_pika.connect_robust(self.url)
+                self._channel = await conn.channel(publisher_confirms=True)
+                await self._channel.set_qos(prefetch_count=self.prefetch_count)
+                self._queue = await self._channel.declare_queue(
+                    self.queue_name, durable=True
+                )
+                self._conn = conn
+
+    async def _ensure_consumer(self) -> asyncio.Queue:
+        await self._connect()
+        if self._consumer_tag is None:
+            self._incoming = asyncio.Queue()
+            self._consumer_tag = await self._queue.consume(self._incoming.put, no_ack=False)
+        return self._incoming
+
+    def _message(self, event: dict) -> aio_pika.Message:
+        envelope = self.codec.encode(event)
+        return aio_pika.Message(
+            body=envelope.body,
+            headers=envelope.headers,
+            content_type=envelope.content_type,
+            content_encoding=envelope.content_encoding,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
 
     async def send(self, event: dict) -> None:
         await self._connect()
         await self._channel.default_exchange.publish(
-            aio_pika.Message(body=json.dumps(event).encode()),
-            routing_key=self.queue_name,
+            self._message(event), routing_key=self.queue_name
         )
 
-    async def receive(self) -> dict:
+    async def send_delayed(self, event: dict, delay: float) -> None:
+        """Publica numa fila de espera cujo TTL devolve a mensagem à fila principal.
+
+        Há uma fila por faixa de atraso (potências de 2, em segundos) e todas as
+        mensagens de uma fila têm o mesmo TTL: expiram na ordem de chegada, sem
+        uma mensagem longa segurar as curtas atrás dela. O atraso real é o da
+        faixa, até o dobro do pedido.
+        """
         await self._connect()
-        queue = await self._channel.declare_queue(self.queue_name, durable=True)
-        async with queue.iterator() as queue_iter:
-            async for message in queue_iter:
-                async with message.process():
-                    try:
-                        return {"body": json.loads(message.body.decode())}
-                    except json.JSONDecodeError:
-                        logger.error("Mensagem inválida na fila", body=message.body)
-                        continue
+        queue_name = await self._delay_queue(_delay_bucket(delay))
+        await self._channel.default_exchange.publish(
+            self._message(event), routing_key=queue_name
+        )
+
+    async def _delay_queue(self, seconds: int) -> str:
+        if seconds not in self._delay_queues:
+            name = f"{self.queue_name}.delay.{seconds}s"
+            await self._channel.declare_queue(
+                name,
+                durable=True,
+                arguments={
+                    "x-message-ttl": seconds * 1000,
+                    "x-dead-letter-exchange": "",
+                    "x-dead-letter-routing-key": self.queue_name,
+                },
+            )
+            self._delay_queues[seconds] = name
+        return self._delay_queues[seconds]
+
+    async def send_many(self, events: list[dict]) -> list[dict]:
+        """Publica em janelas concorrentes e aguarda os confirms de cada janela."""
+        await self._connect()
+        exchange = self._channel.default_exchange
+        failed: list[dict] = []
+        for start in range(0, len(events), self.publish_batch_size):
+            chunk = events[start : start + self.publish_batch_size]
+            results = await asyncio.gather(
+                *(
+                    exchange.publish(self._message(event), routing_key=self.queue_name)
+                    for event in chunk
+                ),
+                return_exceptions=True,
+            )
+            for event, result in zip(chunk, results):
+                if isinstance(result, BaseException):
+                    logger.error("Publicação não confirmada", error=str(result))
+                    failed.append(event)
+        return failed
+
+    async def receive(self) -> dict:
+        incoming = await self._ensure_consumer()
+        while True:
+            message = await incoming.get()
+            decoded = await self._decode(message)
+            if decoded is not None:
+                return decoded
+
+    async def receive_many(self, max_messages: int = 10) -> list[dict]:
+        incoming = await self._ensure_consumer()
+        batch = [await self.receive()]
+        while len(batch) < max_messages and not incoming.empty():
+            decoded = await self._decode(incoming.get_nowait())
+            if decoded is not None:
+                batch.append(decoded)
+        return batch
+
+    async def consume(self) -> AsyncIterator[dict]:
+        """Itera indefinidamente sobre as mensagens do consumidor persistente."""
+        while True:
+            yield await self.receive()
+
+    async def _decode(self, message) -> dict | None:
+        # Só o envelope é validado aqui; o payload é decodificado sob demanda.
+        try:
+            body = self.codec.decode(message.body, getattr(message, "headers", None))
+        except CodecError as e:
+            logger.error("Mensagem inválida na fila", body=message.body, error=str(e))
+            if self.dead_letter_queue:
+                try:
+                    await self._dead_letter_raw(message, str(e))
+                except Exception as publish_error:
+                    # Sem cópia na DLQ, a mensagem não pode sair da fila.
+                    logger.error("Erro ao enviar mensagem para a DLQ", error=str(publish_error))
+                    await message.nack(requeue=True)
+                    return None
+            await message.reject(requeue=False)
+            return None
+        return {"body": body, "receipt": message, "message_id": message.message_id}
+
+    async def _dead_letter_raw(self, message, error: str) -> None:
+        """Copia a mensagem como chegou (corpo e cabeçalhos) para a DLQ."""
+        if not self._dead_letter_declared:
+            await self._channel.declare_queue(self.dead_letter_queue, durable=True)
+            self._dead_letter_declared = True
+        await self._channel.default_exchange.publish(
+            aio_pika.Message(
+                body=message.body,
+                headers={**(getattr(message, "headers", None) or {}), "x-error": error},
+                content_type=getattr(message, "content_type", None),
+                content_encoding=getattr(message, "content_encoding", None),
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            ),
+            routing_key=self.dead_letter_queue,
+        )
 
     async def ack(self, message_id: str) -> None:
         # message_id is actually the message object
@@ -50,4 +197,17 @@ class RabbitMQMessageBus(MessageBus):
 
     async def nack(self, message_id: str) -> None:
         if hasattr(message_id, "nack"):
-            await message_id.nack()
+            await message_id.nack(requeue=True)
+
+    async def close(self) -> None:
+        # Mensagens sem ack voltam para a fila quando o canal fecha.
+        if self._consumer_tag is not None:
+            await self._queue.cancel(self._consumer_tag)
+            self._consumer_tag = None
+        if self._conn:
+            await self._conn.close()
+            self._conn = None
+            self._channel = None
+            self._queue = None
+            self._delay_queues.clear()
+            self._dead_letter_declared = False
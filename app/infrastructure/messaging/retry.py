@@ -0,0 +1,93 @@
+from app.infrastructure.messaging.codec import CodecError, LazyBody
+from app.infrastructure.logging.logger import get_logger
+from app.application.ports import MessageBus
+from typing import Mapping
+from dataclasses import dataclass
+import random
+
+logger = get_logger()
+
+# Campo do evento com o número de falhas já registradas.
+ATTEMPTS_FIELD = "attempts"
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff exponencial com equal jitter.
+
+    Metade do atraso é fixa e metade aleatória: espalha as retentativas de um
+    mesmo lote sem deixar o atraso chegar perto de zero.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 300.0
+
+    def delay(self, attempt: int, rand=random.random) -> float:
+        cap = min(self.max_delay, self.base_delay * 2 ** max(attempt - 1, 0))
+        return cap / 2 + rand() * cap / 2
+
+
+class RetryScheduler:
+    """Republica eventos que falharam com atraso, ou os manda para a DLQ.
+
+    O número de tentativas viaja no próprio evento (`attempts`). O atraso fica
+    no broker (`send_delayed`): `handle_failure` só retorna True depois que a
+    retentativa foi confirmada, então a original pode receber ack sem que uma
+    queda do processo perca o evento. Ao atingir `policy.max_attempts`, o
+    evento vai para `dead_letter_bus`. Sem DLQ, a falha final fica com o
+    broker (nack).
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        dead_letter_bus: MessageBus | None = None,
+        policy: RetryPolicy | None = None,
+        rand=random.random,
+    ):
+        self.bus = bus
+        self.dead_letter_bus = dead_letter_bus
+        self.policy = policy or RetryPolicy()
+        self._rand = rand
+
+    async def handle_failure(self, msg: dict, error: str) -> bool:
+        """Republica com atraso ou envia para a DLQ; False se o broker deve ficar com ela.
+
+        Erros de publicação sobem para quem chamou, que deve dar nack na original.
+        """
+        body = msg.get("body")
+        if not isinstance(body, Mapping):
+            return False
+        try:
+            event = dict(body)
+        except CodecError as e:
+            # Payload corrompido não melhora com retentativa: vai direto para a DLQ,
+            # com o que os cabeçalhos dizem do evento.
+            fields = body.header_fields() if isinstance(body, LazyBody) else {}
+            return await self._dead_letter(fields, None, f"{error}; {e}")
+        attempts = int(event.get(ATTEMPTS_FIELD) or 0) + 1
+        if attempts < self.policy.max_attempts:
+            await self.bus.send_delayed(
+                {**event, ATTEMPTS_FIELD: attempts}, self.policy.delay(attempts, self._rand)
+            )
+            return True
+        return await self._dead_letter(event, attempts, error)
+
+    async def _dead_letter(self, event: dict, attempts: int | None, error: str) -> bool:
+        if self.dead_letter_bus is None:
+            return False
+        if attempts is not None:
+            event = {**event, ATTEMPTS_FIELD: attempts}
+        await self.dead_letter_bus.send({**event, "error": error})
+        logger.warning(
+            "Evento enviado para a DLQ",
+            item_id=event.get("item_id"),
+            attempts=attempts,
+            error=error,
+        )
+        return True
+
+    async def close(self) -> None:
+        if self.dead_letter_bus is not None:
+            await self.dead_letter_bus.close()
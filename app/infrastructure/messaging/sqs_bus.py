@@ -1,31 +1,238 @@
+from app.infrastructure.messaging.codec import (
+    attributes_from_headers,
+    headers_from_attributes,
+    MessageCodec,
+    CodecError,
+)
+from app.infrastructure.logging.logger import get_logger
 from app.application.ports import MessageBus
+from contextlib import AsyncExitStack
+from collections import deque
+from typing import Any
 import aioboto3
+import asyncio
+import math
 import os
 
+logger = get_logger()
+
+# Limites da API do SQS por chamada.
+MAX_BATCH_SIZE = 10
+MAX_WAIT_TIME_SECONDS = 20
+MAX_DELAY_SECONDS = 900
+
+
+def _chunks(items: list, size: int = MAX_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
 
 class SqsMessageBus(MessageBus):
-    def __init__(self, queue_url: str | None = None):
+    """Adapter SQS com cliente persistente, long polling e operações em lote.
+
+    O cliente é aberto na primeira chamada e reaproveitado até `close()`. Para
+    testes, um cliente compatível (stub) pode ser injetado via `client`.
+    """
+
+    def __init__(
+        self,
+        queue_url: str | None = None,
+        client: Any = None,
+        endpoint_url: str | None = None,
+        region_name: str | None = None,
+        wait_time_seconds: int = MAX_WAIT_TIME_SECONDS,
+        max_messages: int = MAX_BATCH_SIZE,
+        visibility_timeout: int | None = None,
+        ack_flush_interval: float = 0.05,
+        batch_retries: int = 2,
+        codec: MessageCodec | None = None,
+    ):
         self.queue_url = queue_url or os.getenv("SQS_QUEUE_URL")
+        self.endpoint_url = endpoint_url or None
+        self.region_name = region_name or None
+        self.wait_time_seconds = min(max(wait_time_seconds, 0), MAX_WAIT_TIME_SECONDS)
+        self.max_messages = min(max(max_messages, 1), MAX_BATCH_SIZE)
+        self.visibility_timeout = visibility_timeout
+        self.ack_flush_interval = ack_flush_interval
+        self.batch_retries = batch_retries
+        self.codec = codec or MessageCodec()
+        self._client = client
+        self._stack: AsyncExitStack | None = None
+        self._client_lock = asyncio.Lock()
+        self._received: deque[dict] = deque()
+        self._pending_acks: list[tuple[str, asyncio.Future]] = []
+        self._ack_timer: asyncio.Task | None = None
+
+    async def _get_client(self):
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    stack = AsyncExitStack()
+                    self._client = await stack.enter_async_context(
+                        aioboto3.Session().client(
+                            "sqs",
+                            endpoint_url=self.endpoint_url,
+                            region_name=self.region_name,
+                        )
+                    )
+                    self._stack = stack
+        return self._client
+
+    async def close(self) -> None:
+        if self._ack_timer is not None:
+            self._ack_timer.cancel()
+            self._ack_timer = None
+        await self._flush_acks()
+        if self._stack is not None:
+            await self._stack.aclose()
+            self._stack = None
+            self._client = None
 
     async def send(self, event: dict) -> None:
-        session = aioboto3.Session()
-        async with session.client("sqs") as client:
-            await client.send_message(QueueUrl=self.queue_url, MessageBody=str(event))
+        client = await self._get_client()
+        await client.send_message(QueueUrl=self.queue_url, **self._entry(event))
+
+    async def send_delayed(self, event: dict, delay: float) -> None:
+        """DelaySeconds do SQS: inteiro e no máximo 15 minutos."""
+        client = await self._get_client()
+        await client.send_message(
+            QueueUrl=self.queue_url,
+            DelaySeconds=min(max(math.ceil(delay), 0), MAX_DELAY_SECONDS),
+            **self._entry(event),
+        )
+
+    def _entry(self, event: dict) -> dict:
+        envelope = self.codec.encode_text(event)
+        return {
+            "MessageBody": envelope.body,
+            "MessageAttributes": attributes_from_headers(envelope.headers),
+        }
+
+    async def send_many(self, events: list[dict]) -> list[dict]:
+        """Publica em lotes de até 10; reenvia falhas transitórias e retorna o resto."""
+        client = await self._get_client()
+        failed: list[dict] = []
+        for chunk in _chunks(events):
+            entries = {
+                str(i): {"Id": str(i), **self._entry(event)}
+                for i, event in enumerate(chunk)
+            }
+            for attempt in range(self.batch_retries + 1):
+                response = await client.send_message_batch(
+                    QueueUrl=self.queue_url, Entries=list(entries.values())
+                )
+                retry = {}
+                for failure in response.get("Failed", []):
+                    entry_id = failure["Id"]
+                    if failure.get("SenderFault") or attempt == self.batch_retries:
+                        logger.error(
+                            "Falha ao publicar mensagem no SQS",
+                            code=failure.get("Code"),
+                            error=failure.get("Message"),
+                        )
+                        failed.append(chunk[int(entry_id)])
+                    else:
+                        retry[entry_id] = entries[entry_id]
+                if not retry:
+                    break
+                entries = retry
+        return failed
+
+    async def receive_many(
+        self, max_messages: int | None = None, wait_time_seconds: int | None = None
+    ) -> list[dict]:
+        client = await self._get_client()
+        params: dict[str, Any] = {
+            "QueueUrl": self.queue_url,
+            "MaxNumberOfMessages": min(max_messages or self.max_messages, MAX_BATCH_SIZE),
+            "MessageAttributeNames": ["All"],
+            "WaitTimeSeconds": (
+                self.wait_time_seconds if wait_time_seconds is None else wait_time_seconds
+            ),
+        }
+        if self.visibility_timeout:
+            params["VisibilityTimeout"] = self.visibility_timeout
+        response = await client.receive_message(**params)
+        return [self._to_message(raw) for raw in response.get("Messages", [])]
 
     async def receive(self) -> dict:
-        session = aioboto3.Session()
-        async with session.client("sqs") as client:
-            response = await client.receive_message(
-                QueueUrl=self.queue_url, MaxNumberOfMessages=1, WaitTimeSeconds=1
+        if not self._received:
+            self._received.extend(await self.receive_many())
+        return self._received.popleft() if self._received else {}
+
+    def _to_message(self, raw: dict) -> dict:
+        """Mensagem no formato da porta; sem decodificar, leva o corpo cru e `error`.
+
+        O consumidor deve dar nack numa mensagem com `error`, para que o redrive
+        da fila a leve para a DLQ em vez de apagá-la.
+        """
+        message = {"receipt": raw.get("ReceiptHandle"), "message_id": raw.get("MessageId")}
+        try:
+            message["body"] = self.codec.decode(
+                raw["Body"], headers_from_attributes(raw.get("MessageAttributes"))
             )
-            return response.get("Messages", [{}])[0]
+        except (KeyError, CodecError) as e:
+            logger.error(
+                "Mensagem inválida na fila", message_id=raw.get("MessageId"), error=str(e)
+            )
+            message["body"] = raw.get("Body")
+            message["error"] = str(e)
+        return message
 
     async def ack(self, message_id: str) -> None:
-        session = aioboto3.Session()
-        async with session.client("sqs") as client:
-            await client.delete_message(
-                QueueUrl=self.queue_url, ReceiptHandle=message_id
+        """Agrupa acks concorrentes em um único DeleteMessageBatch."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending_acks.append((message_id, future))
+        if len(self._pending_acks) >= MAX_BATCH_SIZE:
+            await self._flush_acks()
+        elif self._ack_timer is None:
+            self._ack_timer = asyncio.create_task(self._flush_acks_later())
+        await future
+
+    async def _flush_acks_later(self) -> None:
+        await asyncio.sleep(self.ack_flush_interval)
+        self._ack_timer = None
+        await self._flush_acks()
+
+    async def _flush_acks(self) -> None:
+        pending, self._pending_acks = self._pending_acks, []
+        if not pending:
+            return
+        try:
+            failed = set(await self.ack_many([receipt for receipt, _ in pending]))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for receipt, future in pending:
+            if future.done():
+                continue
+            if receipt in failed:
+                future.set_exception(RuntimeError("Falha ao remover mensagem do SQS"))
+            else:
+                future.set_result(None)
+
+    async def ack_many(self, message_ids: list[str]) -> list[str]:
+        """Remove em lotes de até 10; retorna os receipts que falharam."""
+        client = await self._get_client()
+        failed: list[str] = []
+        for chunk in _chunks(message_ids):
+            response = await client.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": str(i), "ReceiptHandle": receipt}
+                    for i, receipt in enumerate(chunk)
+                ],
             )
+            for failure in response.get("Failed", []):
+                logger.error(
+                    "Falha ao remover mensagem do SQS",
+                    code=failure.get("Code"),
+                    error=failure.get("Message"),
+                )
+                failed.append(chunk[int(failure["Id"])])
+        return failed
 
     async def nack(self, message_id: str) -> None:
         # SQS: nack = do nothing (message will be retried)
@@ -0,0 +1,179 @@
+from app.application.ports import ExternalApiClient, MessageBus, Outbox, Repository, UnitOfWork
+from app.infrastructure.observability.tracing import SpanContext, extract, inject, tracer
+from app.infrastructure.observability.metrics import registry
+from contextlib import contextmanager
+from typing import Any, Optional
+import time
+
+OPERATION_SECONDS = registry.histogram(
+    "app_operation_duration_seconds",
+    "Duração das chamadas por componente e operação.",
+    ("component", "operation", "status"),
+)
+OPERATIONS_TOTAL = registry.counter(
+    "app_operations_total",
+    "Chamadas por componente, operação e resultado.",
+    ("component", "operation", "status"),
+)
+
+
+@contextmanager
+def observe(component: str, operation: str, parent: Optional[SpanContext] = None, **attributes):
+    """Span + histograma de latência + contador para uma chamada."""
+    status = "ok"
+    start = time.perf_counter()
+    try:
+        with tracer.start_span(f"{component}.{operation}", parent=parent, **attributes) as span:
+            yield span
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        OPERATION_SECONDS.observe(time.perf_counter() - start, component, operation, status)
+        OPERATIONS_TOTAL.inc(component, operation, status)
+
+
+class InstrumentedRepository(Repository):
+    def __init__(self, inner: Repository):
+        self.inner = inner
+
+    async def get(self, id: str):
+        with observe("repository", "get"):
+            return await self.inner.get(id)
+
+    async def get_many(self, ids: list[str]):
+        with observe("repository", "get_many", count=len(ids)):
+            return await self.inner.get_many(ids)
+
+    async def save(self, obj) -> None:
+        with observe("repository", "save"):
+            await self.inner.save(obj)
+
+    async def save_many(self, objs: list) -> None:
+        with observe("repository", "save_many", count=len(objs)):
+            await self.inner.save_many(objs)
+
+
+class TracingOutbox(Outbox):
+    """Grava o `traceparent` no evento para o relay propagar o trace."""
+
+    def __init__(self, inner: Outbox):
+        self.inner = inner
+
+    async def add(self, event: dict) -> None:
+        await self.inner.add(inject(event))
+
+
+class InstrumentedUnitOfWork(UnitOfWork):
+    """Mede as leituras e escritas de item e o commit (onde ocorre o flush)."""
+
+    def __init__(self, inner: UnitOfWork):
+        self.inner = inner
+
+    async def __aenter__(self) -> "InstrumentedUnitOfWork":
+        await self.inner.__aenter__()
+        self.items = InstrumentedRepository(self.inner.items)
+        self.outbox = TracingOutbox(self.inner.outbox)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.inner.__aexit__(exc_type, exc, tb)
+
+    async def flush(self) -> None:
+        with observe("uow", "flush"):
+            await self.inner.flush()
+
+    async def commit(self) -> None:
+        with observe("uow", "commit"):
+            await self.inner.commit()
+
+    async def rollback(self) -> None:
+        with observe("uow", "rollback"):
+            await self.inner.rollback()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+
+class InstrumentedMessageBus(MessageBus):
+    """Mede as chamadas ao broker e propaga o trace no corpo dos eventos."""
+
+    def __init__(self, inner: MessageBus):
+        self.inner = inner
+
+    async def send(self, event: dict) -> None:
+        with observe("bus", "send"):
+            await self.inner.send(inject(event))
+
+    async def send_many(self, events: list[dict]) -> list[dict]:
+        with observe("bus", "send_many", count=len(events)):
+            traced = [inject(event) for event in events]
+            failed_ids = {id(event) for event in await self.inner.send_many(traced)}
+            # Quem chamou identifica as falhas pelos objetos originais.
+            return [event for event, sent in zip(events, traced) if id(sent) in failed_ids]
+
+    async def send_delayed(self, event: dict, delay: float) -> None:
+        with observe("bus", "send_delayed"):
+            await self.inner.send_delayed(inject(event), delay)
+
+    async def receive(self) -> dict:
+        with observe("bus", "receive"):
+            return await self.inner.receive()
+
+    async def receive_many(self, max_messages: int = 10) -> list[dict]:
+        with observe("bus", "receive_many"):
+            return await self.inner.receive_many(max_messages)
+
+    async def ack(self, message_id: str) -> None:
+        with observe("bus", "ack"):
+            await self.inner.ack(message_id)
+
+    async def ack_many(self, message_ids: list[str]) -> list[str]:
+        with observe("bus", "ack_many", count=len(message_ids)):
+            return await self.inner.ack_many(message_ids)
+
+    async def nack(self, message_id: str) -> None:
+        with observe("bus", "nack"):
+            await self.inner.nack(message_id)
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+
+class InstrumentedExternalApi(ExternalApiClient):
+    def __init__(self, inner: ExternalApiClient):
+        self.inner = inner
+
+    async def get(self, path: str, params: dict | None = None) -> Any:
+        with observe("external_api", "get", path=path):
+            return await self.inner.get(path, params)
+
+    async def post(self, path: str, data: dict) -> Any:
+        with observe("external_api", "post", path=path):
+            return await self.inner.post(path, data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+
+class InstrumentedUseCase:
+    """Envolve `execute`/`execute_many` em um span raiz do caso de uso.
+
+    Com `carrier` (o corpo da mensagem), o span continua o trace do produtor.
+    """
+
+    def __init__(self, inner, carrier: dict | None = None):
+        self.inner = inner
+        self.name = type(inner).__name__
+        self.parent = extract(carrier)
+
+    async def execute(self, *args, **kwargs):
+        with observe("use_case", self.name, parent=self.parent):
+            return await self.inner.execute(*args, **kwargs)
+
+    async def execute_many(self, *args, **kwargs):
+        with observe("use_case", f"{self.name}.many", parent=self.parent):
+            return await self.inner.execute_many(*args, **kwargs)
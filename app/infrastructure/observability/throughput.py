@@ -0,0 +1,76 @@
+from app.infrastructure.observability.metrics import registry
+from app.infrastructure.logging.logger import get_logger
+from typing import Any
+import asyncio
+import math
+import time
+
+logger = get_logger()
+
+# O lag fim a fim vai de milissegundos a minutos quando a fila acumula.
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_lag = registry.histogram(
+    "worker_end_to_end_lag_seconds",
+    "Tempo entre o produced_at do produtor e o fim do processamento",
+    buckets=LAG_BUCKETS,
+)
+_processed = registry.counter("worker_messages_processed_total", "Mensagens processadas")
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * q / 100), len(sorted_values) - 1)]
+
+
+class ThroughputRecorder:
+    """Vazão e lag fim a fim do consumidor, agregados por janela.
+
+    O lag usa o `produced_at` (epoch, segundos) carimbado pelo produtor, então
+    depende dos relógios de produtor e consumidor estarem sincronizados.
+    """
+
+    def __init__(self, interval: float = 10.0, clock=time.time):
+        self.interval = interval
+        self._clock = clock
+        self.total = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._window_start = self._clock()
+        self._count = 0
+        self._lags: list[float] = []
+
+    def record(self, produced_at: Any = None) -> None:
+        self.total += 1
+        self._count += 1
+        _processed.inc()
+        if (
+            isinstance(produced_at, (int, float))
+            and not isinstance(produced_at, bool)
+            and math.isfinite(produced_at)
+        ):
+            lag = max(self._clock() - produced_at, 0.0)
+            self._lags.append(lag)
+            _lag.observe(lag)
+
+    def snapshot(self) -> dict:
+        """Resumo da janela atual; abre uma nova."""
+        elapsed = max(self._clock() - self._window_start, 1e-9)
+        lags = sorted(self._lags)
+        summary = {
+            "processed": self._count,
+            "total": self.total,
+            "throughput": round(self._count / elapsed, 2),
+            "lag_p50_ms": round(_percentile(lags, 50) * 1000, 2),
+            "lag_p99_ms": round(_percentile(lags, 99) * 1000, 2),
+            "lag_max_ms": round(lags[-1] * 1000, 2) if lags else 0.0,
+        }
+        self._reset()
+        return summary
+
+    async def report_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            logger.info("Vazão do worker", **self.snapshot())
@@ -0,0 +1,122 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from contextlib import contextmanager
+from typing import Iterator, Mapping, Optional
+import random
+import time
+import re
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float = field(default_factory=time.perf_counter)
+    end: Optional[float] = None
+    attributes: dict = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def inject(carrier: dict) -> dict:
+    """Cópia do carrier com o `traceparent` do span atual (W3C Trace Context)."""
+    span = _current_span.get()
+    if span is None:
+        return carrier
+    return {**carrier, TRACEPARENT: span.traceparent}
+
+
+def extract(carrier: dict | None) -> Optional[SpanContext]:
+    try:
+        value = carrier.get(TRACEPARENT) if isinstance(carrier, Mapping) else None
+    except ValueError:
+        # Corpo lazy com payload inválido (CodecError): segue sem trace do produtor.
+        value = None
+    match = _TRACEPARENT_RE.match(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    return SpanContext(trace_id=match.group(1), span_id=match.group(2))
+
+
+class InMemorySpanExporter:
+    """Guarda os spans finalizados; usado em testes e diagnóstico local."""
+
+    def __init__(self, maxlen: int = 10_000):
+        self.maxlen = maxlen
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+        if len(self.spans) > self.maxlen:
+            del self.spans[: len(self.spans) - self.maxlen]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class Tracer:
+    """Cria spans encadeados via contextvars e repassa os finalizados aos exporters."""
+
+    def __init__(self):
+        self.exporters: list = []
+
+    def add_exporter(self, exporter) -> None:
+        self.exporters.append(exporter)
+
+    def remove_exporter(self, exporter) -> None:
+        if exporter in self.exporters:
+            self.exporters.remove(exporter)
+
+    @contextmanager
+    def start_span(
+        self, name: str, parent: Optional[SpanContext] = None, **attributes
+    ) -> Iterator[Span]:
+        if parent is None:
+            parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else f"{random.getrandbits(128):032x}",
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = str(e)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current_span.reset(token)
+            for exporter in self.exporters:
+                exporter.export(span)
+
+
+tracer = Tracer()
@@ -0,0 +1,51 @@
+from app.infrastructure.cache import MISS, TTLCache
+from app.application.ports import Repository
+from app.domain.entities import Item
+from typing import Optional
+
+
+class CachingRepository(Repository[Item]):
+    """Decorator read-through sobre um Repository de Item.
+
+    Leituras consultam o cache antes do banco; ids inexistentes também são
+    guardados (cache negativo, com `negative_ttl`). Saves invalidam as chaves
+    escritas em vez de repovoá-las, já que a transação ainda pode ser desfeita.
+    """
+
+    def __init__(self, inner: Repository[Item], cache: TTLCache, negative_ttl: float = 5.0):
+        self.inner = inner
+        self.cache = cache
+        self.negative_ttl = negative_ttl
+
+    async def get(self, id: str) -> Optional[Item]:
+        cached = self.cache.get(id)
+        if cached is not MISS:
+            return cached
+        item = await self.inner.get(id)
+        self.cache.set(id, item, None if item else self.negative_ttl)
+        return item
+
+    async def get_many(self, ids: list[str]) -> list[Item]:
+        items: list[Item] = []
+        missing: list[str] = []
+        for id in dict.fromkeys(ids):
+            cached = self.cache.get(id)
+            if cached is MISS:
+                missing.append(id)
+            elif cached is not None:
+                items.append(cached)
+        if missing:
+            loaded = {item.id: item for item in await self.inner.get_many(missing)}
+            for id in missing:
+                item = loaded.get(id)
+                self.cache.set(id, item, None if item else self.negative_ttl)
+            items.extend(loaded.values())
+        return items
+
+    async def save(self, obj: Item) -> None:
+        await self.inner.save(obj)
+        self.cache.invalidate(obj.id)
+
+    async def save_many(self, objs: list[Item]) -> None:
+        await self.inner.save_many(objs)
+        self.cache.invalidate_many(obj.id for obj in objs)
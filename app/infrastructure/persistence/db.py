@@ -1,9 +1,87 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 from typing import AsyncGenerator, Optional
 from sqlalchemy.orm import sessionmaker
-from typing import Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy import exc
+from app.config.settings import Settings, get_settings
+from dataclasses import dataclass
 from .models import Base
-import os
+import time
+
+
+@dataclass
+class PoolStats:
+    """Tempos de espera no checkout de conexões do pool."""
+
+    checkouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    timeouts: int = 0
+
+    def record(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+    def as_dict(self) -> dict:
+        avg = self.total_wait / self.checkouts if self.checkouts else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": avg * 1000,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Pool assíncrono que mede o tempo de espera de cada checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+_engines: dict[str, AsyncEngine] = {}
+_session_makers: dict[str, sessionmaker] = {}
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def _engine_options(url: str, settings: Settings) -> dict:
+    options: dict = {"echo": settings.DB_ECHO}
+    if _is_sqlite_memory(url):
+        # Banco em memória só existe dentro de uma conexão: compartilha a mesma.
+        options["poolclass"] = StaticPool
+        return options
+    options.update(
+        poolclass=TimedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
 
 
 async def init_db(db_url: Optional[str] = None):
@@ -12,22 +90,33 @@ async def init_db(db_url: Optional[str] = None):
         await conn.run_sync(Base.metadata.create_all)
 
 
-def get_engine(db_url: Optional[str] = None) -> AsyncEngine:
-    url = db_url or os.getenv(
-        "DB_URL", "postgresql+asyncpg://postgres:postgres@db:5432/postgres"
-    )
-    return create_async_engine(url, echo=True, future=True)
+def get_engine(
+    db_url: Optional[str] = None, settings: Optional[Settings] = None
+) -> AsyncEngine:
+    """Retorna o engine do processo para a URL, criando-o na primeira chamada."""
+    settings = settings or get_settings()
+    url = db_url or settings.DB_URL
+    engine = _engines.get(url)
+    if engine is None:
+        engine = create_async_engine(url, **_engine_options(url, settings))
+        _engines[url] = engine
+    return engine
 
 
-def get_session_local(db_url: Optional[str] = None):
-    engine = get_engine(db_url)
-    return sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autoflush=False,
-        autocommit=False,
-    )
+def get_session_local(db_url: Optional[str] = None, settings: Optional[Settings] = None):
+    settings = settings or get_settings()
+    url = db_url or settings.DB_URL
+    session_local = _session_makers.get(url)
+    if session_local is None:
+        session_local = sessionmaker(
+            bind=get_engine(url, settings),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+            autocommit=False,
+        )
+        _session_makers[url] = session_local
+    return session_local
 
 
 async def get_session(
@@ -36,3 +125,27 @@ async def get_session(
     SessionLocal = get_session_local(db_url)
     async with SessionLocal() as session:
         yield session
+
+
+def get_pool_stats() -> dict[str, dict]:
+    """Estatísticas de checkout por URL de banco (somente pools com fila)."""
+    stats = {}
+    for engine in _engines.values():
+        pool = engine.sync_engine.pool
+        if isinstance(pool, TimedAsyncQueuePool):
+            stats[engine.url.render_as_string(hide_password=True)] = {
+                **pool.stats.as_dict(),
+                "checked_out": pool.checkedout(),
+                "size": pool.size(),
+                "overflow": pool.overflow(),
+            }
+    return stats
+
+
+async def dispose_engines() -> None:
+    """Fecha todos os pools do processo; usado no desligamento."""
+    engines = list(_engines.values())
+    _engines.clear()
+    _session_makers.clear()
+    for engine in engines:
+        await engine.dispose()
@@ -0,0 +1,79 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timedelta, timezone
+from app.infrastructure.cache import MISS, TTLCache
+from app.application.ports import ProcessedMessages
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import ProcessedMessageModel
+from sqlalchemy import delete, select
+from typing import Callable
+
+_INSERT_DIALECTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+class SqlAlchemyProcessedMessages(ProcessedMessages):
+    """Acumula as chaves processadas e as grava no flush da transação."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._pending: set[str] = set()
+
+    async def add(self, key: str) -> None:
+        self._pending.add(key)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        keys, self._pending = list(self._pending), set()
+        insert = _INSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+        if insert is None:
+            for key in keys:
+                await self.session.merge(ProcessedMessageModel(key=key))
+            return
+        now = datetime.now(timezone.utc)
+        await self.session.execute(
+            insert(ProcessedMessageModel)
+            .values([{"key": key, "processed_at": now} for key in keys])
+            .on_conflict_do_nothing(index_elements=[ProcessedMessageModel.key])
+        )
+
+    def discard(self) -> None:
+        self._pending.clear()
+
+
+class IdempotencyStore:
+    """Pré-checagem de mensagens já processadas.
+
+    O caminho rápido é um LRU/TTL do processo; na falta, consulta a tabela
+    `processed_messages` (que também pega o que outros workers processaram).
+    Só resultados positivos vão para o cache: uma chave ausente pode ser
+    gravada a qualquer momento por outro worker.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], cache: TTLCache):
+        self.session_factory = session_factory
+        self.cache = cache
+
+    async def seen(self, key: str) -> bool:
+        if self.cache.get(key) is not MISS:
+            return True
+        async with self.session_factory() as session:
+            found = await session.scalar(
+                select(ProcessedMessageModel.key).where(ProcessedMessageModel.key == key)
+            )
+        if found is not None:
+            self.cache.set(key, True)
+        return found is not None
+
+    def remember(self, key: str) -> None:
+        self.cache.set(key, True)
+
+    async def purge(self, retention: float) -> int:
+        """Remove chaves mais antigas que `retention` segundos."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=retention)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(ProcessedMessageModel).where(ProcessedMessageModel.processed_at < cutoff)
+            )
+            await session.commit()
+        return result.rowcount or 0
@@ -1,12 +1,16 @@
 from sqlalchemy.orm import Mapped, mapped_column, declarative_base
+from sqlalchemy import DateTime, Index, Integer, String, Text
 from app.domain.entities import Item, Status
-from sqlalchemy import String
+from datetime import datetime, timezone
 
 Base = declarative_base()
 
 
 class ItemModel(Base):
     __tablename__ = "items"
+    # Atende `WHERE status = ? AND id > ? ORDER BY id` (paginação por chave).
+    __table_args__ = (Index("ix_items_status_id", "status", "id"),)
+
     id: Mapped[str] = mapped_column(String(64), primary_key=True)
     name: Mapped[str] = mapped_column(String(128), nullable=False)
     status: Mapped[str] = mapped_column(String(32), nullable=False)
@@ -17,3 +21,29 @@ class ItemModel(Base):
     @staticmethod
     def from_entity(item: Item) -> "ItemModel":
         return ItemModel(id=item.id, name=item.name, status=str(item.status))
+
+
+class OutboxModel(Base):
+    """Evento pendente de publicação, gravado na mesma transação do item."""
+
+    __tablename__ = "outbox"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+
+class ProcessedMessageModel(Base):
+    """Chave (event_id ou message_id) de uma mensagem já processada."""
+
+    __tablename__ = "processed_messages"
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    processed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        default=lambda: datetime.now(timezone.utc),
+    )
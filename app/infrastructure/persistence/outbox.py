@@ -0,0 +1,98 @@
+from app.infrastructure.logging.logger import get_logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.application.ports import MessageBus, Outbox
+from sqlalchemy import delete, insert, select
+from typing import Callable
+from .models import OutboxModel
+import asyncio
+import json
+
+logger = get_logger()
+
+
+class SqlAlchemyOutbox(Outbox):
+    """Acumula eventos e os grava em um único INSERT no flush da transação."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._pending: list[dict] = []
+
+    async def add(self, event: dict) -> None:
+        self._pending.append(event)
+
+    async def flush(self) -> None:
+        if self._pending:
+            rows, self._pending = self._pending, []
+            await self.session.execute(
+                insert(OutboxModel), [{"payload": json.dumps(event)} for event in rows]
+            )
+
+    def discard(self) -> None:
+        self._pending.clear()
+
+
+class OutboxRelay:
+    """Drena a tabela de outbox em lotes e publica pelo MessageBus.
+
+    Cada lote é lido com `FOR UPDATE SKIP LOCKED` (ignorado no SQLite), para que
+    vários relays possam rodar em paralelo, publicado com `send_many` e removido
+    na mesma transação. Eventos que o broker rejeitou continuam na tabela para a
+    próxima rodada; a entrega é at-least-once.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        bus: MessageBus,
+        batch_size: int = 100,
+        poll_interval: float = 0.5,
+    ):
+        self.session_factory = session_factory
+        self.bus = bus
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def relay_once(self) -> int:
+        """Publica um lote; retorna quantos eventos saíram da tabela."""
+        async with self.session_factory() as session:
+            async with session.begin():
+                rows = (
+                    await session.execute(
+                        select(OutboxModel)
+                        .order_by(OutboxModel.id)
+                        .limit(self.batch_size)
+                        .with_for_update(skip_locked=True)
+                    )
+                ).scalars().all()
+                if not rows:
+                    return 0
+                events = [json.loads(row.payload) for row in rows]
+                failed = {id(event) for event in await self.bus.send_many(events)}
+                published = [
+                    row.id for row, event in zip(rows, events) if id(event) not in failed
+                ]
+                if published:
+                    await session.execute(
+                        delete(OutboxModel).where(OutboxModel.id.in_(published))
+                    )
+        if failed:
+            logger.warning("Eventos do outbox não publicados", count=len(failed))
+        return len(published)
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                published = await self.relay_once()
+            except Exception as e:
+                logger.error("Erro no relay do outbox", error=str(e))
+                published = 0
+            if published < self.batch_size:
+                # Tabela drenada (ou erro): espera antes de consultar de novo.
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
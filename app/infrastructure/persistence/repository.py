@@ -1,23 +1,114 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.application.ports import Repository
-from app.domain.entities import Item
+from app.domain.entities import Item, Status
+from typing import AsyncIterator, Optional
 from sqlalchemy import select
 from .models import ItemModel
-from typing import Optional
+
+# Limita o tamanho do IN (...) e do VALUES (...) por statement; o SQLite aceita no
+# máximo 999 parâmetros nas versões antigas.
+_SELECT_CHUNK = 500
+_UPSERT_CHUNK = 300
+
+_UPSERT_DIALECTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
 
 
 class ItemRepository(Repository[Item]):
     """Implementação do Repository para Item usando SQLAlchemy async."""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, autocommit: bool = True):
         self.session = session
+        self.autocommit = autocommit
 
     async def get(self, id: str) -> Optional[Item]:
-        result = await self.session.execute(select(ItemModel).where(ItemModel.id == id))
+        result = await self.session.execute(
+            select(ItemModel)
+            .where(ItemModel.id == id)
+            .execution_options(populate_existing=True)
+        )
         row = result.scalar_one_or_none()
         return row.to_entity() if row else None
 
+    async def get_many(self, ids: list[str]) -> list[Item]:
+        unique_ids = list(dict.fromkeys(ids))
+        items: list[Item] = []
+        for start in range(0, len(unique_ids), _SELECT_CHUNK):
+            chunk = unique_ids[start : start + _SELECT_CHUNK]
+            result = await self.session.execute(
+                select(ItemModel)
+                .where(ItemModel.id.in_(chunk))
+                .execution_options(populate_existing=True)
+            )
+            items.extend(row.to_entity() for row in result.scalars())
+        return items
+
+    async def iter_by_status(
+        self,
+        status: Status | str,
+        page_size: int = 1000,
+        after_id: Optional[str] = None,
+    ) -> AsyncIterator[Item]:
+        """Itera os itens de um status em ordem de id, uma página por consulta.
+
+        A paginação é por chave (`id > último id`), então cada página custa o
+        mesmo independente da posição e a leitura pode ser retomada com
+        `after_id`. Lê colunas em vez de entidades ORM para não acumular objetos
+        na sessão; com cursor no servidor, nem a página fica inteira na memória.
+        """
+        columns = (ItemModel.id, ItemModel.name, ItemModel.status)
+        server_side = self.session.get_bind().dialect.supports_server_side_cursors
+        last_id = after_id
+        while True:
+            stmt = select(*columns).where(ItemModel.status == str(status))
+            if last_id is not None:
+                stmt = stmt.where(ItemModel.id > last_id)
+            stmt = stmt.order_by(ItemModel.id).limit(page_size)
+            if server_side:
+                rows = await self.session.stream(
+                    stmt, execution_options={"yield_per": min(page_size, _SELECT_CHUNK)}
+                )
+            else:
+                rows = _aiter((await self.session.execute(stmt)).all())
+            count = 0
+            async for id, name, row_status in rows:
+                count += 1
+                last_id = id
+                yield Item(id=id, name=name, status=Status(row_status))
+            if count < page_size:
+                return
+
     async def save(self, obj: Item) -> None:
-        model = ItemModel.from_entity(obj)
-        await self.session.merge(model)
-        await self.session.commit()
+        await self.save_many([obj])
+
+    async def save_many(self, objs: list[Item]) -> None:
+        # Um mesmo id só pode aparecer uma vez por upsert: o último estado vence.
+        rows = {
+            obj.id: {"id": obj.id, "name": obj.name, "status": str(obj.status)}
+            for obj in objs
+        }
+        if not rows:
+            return
+        await self._upsert(list(rows.values()))
+        if self.autocommit:
+            await self.session.commit()
+
+    async def _upsert(self, rows: list[dict]) -> None:
+        insert = _UPSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+        if insert is None:
+            for row in rows:
+                await self.session.merge(ItemModel(**row))
+            return
+        for start in range(0, len(rows), _UPSERT_CHUNK):
+            stmt = insert(ItemModel).values(rows[start : start + _UPSERT_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ItemModel.id],
+                set_={"name": stmt.excluded.name, "status": stmt.excluded.status},
+            )
+            await self.session.execute(stmt)
+
+
+async def _aiter(rows):
+    for row in rows:
+        yield row
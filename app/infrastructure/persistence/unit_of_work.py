@@ -0,0 +1,123 @@
+from app.application.ports import Repository, UnitOfWork
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, Optional
+from app.domain.entities import Item
+from app.infrastructure.cache import TTLCache
+from .cache import CachingRepository
+from .write_behind import WriteBehindBuffer, WriteBehindRepository
+from .idempotency import SqlAlchemyProcessedMessages
+from .repository import ItemRepository
+from .outbox import SqlAlchemyOutbox
+
+
+class StagedItemRepository(Repository[Item]):
+    """Acumula os saves da unidade de trabalho até o próximo flush.
+
+    Vários saves do mesmo id viram um único upsert com o último estado, e as
+    leituras enxergam o que ainda está pendente.
+    """
+
+    def __init__(self, repo: Repository[Item]):
+        self._repo = repo
+        self._staged: dict[str, Item] = {}
+        self.flushed_ids: set[str] = set()
+
+    async def get(self, id: str) -> Optional[Item]:
+        if id in self._staged:
+            return self._staged[id]
+        return await self._repo.get(id)
+
+    async def get_many(self, ids: list[str]) -> list[Item]:
+        staged = [self._staged[id] for id in dict.fromkeys(ids) if id in self._staged]
+        missing = [id for id in ids if id not in self._staged]
+        return staged + (await self._repo.get_many(missing) if missing else [])
+
+    async def save(self, obj: Item) -> None:
+        self._staged[obj.id] = obj
+
+    async def save_many(self, objs: list[Item]) -> None:
+        for obj in objs:
+            self._staged[obj.id] = obj
+
+    async def flush(self) -> None:
+        if self._staged:
+            staged, self._staged = list(self._staged.values()), {}
+            await self._repo.save_many(staged)
+            self.flushed_ids.update(item.id for item in staged)
+
+    def discard(self) -> None:
+        self._staged.clear()
+
+
+class SqlAlchemyUnitOfWork(UnitOfWork):
+    """Uma sessão e uma transação por execução de caso de uso.
+
+    Com `item_cache`, as leituras de item passam pelo cache compartilhado e os
+    ids escritos são invalidados de novo após o commit. Com `write_behind`, os
+    itens são gravados pelo buffer compartilhado, fora da transação da sessão.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        item_cache: TTLCache | None = None,
+        negative_ttl: float = 5.0,
+        write_behind: WriteBehindBuffer | None = None,
+    ):
+        self.session_factory = session_factory
+        self.item_cache = item_cache
+        self.write_behind = write_behind
+        self.negative_ttl = negative_ttl
+        self.session: AsyncSession | None = None
+        self._committed = False
+
+    async def __aenter__(self) -> "SqlAlchemyUnitOfWork":
+        self.session = self.session_factory()
+        repo: Repository[Item] = ItemRepository(self.session, autocommit=False)
+        if self.write_behind is not None:
+            repo = WriteBehindRepository(repo, self.write_behind)
+        if self.item_cache is not None:
+            repo = CachingRepository(repo, self.item_cache, self.negative_ttl)
+        self.items = StagedItemRepository(repo)
+        self.outbox = SqlAlchemyOutbox(self.session)
+        self.processed = SqlAlchemyProcessedMessages(self.session)
+        self._committed = False
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is not None or not self._committed:
+                await self.rollback()
+        finally:
+            await self.session.close()
+            self.session = None
+
+    async def flush(self) -> None:
+        await self.items.flush()
+        await self.outbox.flush()
+        await self.processed.flush()
+        await self.session.flush()
+
+    async def commit(self) -> None:
+        if self.write_behind is None:
+            await self.flush()
+            await self.session.commit()
+        else:
+            # Libera a conexão da sessão antes de esperar o lote do buffer.
+            await self.outbox.flush()
+            await self.session.commit()
+            await self.items.flush()
+            # A marca de processado só depois dos itens gravados pelo buffer
+            # (sem chaves pendentes, o commit não faz nada).
+            await self.processed.flush()
+            await self.session.commit()
+        self._committed = True
+        if self.item_cache is not None:
+            # Uma leitura concorrente pode ter recolocado o valor antigo no cache.
+            self.item_cache.invalidate_many(self.items.flushed_ids)
+
+    async def rollback(self) -> None:
+        self.items.discard()
+        self.outbox.discard()
+        self.processed.discard()
+        await self.session.rollback()
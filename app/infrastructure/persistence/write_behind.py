@@ -0,0 +1,101 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.application.ports import Repository
+from typing import Callable, Optional
+from app.domain.entities import Item
+from .repository import ItemRepository
+import asyncio
+
+
+class WriteBehindBuffer:
+    """Agrupa saves de várias corrotinas em um único upsert e commit.
+
+    O flush acontece quando o buffer atinge `max_batch` itens ou `max_delay`
+    segundos após o primeiro save pendente. Se o mesmo id é salvo mais de uma
+    vez na janela, só o último estado é gravado. Quem chamou `submit_many` só é
+    liberado quando o commit do lote termina (ou recebe o erro do lote).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch: int = 500,
+        max_delay: float = 0.01,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max(max_batch, 1)
+        self.max_delay = max_delay
+        self._pending: dict[str, Item] = {}
+        self._waiters: list[asyncio.Future] = []
+        self._timer: asyncio.Task | None = None
+        # Lotes são gravados em ordem; sem isso um lote mais novo poderia
+        # commitar antes de um mais antigo e o estado final ficaria errado.
+        self._flush_lock = asyncio.Lock()
+
+    def pending(self, id: str) -> Optional[Item]:
+        return self._pending.get(id)
+
+    async def submit_many(self, items: list[Item]) -> None:
+        if not items:
+            return
+        for item in items:
+            self._pending[item.id] = item
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        await waiter
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.max_delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = list(self._pending.values()), {}
+            waiters, self._waiters = self._waiters, []
+            try:
+                async with self.session_factory() as session:
+                    await ItemRepository(session).save_many(batch)
+            except Exception as e:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
+
+class WriteBehindRepository(Repository[Item]):
+    """Repository cujos saves passam pelo WriteBehindBuffer compartilhado."""
+
+    def __init__(self, inner: Repository[Item], buffer: WriteBehindBuffer):
+        self.inner = inner
+        self.buffer = buffer
+
+    async def get(self, id: str) -> Optional[Item]:
+        pending = self.buffer.pending(id)
+        return pending if pending is not None else await self.inner.get(id)
+
+    async def get_many(self, ids: list[str]) -> list[Item]:
+        pending = [item for id in dict.fromkeys(ids) if (item := self.buffer.pending(id))]
+        pending_ids = {item.id for item in pending}
+        missing = [id for id in ids if id not in pending_ids]
+        return pending + (await self.inner.get_many(missing) if missing else [])
+
+    async def save(self, obj: Item) -> None:
+        await self.buffer.submit_many([obj])
+
+    async def save_many(self, objs: list[Item]) -> None:
+        await self.buffer.submit_many(objs)
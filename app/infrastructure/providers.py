@@ -1,28 +1,173 @@
+from app.infrastructure.external.limiter import (
+    AdaptiveLimiter,
+    TokenBucket,
+    ApiLimiter,
+    AimdLimit,
+)
 from app.infrastructure.external.http_client import HttpExternalApiClient
+from app.infrastructure.observability.instrumentation import (
+    InstrumentedExternalApi,
+    InstrumentedMessageBus,
+    InstrumentedUnitOfWork,
+    InstrumentedUseCase,
+)
+from app.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
+from app.infrastructure.persistence.write_behind import WriteBehindBuffer
+from app.infrastructure.persistence.idempotency import IdempotencyStore
 from app.infrastructure.persistence.repository import ItemRepository
-from app.infrastructure.logging.logger import configure_logger
-from app.infrastructure.messaging.factory import get_message_bus
+from app.infrastructure.cache import TTLCache
+from app.infrastructure.logging.logger import get_logger
+from app.infrastructure.messaging.factory import get_dead_letter_bus, get_message_bus
+from app.infrastructure.messaging.retry import RetryPolicy, RetryScheduler
 from app.infrastructure.persistence.db import get_session_local
 from app.config.settings import Settings
 
-settings = Settings()
-logger = configure_logger(settings.LOG_LEVEL)
+logger = get_logger()
+
+_external_api: HttpExternalApiClient | None = None
+_api_limiter: ApiLimiter | None = None
+_item_cache: TTLCache | None = None
+_write_behind: WriteBehindBuffer | None = None
+_dedup_cache: TTLCache | None = None
 
 
 async def provide_session(settings: Settings):
-    SessionLocal = get_session_local(settings.DB_URL)
+    SessionLocal = get_session_local(settings.DB_URL, settings)
     return SessionLocal()
 
 
 def provide_repository(settings: Settings):
-    SessionLocal = get_session_local(settings.DB_URL)
+    SessionLocal = get_session_local(settings.DB_URL, settings)
     session = SessionLocal()
     return ItemRepository(session)
 
 
+def provide_item_cache(settings: Settings) -> TTLCache | None:
+    """Cache de itens do processo, se habilitado em ITEM_CACHE_ENABLED."""
+    global _item_cache
+    if not settings.ITEM_CACHE_ENABLED:
+        return None
+    if _item_cache is None:
+        _item_cache = TTLCache(
+            maxsize=settings.ITEM_CACHE_MAXSIZE, ttl=settings.ITEM_CACHE_TTL
+        )
+    return _item_cache
+
+
+def provide_write_behind(settings: Settings) -> WriteBehindBuffer | None:
+    """Buffer write-behind do processo, se habilitado em ITEM_WRITE_BEHIND_ENABLED."""
+    global _write_behind
+    if not settings.ITEM_WRITE_BEHIND_ENABLED:
+        return None
+    if _write_behind is None:
+        _write_behind = WriteBehindBuffer(
+            get_session_local(settings.DB_URL, settings),
+            max_batch=settings.ITEM_WRITE_BEHIND_MAX_BATCH,
+            max_delay=settings.ITEM_WRITE_BEHIND_MAX_DELAY_MS / 1000,
+        )
+    return _write_behind
+
+
+async def close_write_behind() -> None:
+    global _write_behind
+    if _write_behind is not None:
+        buffer, _write_behind = _write_behind, None
+        await buffer.close()
+
+
+def provide_idempotency_store(settings: Settings) -> IdempotencyStore | None:
+    """Dedup de mensagens, se habilitado em DEDUP_ENABLED; o cache é do processo."""
+    global _dedup_cache
+    if not settings.DEDUP_ENABLED:
+        return None
+    if _dedup_cache is None:
+        _dedup_cache = TTLCache(
+            maxsize=settings.DEDUP_CACHE_MAXSIZE, ttl=settings.DEDUP_CACHE_TTL
+        )
+    return IdempotencyStore(get_session_local(settings.DB_URL, settings), _dedup_cache)
+
+
+def provide_unit_of_work(settings: Settings):
+    uow = SqlAlchemyUnitOfWork(
+        get_session_local(settings.DB_URL, settings),
+        item_cache=provide_item_cache(settings),
+        negative_ttl=settings.ITEM_CACHE_NEGATIVE_TTL,
+        write_behind=provide_write_behind(settings),
+    )
+    return InstrumentedUnitOfWork(uow) if settings.OTEL_ENABLED else uow
+
+
 def provide_message_bus(settings: Settings):
-    return get_message_bus(settings)
+    bus = get_message_bus(settings)
+    return InstrumentedMessageBus(bus) if settings.OTEL_ENABLED else bus
+
+
+def provide_retry_scheduler(settings: Settings, bus) -> RetryScheduler | None:
+    """Retentativas com atraso e DLQ para o consumidor, se RETRY_ENABLED."""
+    if not settings.RETRY_ENABLED:
+        return None
+    dead_letter_bus = get_dead_letter_bus(settings)
+    if dead_letter_bus is not None and settings.OTEL_ENABLED:
+        dead_letter_bus = InstrumentedMessageBus(dead_letter_bus)
+    return RetryScheduler(
+        bus,
+        dead_letter_bus,
+        RetryPolicy(
+            max_attempts=settings.RETRY_MAX_ATTEMPTS,
+            base_delay=settings.RETRY_BASE_DELAY,
+            max_delay=settings.RETRY_MAX_DELAY,
+        ),
+    )
+
+
+def provide_api_limiter(settings: Settings) -> ApiLimiter:
+    """Limiter do processo: todas as chamadas externas dividem o mesmo limite."""
+    global _api_limiter
+    if _api_limiter is None:
+        limiter = AdaptiveLimiter(
+            AimdLimit(
+                initial=settings.EXTERNAL_API_CONCURRENCY_INITIAL,
+                min_limit=settings.EXTERNAL_API_CONCURRENCY_MIN,
+                max_limit=settings.EXTERNAL_API_CONCURRENCY_MAX,
+                latency_threshold=settings.EXTERNAL_API_LATENCY_THRESHOLD,
+            ),
+            queue_timeout=settings.EXTERNAL_API_QUEUE_TIMEOUT,
+        )
+        bucket = None
+        if settings.EXTERNAL_API_RATE_LIMIT > 0:
+            bucket = TokenBucket(
+                settings.EXTERNAL_API_RATE_LIMIT, settings.EXTERNAL_API_RATE_BURST or None
+            )
+        _api_limiter = ApiLimiter(limiter, bucket)
+    return _api_limiter
 
 
 def provide_external_api(settings: Settings):
-    return HttpExternalApiClient(base_url=settings.EXTERNAL_API_BASE_URL)
+    """Cliente HTTP compartilhado pelo processo (pool e keep-alive reaproveitados)."""
+    global _external_api
+    if _external_api is None:
+        limiter = (
+            provide_api_limiter(settings) if settings.EXTERNAL_API_LIMITER_ENABLED else None
+        )
+        _external_api = HttpExternalApiClient.from_settings(settings, limiter=limiter)
+    if settings.OTEL_ENABLED:
+        return InstrumentedExternalApi(_external_api)
+    return _external_api
+
+
+def instrument_use_case(use_case, settings: Settings, carrier: dict | None = None):
+    """Span e métricas do caso de uso quando OTEL_ENABLED; sem custo caso contrário.
+
+    `carrier` é o corpo da mensagem que originou a execução, se houver.
+    """
+    if not settings.OTEL_ENABLED:
+        return use_case
+    return InstrumentedUseCase(use_case, carrier)
+
+
+async def close_external_api() -> None:
+    global _external_api, _api_limiter
+    _api_limiter = None
+    if _external_api is not None:
+        client, _external_api = _external_api, None
+        await client.close()
@@ -0,0 +1,104 @@
+"""Relatório de tempo de import (cold start) por módulo.
+
+Roda `python -X importtime` em um interpretador novo, para medir o cold
+start real, sem módulos já carregados pelo processo atual.
+
+Uso: python -m app.infrastructure.startup [módulo] [--top N]
+"""
+
+from dataclasses import dataclass, asdict
+from pathlib import Path
+import subprocess
+import argparse
+import sys
+import os
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+LAMBDA_MODULE = "app.interfaces.lambda.handler"
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _parse_importtime(output: str) -> list[ImportTiming]:
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def profile_imports(module: str = LAMBDA_MODULE, env: dict | None = None) -> list[ImportTiming]:
+    """Importa `module` em um subprocesso e devolve o tempo de cada import."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            # __import__ passa pelo import em C, o único medido pelo -X importtime.
+            f"__import__({module!r})",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env={**os.environ, **(env or {})},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}: {result.stderr[-2000:]}")
+    return _parse_importtime(result.stderr)
+
+
+def startup_report(module: str = LAMBDA_MODULE, env: dict | None = None, top: int = 20) -> dict:
+    timings = profile_imports(module, env)
+    # Um módulo aparece uma vez só: o primeiro import é o que custa.
+    cumulative = {t.module: t.cumulative_us for t in timings}
+    roots = [t for t in timings if t.depth == 0]
+    return {
+        "module": module,
+        "total_ms": sum(t.cumulative_us for t in roots) / 1000,
+        "modules": {name: us / 1000 for name, us in cumulative.items()},
+        # Pacotes de primeiro nível (sqlalchemy, pydantic, ...): o cumulativo do
+        # primeiro import é o custo total do pacote.
+        "packages": sorted(
+            (asdict(t) for t in timings if "." not in t.module),
+            key=lambda t: t["cumulative_us"],
+            reverse=True,
+        )[:top],
+        "slowest_self": sorted(
+            (asdict(t) for t in timings), key=lambda t: t["self_us"], reverse=True
+        )[:top],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.infrastructure.startup")
+    parser.add_argument("module", nargs="?", default=LAMBDA_MODULE)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    report = startup_report(args.module, top=args.top)
+    print(f"{report['module']}: {report['total_ms']:.1f} ms de import\n")
+    print(f"{'cumulativo ms':>14}  {'próprio ms':>10}  módulo")
+    for t in report["packages"]:
+        print(f"{t['cumulative_us'] / 1000:>14.1f}  {t['self_us'] / 1000:>10.1f}  {t['module']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
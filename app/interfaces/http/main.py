@@ -1,20 +1,35 @@
-from app.infrastructure.persistence.db import init_db
-from app.interfaces.http.routers import router
+from app.infrastructure.persistence.db import init_db, dispose_engines
+from app.infrastructure.providers import close_external_api, close_write_behind
+from app.infrastructure.logging.logger import configure_from_settings
+from app.interfaces.http.routers import metrics_router, router
+from app.interfaces.http.middleware import RequestIdMiddleware
+from app.config.settings import get_settings
 from fastapi import FastAPI
 
 
 def create_app() -> FastAPI:
+    settings = get_settings()
+    configure_from_settings(settings)
     app = FastAPI(
         title="dev-event-driven-system",
         version="0.1.0",
         description="Microserviço hexagonal orientado a eventos",
     )
+    app.add_middleware(RequestIdMiddleware)
     app.include_router(router)
+    if settings.OTEL_ENABLED:
+        app.include_router(metrics_router)
 
     @app.on_event("startup")
     async def on_startup():
         await init_db()
 
+    @app.on_event("shutdown")
+    async def on_shutdown():
+        await close_write_behind()
+        await close_external_api()
+        await dispose_engines()
+
     return app
 
 
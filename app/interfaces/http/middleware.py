@@ -0,0 +1,35 @@
+from app.infrastructure.logging.logger import reset_request_id, set_request_id
+import uuid
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestIdMiddleware:
+    """Propaga o X-Request-ID (ou gera um) para os logs da requisição.
+
+    Middleware ASGI puro, para não pagar o custo do BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_id = next(
+            (v.decode() for k, v in scope["headers"] if k == REQUEST_ID_HEADER),
+            None,
+        ) or uuid.uuid4().hex
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append(
+                    (REQUEST_ID_HEADER, request_id.encode())
+                )
+            await send(message)
+
+        token = set_request_id(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            reset_request_id(token)
@@ -1,22 +1,39 @@
 from app.infrastructure.providers import (
-    provide_repository,
+    provide_unit_of_work,
+    provide_session,
     provide_message_bus,
     provide_external_api,
+    instrument_use_case,
 )
+from app.interfaces.http.streaming import (
+    NDJSON_MEDIA_TYPE,
+    DuplexStreamingResponse,
+    StreamFormatError,
+    iter_json_array,
+    iter_ndjson,
+)
+from app.infrastructure.persistence.repository import ItemRepository
+from app.infrastructure.observability.metrics import registry
 from app.application.dtos import ProcessEventInput, ProcessEventOutput
 from app.application.use_cases.process_event import ProcessEvent
-from fastapi.responses import JSONResponse
-from app.config.settings import Settings
-from pydantic import BaseModel
-from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from app.domain.entities import Status
+from app.config.settings import get_settings
+from pydantic import BaseModel, ValidationError
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Any, AsyncIterator
+import json
 
 
 router = APIRouter()
+metrics_router = APIRouter()
 
 
 class ProcessPayload(BaseModel):
     id: str | None = None
     name: str
+    # Carimbo do cliente (ex.: benchmarks/loadgen.py) para o lag fim a fim no worker.
+    produced_at: float | None = None
 
 
 @router.get("/health", status_code=200)
@@ -24,13 +41,45 @@ async def health():
     return {"status": "ok"}
 
 
+@router.get("/items")
+async def list_items(
+    status: str,
+    after: str | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    page_size: int = Query(default=1000, ge=1, le=10_000),
+):
+    """Exporta os itens de um status em NDJSON, ordenados por id.
+
+    Para retomar uma exportação interrompida, passe em `after` o último id recebido.
+    """
+    if status not in Status.VALID:
+        raise HTTPException(status_code=400, detail=f"status inválido: {status}")
+    session = await provide_session(get_settings())
+
+    async def lines() -> AsyncIterator[str]:
+        async with session:
+            sent = 0
+            repo = ItemRepository(session, autocommit=False)
+            async for item in repo.iter_by_status(status, page_size, after_id=after):
+                yield json.dumps(
+                    {"id": item.id, "name": item.name, "status": str(item.status)}
+                ) + "\n"
+                sent += 1
+                if limit is not None and sent >= limit:
+                    return
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
 @router.post("/process", response_model=ProcessEventOutput)
 async def process(payload: ProcessPayload):
-    settings = Settings()
-    repo = provide_repository(settings)
+    settings = get_settings()
+    uow = provide_unit_of_work(settings)
     bus = provide_message_bus(settings)
     api = provide_external_api(settings)
-    use_case = ProcessEvent(repo, bus, api)
+    use_case = instrument_use_case(
+        ProcessEvent(uow, bus, api, use_outbox=settings.OUTBOX_ENABLED), settings
+    )
     dto = ProcessEventInput(payload.model_dump())
     try:
         result = await use_case.execute(dto)
@@ -40,3 +89,92 @@ async def process(payload: ProcessPayload):
             status_code=500,
             content={"error": f"Erro ao processar evento: {exc}"},
         )
+
+
+@router.post("/process/batch")
+async def process_batch(request: Request):
+    """Ingestão em lote: corpo NDJSON (padrão) ou array JSON, lido em streaming.
+
+    Os registros são processados em chunks de BATCH_CHUNK_SIZE e a resposta é
+    NDJSON com um resultado por registro, na ordem de entrada (`index`).
+    """
+    settings = get_settings()
+    if request.headers.get("content-type", "").startswith("application/json"):
+        records = iter_json_array(request.stream())
+    else:
+        records = iter_ndjson(request.stream())
+    use_case = instrument_use_case(
+        ProcessEvent(
+            provide_unit_of_work(settings),
+            provide_message_bus(settings),
+            provide_external_api(settings),
+            use_outbox=settings.OUTBOX_ENABLED,
+        ),
+        settings,
+    )
+    return DuplexStreamingResponse(
+        _process_stream(records, use_case, settings.BATCH_CHUNK_SIZE),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+def _result_line(index: int, success: bool, message: str, item_id: str | None = None) -> str:
+    return json.dumps(
+        {"index": index, "success": success, "item_id": item_id, "message": message}
+    ) + "\n"
+
+
+async def _run_chunk(use_case, chunk: list[tuple[int, ProcessEventInput]]) -> str:
+    try:
+        outputs = await use_case.execute_many([dto for _, dto in chunk])
+    except Exception as exc:
+        return "".join(
+            _result_line(index, False, str(exc), dto.payload.get("id"))
+            for index, dto in chunk
+        )
+    return "".join(
+        _result_line(index, out.success, out.message, out.item_id)
+        for (index, _), out in zip(chunk, outputs)
+    )
+
+
+async def _process_stream(
+    records: AsyncIterator[Any], use_case, chunk_size: int
+) -> AsyncIterator[str]:
+    chunk: list[tuple[int, ProcessEventInput]] = []
+    index = -1
+    try:
+        async for index, record in _enumerate(records):
+            if isinstance(record, ValueError):
+                yield _result_line(index, False, str(record))
+                continue
+            try:
+                payload = ProcessPayload.model_validate(record)
+            except ValidationError as exc:
+                yield _result_line(index, False, f"Registro inválido: {exc.errors()[0]['msg']}")
+                continue
+            chunk.append((index, ProcessEventInput(payload.model_dump())))
+            if len(chunk) >= chunk_size:
+                yield await _run_chunk(use_case, chunk)
+                chunk = []
+    except StreamFormatError as exc:
+        if chunk:
+            yield await _run_chunk(use_case, chunk)
+        yield _result_line(index + 1, False, str(exc))
+        return
+    if chunk:
+        yield await _run_chunk(use_case, chunk)
+
+
+async def _enumerate(items: AsyncIterator[Any]) -> AsyncIterator[tuple[int, Any]]:
+    index = 0
+    async for item in items:
+        yield index, item
+        index += 1
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
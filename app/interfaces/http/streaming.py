@@ -0,0 +1,145 @@
+from typing import Any, AsyncIterable, AsyncIterator
+from fastapi.responses import StreamingResponse
+import codecs
+import json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class StreamFormatError(ValueError):
+    """Corpo que não pode mais ser lido (ex.: array JSON malformado)."""
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Um valor por linha; linhas inválidas viram `ValueError` no lugar do valor.
+
+    Uma linha ruim não impede a leitura das seguintes.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _loads(line)
+    if pending.strip():
+        yield _loads(pending)
+
+
+def _loads(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"JSON inválido: {e}")
+
+
+# Literal ou escape \uXXXX cortado no fim do buffer: o erro aponta até 6 caracteres antes.
+_TRUNCATION_MARGIN = 6
+MAX_ELEMENT_SIZE = 1 << 20
+
+
+def _truncated(error: json.JSONDecodeError, size: int) -> bool:
+    """O erro é de um valor cortado pelo fim do buffer (e não de JSON malformado)?"""
+    return error.msg.startswith("Unterminated string") or size - error.pos <= _TRUNCATION_MARGIN
+
+
+async def iter_json_array(
+    chunks: AsyncIterable[bytes], max_element_size: int = MAX_ELEMENT_SIZE
+) -> AsyncIterator[Any]:
+    """Elementos de um array JSON no topo do corpo, decodificados conforme chegam.
+
+    Vírgula faltando ou sobrando e qualquer coisa além de espaços depois do
+    `]` final viram `StreamFormatError`. Só se lê mais corpo para completar um
+    valor cortado no fim do buffer; um elemento acima de `max_element_size`
+    caracteres também é erro, para não acumular o corpo inteiro em memória.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    # start: antes do "["; first: valor ou "]"; value: valor; comma: "," ou "]"; end: após "]".
+    state = "start"
+
+    def skip(chars: str) -> None:
+        nonlocal pos
+        while pos < len(buffer) and buffer[pos] in chars:
+            pos += 1
+
+    async def read_more() -> bool:
+        nonlocal buffer, pos
+        async for chunk in iterator:
+            buffer = buffer[pos:] + utf8.decode(chunk)
+            pos = 0
+            return True
+        buffer = buffer[pos:] + utf8.decode(b"", final=True)
+        pos = 0
+        return False
+
+    async def grow() -> None:
+        nonlocal more
+        if len(buffer) - pos > max_element_size:
+            raise StreamFormatError(
+                f"Elemento do array maior que {max_element_size} caracteres"
+            )
+        more = await read_more()
+
+    iterator = chunks.__aiter__()
+    more = True
+    while True:
+        skip(" \t\r\n")
+        if pos >= len(buffer):
+            if not more:
+                if state == "end":
+                    return
+                raise StreamFormatError("Array JSON incompleto")
+            more = await read_more()
+            continue
+        char = buffer[pos]
+        if state == "end":
+            raise StreamFormatError("Conteúdo após o fim do array JSON")
+        if state == "start":
+            if char != "[":
+                raise StreamFormatError("O corpo deve ser um array JSON")
+            state = "first"
+            pos += 1
+            continue
+        if state == "comma":
+            if char not in ",]":
+                raise StreamFormatError("Esperava ',' ou ']' no array JSON")
+            state = "value" if char == "," else "end"
+            pos += 1
+            continue
+        if char == "]" and state == "first":
+            state = "end"
+            pos += 1
+            continue
+        if char in ",]":
+            raise StreamFormatError("Esperava um valor no array JSON")
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # Pode ser só um valor cortado no meio do chunk.
+            if more and _truncated(e, len(buffer)):
+                await grow()
+                continue
+            raise StreamFormatError(f"JSON inválido: {e}") from e
+        if end == len(buffer) and more:
+            # Um número no fim do buffer pode continuar no próximo chunk.
+            await grow()
+            continue
+        pos = end
+        state = "comma"
+        yield value
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse que pode ser gerada enquanto o corpo ainda é lido.
+
+    Em servidores ASGI < 2.4 o StreamingResponse escuta `receive()` para
+    detectar desconexão e consumiria as mensagens do corpo da requisição.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
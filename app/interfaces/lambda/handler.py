@@ -1,31 +1,62 @@
 from app.infrastructure.providers import (
-    provide_repository,
+    provide_unit_of_work,
     provide_message_bus,
     provide_external_api,
+    instrument_use_case,
 )
+from app.infrastructure.messaging.codec import headers_from_attributes
 from app.application.use_cases.process_event import ProcessEvent
-from app.infrastructure.logging.logger import configure_logger
+from app.infrastructure.messaging.factory import get_codec
+from app.infrastructure.logging.logger import (
+    configure_logger,
+    reset_request_id,
+    set_request_id,
+)
 from app.application.dtos import ProcessEventInput
-from app.config.settings import Settings
+from app.config.settings import get_settings
 import asyncio
 import json
 
-settings = Settings()
-logger = configure_logger(settings.LOG_LEVEL)
+settings = get_settings()
+# Sem fila: o container é congelado ao fim da invocação e a thread de escrita
+# poderia não esvaziar a fila a tempo.
+logger = configure_logger(
+    settings.LOG_LEVEL, use_queue=False, sample_rates=settings.LOG_SAMPLE_RATES
+)
+
+# Estado mantido entre invocações do mesmo container: o loop e os adapters
+# (pools de conexão) só são criados no cold start.
+_loop: asyncio.AbstractEventLoop | None = None
+_adapters: dict = {}
+_codec = get_codec(settings)
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def _get_adapters():
+    if not _adapters:
+        _adapters["bus"] = provide_message_bus(settings)
+        _adapters["api"] = provide_external_api(settings)
+    return _adapters["bus"], _adapters["api"]
 
 
 def handler(event, context):
+    loop = _get_loop()
+    token = set_request_id(getattr(context, "aws_request_id", None))
     try:
         # SQS event
         if "Records" in event:
-            for record in event["Records"]:
-                payload = json.loads(record["body"])
-                asyncio.run(_process(payload))
-            return {"statusCode": 200, "body": "Processed SQS batch"}
+            return loop.run_until_complete(_process_batch(event["Records"]))
         # API Gateway event
         elif "body" in event:
             payload = json.loads(event["body"])
-            result = asyncio.run(_process(payload))
+            result = loop.run_until_complete(_process(payload))
             return {"statusCode": 200, "body": json.dumps(result)}
         else:
             logger.error("Evento desconhecido", event=event)
@@ -33,13 +64,50 @@ def handler(event, context):
     except Exception as e:
         logger.error("Erro no handler", error=str(e))
         return {"statusCode": 500, "body": str(e)}
+    finally:
+        reset_request_id(token)
+
+
+async def _process_batch(records: list[dict]) -> dict:
+    """Processa os registros em paralelo e reporta só os que falharam.
+
+    O retorno segue o formato de partial batch response do SQS
+    (`ReportBatchItemFailures`), para que apenas os registros com falha voltem
+    para a fila.
+    """
+    semaphore = asyncio.Semaphore(settings.LAMBDA_BATCH_CONCURRENCY)
+
+    async def run(record: dict) -> str | None:
+        async with semaphore:
+            try:
+                headers = headers_from_attributes(record.get("messageAttributes"))
+                await _process(_codec.decode_payload(record["body"], headers))
+            except Exception as e:
+                logger.error(
+                    "Erro ao processar registro",
+                    message_id=record.get("messageId"),
+                    error=str(e),
+                )
+                return record.get("messageId")
+        return None
+
+    failed = await asyncio.gather(*(run(record) for record in records))
+    return {
+        "batchItemFailures": [
+            {"itemIdentifier": message_id} for message_id in failed if message_id
+        ]
+    }
 
 
 async def _process(payload):
-    repo = provide_repository(settings)
-    bus = provide_message_bus(settings)
-    api = provide_external_api(settings)
-    use_case = ProcessEvent(repo, bus, api)
+    bus, api = _get_adapters()
+    use_case = instrument_use_case(
+        ProcessEvent(
+            provide_unit_of_work(settings), bus, api, use_outbox=settings.OUTBOX_ENABLED
+        ),
+        settings,
+        carrier=payload,
+    )
     dto = ProcessEventInput(payload=payload)
     result = await use_case.execute(dto)
     logger.info("Processado com sucesso", item_id=result.item_id)
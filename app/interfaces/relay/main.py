@@ -0,0 +1,37 @@
+from app.infrastructure.persistence.db import get_session_local, dispose_engines
+from app.infrastructure.logging.logger import configure_from_settings, get_logger
+from app.infrastructure.persistence.outbox import OutboxRelay
+from app.infrastructure.providers import provide_message_bus
+from app.config.settings import get_settings
+from contextlib import suppress
+import asyncio
+import signal
+
+logger = get_logger()
+
+
+async def relay_loop():
+    settings = get_settings()
+    configure_from_settings(settings)
+    bus = provide_message_bus(settings)
+    relay = OutboxRelay(
+        get_session_local(settings.DB_URL, settings),
+        bus,
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, relay.stop)
+    logger.info("Relay do outbox iniciado", batch_size=settings.OUTBOX_BATCH_SIZE)
+    try:
+        await relay.run()
+    finally:
+        await bus.close()
+        await dispose_engines()
+        logger.info("Relay do outbox encerrado")
+
+
+if __name__ == "__main__":
+    asyncio.run(relay_loop())
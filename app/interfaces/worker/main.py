@@ -1,27 +1,149 @@
 from app.application.use_cases.process_item_from_queue import ProcessItemFromQueue
-from app.infrastructure.providers import provide_repository, provide_message_bus
-from app.infrastructure.logging.logger import configure_logger
-from app.config.settings import Settings
+from app.infrastructure.providers import (
+    provide_idempotency_store,
+    provide_retry_scheduler,
+    provide_unit_of_work,
+    provide_message_bus,
+    instrument_use_case,
+    close_external_api,
+    close_write_behind,
+)
+from app.infrastructure.observability.throughput import ThroughputRecorder
+from app.infrastructure.persistence.db import dispose_engines
+from app.infrastructure.messaging.codec import CodecError
+from app.infrastructure.logging.logger import (
+    configure_from_settings,
+    reset_request_id,
+    set_request_id,
+    get_logger,
+)
+from app.interfaces.worker.runtime import WorkerRuntime
+from app.config.settings import Settings, get_settings
+from contextlib import suppress
+from typing import Mapping
 import asyncio
+import signal
 
-settings = Settings()
-logger = configure_logger(settings.LOG_LEVEL)
+logger = get_logger()
+
+
+def _item_id(msg: dict) -> str | None:
+    body = msg.get("body")
+    if isinstance(body, Mapping) and body.get("item_id"):
+        return body["item_id"]
+    return msg.get("item_id")
+
+
+def _dedup_key(msg: dict) -> str | None:
+    """event_id do corpo (estável entre republicações) ou o id do broker."""
+    body = msg.get("body", msg)
+    if isinstance(body, Mapping) and body.get("event_id"):
+        return f"event:{body['event_id']}"
+    if msg.get("message_id"):
+        return f"message:{msg['message_id']}"
+    return None
+
+
+def _produced_at(msg: dict):
+    body = msg.get("body")
+    try:
+        return body.get("produced_at") if isinstance(body, Mapping) else None
+    except CodecError:
+        # Só a métrica de lag depende disso; o item já foi processado.
+        return None
+
+
+def build_recorder(settings: Settings) -> ThroughputRecorder | None:
+    """Vazão e lag fim a fim logados a cada WORKER_LAG_REPORT_INTERVAL (0 desliga)."""
+    if settings.WORKER_LAG_REPORT_INTERVAL <= 0:
+        return None
+    return ThroughputRecorder(settings.WORKER_LAG_REPORT_INTERVAL)
+
+
+def build_handler(settings: Settings, recorder: ThroughputRecorder | None = None):
+    dedup = provide_idempotency_store(settings)
+
+    async def handle_message(msg: dict) -> None:
+        if msg.get("error"):
+            # Não decodificada pelo adapter: a falha leva a nack, nunca a ack.
+            raise ValueError(f"Mensagem não decodificada: {msg['error']}")
+        item_id = _item_id(msg)
+        if not item_id:
+            logger.warning("Mensagem sem item_id ignorada")
+            return
+        key = _dedup_key(msg) if dedup is not None else None
+        token = set_request_id(msg.get("message_id") or item_id)
+        try:
+            if key and await dedup.seen(key):
+                logger.info("Mensagem duplicada ignorada", item_id=item_id, key=key)
+                return
+            logger.debug("Processando item da fila...", item_id=item_id)
+            use_case = instrument_use_case(
+                ProcessItemFromQueue(provide_unit_of_work(settings)),
+                settings,
+                carrier=msg.get("body", msg),
+            )
+            result = await use_case.execute(item_id, message_key=key)
+            if key:
+                dedup.remember(key)
+            if recorder is not None:
+                recorder.record(_produced_at(msg))
+            logger.info("Item processado", item=result)
+        finally:
+            reset_request_id(token)
+
+    return handle_message
+
+
+async def _purge_processed(settings: Settings) -> None:
+    dedup = provide_idempotency_store(settings)
+    while dedup is not None:
+        try:
+            removed = await dedup.purge(settings.DEDUP_RETENTION_SECONDS)
+            logger.info("Chaves de dedup expiradas removidas", removed=removed)
+        except Exception as e:
+            logger.error("Erro ao limpar chaves de dedup", error=str(e))
+        await asyncio.sleep(settings.DEDUP_PURGE_INTERVAL)
 
 
 async def worker_loop():
-    settings = Settings()
-    repo = provide_repository(settings)
+    settings = get_settings()
+    configure_from_settings(settings)
     bus = provide_message_bus(settings)
-    use_case = ProcessItemFromQueue(repo)
-    logger.info("Worker iniciado, aguardando mensagens...")
-    while True:
-        msg = await bus.receive()
-        item_id = msg.get("body", {}).get("item_id") or msg.get("item_id")
-        if item_id:
-            logger.info("Processando item da fila...", item_id=item_id)
-            result = await use_case.execute(item_id)
-            logger.info("Item processado", item=result)
-        await asyncio.sleep(1)
+    retry = provide_retry_scheduler(settings, bus)
+    recorder = build_recorder(settings)
+    runtime = WorkerRuntime(
+        bus,
+        build_handler(settings, recorder),
+        concurrency=settings.WORKER_CONCURRENCY,
+        prefetch=settings.WORKER_PREFETCH,
+        drain_timeout=settings.WORKER_DRAIN_TIMEOUT,
+        retry=retry,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, runtime.stop)
+    logger.info(
+        "Worker iniciado, aguardando mensagens...",
+        concurrency=settings.WORKER_CONCURRENCY,
+        prefetch=settings.WORKER_PREFETCH,
+    )
+    purge = asyncio.create_task(_purge_processed(settings))
+    report = asyncio.create_task(recorder.report_forever()) if recorder else None
+    try:
+        await runtime.run()
+    finally:
+        purge.cancel()
+        if report is not None:
+            report.cancel()
+        if retry is not None:
+            await retry.close()
+        await bus.close()
+        await close_write_behind()
+        await close_external_api()
+        await dispose_engines()
+        logger.info("Worker encerrado")
 
 
 if __name__ == "__main__":
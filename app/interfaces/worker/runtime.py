@@ -0,0 +1,125 @@
+from app.infrastructure.messaging.retry import RetryScheduler
+from app.infrastructure.logging.logger import get_logger
+from typing import Any, Awaitable, Callable
+from app.application.ports import MessageBus
+from contextlib import suppress
+import asyncio
+
+logger = get_logger()
+
+MessageHandler = Callable[[dict], Awaitable[None]]
+
+
+def message_receipt(msg: dict) -> Any:
+    """Identificador que o adapter espera em ack/nack (None se não houver)."""
+    return msg.get("receipt")
+
+
+class WorkerRuntime:
+    """Consome mensagens com prefetch limitado e processamento concorrente.
+
+    Um fetcher mantém até `prefetch` mensagens em buffer e `concurrency` tarefas
+    as processam. Sucesso gera ack, falha gera nack; com `retry`, a falha é
+    republicada com atraso no broker (ou vai para a DLQ) e só depois de
+    confirmada a original recebe ack.
+    `stop()` interrompe o recebimento e aguarda o buffer esvaziar por até
+    `drain_timeout` segundos.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        handler: MessageHandler,
+        concurrency: int = 10,
+        prefetch: int = 100,
+        drain_timeout: float = 30.0,
+        retry: RetryScheduler | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.bus = bus
+        self.handler = handler
+        self.concurrency = concurrency
+        self.drain_timeout = drain_timeout
+        self.retry = retry
+        self._buffer: asyncio.Queue = asyncio.Queue(maxsize=max(prefetch, 1))
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        fetcher = asyncio.create_task(self._fetch())
+        workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        await self._stopping.wait()
+        logger.info("Encerrando worker, drenando buffer...", buffered=self._buffer.qsize())
+
+        fetcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await fetcher
+        try:
+            await asyncio.wait_for(self._buffer.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Tempo de drenagem esgotado", pending=self._buffer.qsize())
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        while not self._buffer.empty():
+            await self._settle(self.bus.nack, self._buffer.get_nowait())
+
+    async def _fetch(self) -> None:
+        while True:
+            try:
+                msg = await self.bus.receive()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Erro ao receber mensagens", error=str(e))
+                await asyncio.sleep(1)
+                continue
+            if not msg:
+                continue
+            try:
+                await self._buffer.put(msg)
+            except asyncio.CancelledError:
+                await self._settle(self.bus.nack, msg)
+                raise
+
+    async def _work(self) -> None:
+        while True:
+            msg = await self._buffer.get()
+            try:
+                await self._process(msg)
+            finally:
+                self._buffer.task_done()
+
+    async def _process(self, msg: dict) -> None:
+        try:
+            await self.handler(msg)
+        except asyncio.CancelledError:
+            await self._settle(self.bus.nack, msg)
+            raise
+        except Exception as e:
+            logger.error("Erro ao processar mensagem", error=str(e))
+            await self._fail(msg, e)
+        else:
+            await self._settle(self.bus.ack, msg)
+
+    async def _fail(self, msg: dict, error: Exception) -> None:
+        if self.retry is not None:
+            try:
+                if await self.retry.handle_failure(msg, str(error)):
+                    await self._settle(self.bus.ack, msg)
+                    return
+            except Exception as e:
+                logger.error("Erro ao agendar retentativa", error=str(e))
+        await self._settle(self.bus.nack, msg)
+
+    async def _settle(self, action: Callable[[Any], Awaitable[None]], msg: dict) -> None:
+        receipt = message_receipt(msg)
+        if receipt is None:
+            return
+        try:
+            await action(receipt)
+        except Exception as e:
+            logger.error("Erro ao confirmar mensagem", error=str(e))
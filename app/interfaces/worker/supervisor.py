@@ -0,0 +1,375 @@
+from app.infrastructure.providers import (
+    provide_retry_scheduler,
+    provide_message_bus,
+    close_external_api,
+    close_write_behind,
+)
+from app.interfaces.worker.main import (
+    _purge_processed,
+    build_recorder,
+    build_handler,
+    _item_id,
+)
+from app.infrastructure.logging.logger import configure_from_settings, get_logger
+from app.interfaces.worker.runtime import MessageHandler, message_receipt
+from app.infrastructure.messaging.retry import RetryScheduler
+from app.infrastructure.persistence.db import dispose_engines
+from app.config.settings import Settings, get_settings
+from typing import Any, Callable
+from app.application.ports import MessageBus
+from dataclasses import dataclass
+from contextlib import suppress
+import multiprocessing
+import hashlib
+import asyncio
+import bisect
+import signal
+import queue
+import time
+import os
+
+logger = get_logger()
+
+# Função executada em cada processo filho: (índice, caixa de entrada, resultados).
+ChildTarget = Callable[[int, Any, Any], None]
+# Espera pelo fim de um filho depois do SIGKILL.
+KILL_TIMEOUT = 5.0
+
+
+def _hash(value: str) -> int:
+    # hash() do Python varia por processo; o anel precisa ser estável.
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Hash consistente com nós virtuais: a mesma chave sempre cai no mesmo nó."""
+
+    def __init__(self, nodes: int, vnodes: int = 64):
+        if nodes < 1:
+            raise ValueError("nodes must be >= 1")
+        points = sorted(
+            (_hash(f"{node}:{v}"), node) for node in range(nodes) for v in range(vnodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node(self, key: str) -> int:
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+class KeyedRunner:
+    """Executa mensagens em paralelo entre chaves e em ordem dentro da mesma chave.
+
+    Cada mensagem espera a anterior da sua chave terminar (com sucesso ou não);
+    no máximo `concurrency` handlers rodam ao mesmo tempo. `done(ok, error)` é
+    chamado ao fim de cada uma.
+    """
+
+    def __init__(self, handler: MessageHandler, concurrency: int = 10):
+        self.handler = handler
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._tails: dict[str, asyncio.Task] = {}
+
+    def submit(
+        self, key: str, msg: dict, done: Callable[[bool, str | None], None]
+    ) -> asyncio.Task:
+        task = asyncio.create_task(self._run(self._tails.get(key), msg, done))
+        self._tails[key] = task
+        task.add_done_callback(lambda t: self._tails.get(key) is t and self._tails.pop(key))
+        return task
+
+    async def _run(self, previous: asyncio.Task | None, msg: dict, done) -> None:
+        if previous is not None:
+            await asyncio.wait({previous})
+        async with self._semaphore:
+            try:
+                await self.handler(msg)
+            except Exception as e:
+                logger.error("Erro ao processar mensagem", error=str(e))
+                done(False, str(e))
+            else:
+                done(True, None)
+
+    async def join(self) -> None:
+        while self._tails:
+            await asyncio.wait(set(self._tails.values()))
+
+
+@dataclass
+class _Child:
+    index: int
+    process: Any
+    inbox: Any
+    restarts: int = 0
+
+
+def _portable(msg: dict) -> dict:
+    """Cópia serializável da mensagem; o receipt fica no supervisor.
+
+    Um LazyBody ainda não decodificado viaja como bytes + cabeçalhos: quem
+    decodifica (e descobre um payload inválido) é o filho, dentro do handler.
+    """
+    portable = {"body": msg.get("body"), "message_id": msg.get("message_id")}
+    if msg.get("error"):
+        portable["error"] = msg["error"]
+    return portable
+
+
+class WorkerSupervisor:
+    """Consome o broker e distribui as mensagens entre N processos filhos.
+
+    A partição é por hash consistente de `item_id`, então mensagens do mesmo
+    item vão sempre para o mesmo filho e são processadas em ordem. Ack/nack
+    ficam no supervisor, dono da conexão com o broker; falhas do handler passam
+    por `retry`, se houver. Um filho que morre é recriado no mesmo slot e as
+    mensagens que estavam com ele recebem nack.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        target: ChildTarget,
+        processes: int | None = None,
+        prefetch: int = 100,
+        drain_timeout: float = 30.0,
+        restart_backoff: float = 1.0,
+        context: Any = None,
+        retry: RetryScheduler | None = None,
+    ):
+        self.bus = bus
+        self.target = target
+        self.processes = processes or os.cpu_count() or 1
+        self.drain_timeout = drain_timeout
+        self.restart_backoff = restart_backoff
+        self.retry = retry
+        self.ring = HashRing(self.processes)
+        # spawn: o supervisor já tem event loop e threads (log), que não
+        # sobrevivem bem a um fork.
+        self._ctx = context or multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._children: list[_Child] = []
+        # seq -> (slot do filho, reinícios do filho no envio, mensagem)
+        self._pending: dict[int, tuple[int, int, dict]] = {}
+        self._slots = asyncio.Semaphore(max(prefetch, 1))
+        self._seq = 0
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _spawn(self, index: int) -> tuple[Any, Any]:
+        inbox = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=self.target,
+            args=(index, inbox, self._results),
+            name=f"worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        return process, inbox
+
+    async def run(self) -> None:
+        self._children = [_Child(i, *self._spawn(i)) for i in range(self.processes)]
+        logger.info("Supervisor iniciado", processes=self.processes)
+        tasks = [
+            asyncio.create_task(self._dispatch(), name="dispatch"),
+            asyncio.create_task(self._collect(), name="collect"),
+            asyncio.create_task(self._monitor(), name="monitor"),
+        ]
+        for task in tasks:
+            task.add_done_callback(self._on_task_done)
+        await self._stopping.wait()
+        logger.info("Encerrando supervisor...", pending=len(self._pending))
+
+        tasks[0].cancel()
+        await asyncio.gather(tasks[0], return_exceptions=True)
+        deadline = asyncio.get_running_loop().time() + self.drain_timeout
+        while self._pending and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.05)
+        for child in self._children:
+            child.inbox.put(None)
+        await asyncio.to_thread(self._join_children)
+        for task in tasks[1:]:
+            task.cancel()
+        await asyncio.gather(*tasks[1:], return_exceptions=True)
+        for seq in list(self._pending):
+            await self._settle(seq, False)
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        # Sem dispatch, collect ou monitor o supervisor não faz progresso: encerra.
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error(
+            "Tarefa do supervisor falhou, encerrando",
+            task=task.get_name(),
+            error=repr(task.exception()),
+        )
+        self.stop()
+
+    def _join_children(self) -> None:
+        # Os filhos ignoram SIGTERM (o encerramento vem pela caixa de entrada):
+        # quem não termina dentro de drain_timeout recebe SIGKILL.
+        deadline = time.monotonic() + self.drain_timeout
+        for child in self._children:
+            child.process.join(timeout=max(deadline - time.monotonic(), 0))
+        for child in self._children:
+            if child.process.is_alive():
+                logger.warning("Processo filho não encerrou, finalizando", child=child.index)
+                child.process.kill()
+                child.process.join(timeout=KILL_TIMEOUT)
+
+    async def _dispatch(self) -> None:
+        while True:
+            # A vaga vem antes do receive: nenhuma mensagem fica parada aqui enquanto
+            # as de um filho morto voltam para a fila, o que inverteria a ordem do item.
+            await self._slots.acquire()
+            try:
+                msg = await self.bus.receive()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            except Exception as e:
+                self._slots.release()
+                logger.error("Erro ao receber mensagens", error=str(e))
+                await asyncio.sleep(1)
+                continue
+            if not msg:
+                self._slots.release()
+                continue
+            self._seq += 1
+            seq = self._seq
+            try:
+                key = _item_id(msg) or msg.get("message_id") or ""
+                child = self._children[self.ring.node(key)]
+                self._pending[seq] = (child.index, child.restarts, msg)
+                child.inbox.put((seq, key, _portable(msg)))
+            except Exception as e:
+                # Ex.: item_id fora dos cabeçalhos e payload inválido (CodecError).
+                logger.error("Erro ao distribuir mensagem", error=str(e))
+                self._pending[seq] = (-1, 0, msg)
+                await self._settle(seq, False, str(e))
+
+    async def _collect(self) -> None:
+        while True:
+            try:
+                seq, ok, error = await asyncio.to_thread(self._results.get, True, 0.2)
+            except queue.Empty:
+                continue
+            await self._settle(seq, ok, error)
+
+    async def _settle(self, seq: int, ok: bool, error: str | None = None) -> None:
+        entry = self._pending.pop(seq, None)
+        if entry is None:
+            # Resultado de um filho que já foi dado como morto: a mensagem já levou nack.
+            return
+        self._slots.release()
+        msg = entry[2]
+        if error is not None and self.retry is not None:
+            try:
+                ok = await self.retry.handle_failure(msg, error)
+            except Exception as e:
+                logger.error("Erro ao agendar retentativa", error=str(e))
+        receipt = message_receipt(msg)
+        if receipt is None:
+            return
+        try:
+            await (self.bus.ack if ok else self.bus.nack)(receipt)
+        except Exception as e:
+            logger.error("Erro ao confirmar mensagem", error=str(e))
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(0.5)
+            for child in self._children:
+                if child.process.is_alive() or self._stopping.is_set():
+                    continue
+                logger.error(
+                    "Processo filho morreu, reiniciando",
+                    child=child.index,
+                    exitcode=child.process.exitcode,
+                    restarts=child.restarts,
+                )
+                await asyncio.sleep(min(self.restart_backoff * 2**child.restarts, 30.0))
+                child.process, child.inbox = self._spawn(child.index)
+                child.restarts += 1
+                # Inclui o que foi roteado para a caixa antiga durante o backoff.
+                lost = [
+                    seq
+                    for seq, (index, restarts, _) in self._pending.items()
+                    if index == child.index and restarts != child.restarts
+                ]
+                # Cada nack volta para o início da fila: da mais nova para a mais
+                # antiga, a reentrega sai na ordem original.
+                for seq in sorted(lost, reverse=True):
+                    await self._settle(seq, False)
+
+
+async def _child_loop(index: int, inbox, results, settings: Settings) -> None:
+    recorder = build_recorder(settings)
+    runner = KeyedRunner(build_handler(settings, recorder), settings.WORKER_CONCURRENCY)
+    # A limpeza das chaves de dedup é global: basta um processo fazê-la.
+    purge = asyncio.create_task(_purge_processed(settings)) if index == 0 else None
+    report = asyncio.create_task(recorder.report_forever()) if recorder else None
+    parent = multiprocessing.parent_process()
+    try:
+        while True:
+            try:
+                item = await asyncio.to_thread(inbox.get, True, 1.0)
+            except queue.Empty:
+                if parent is not None and not parent.is_alive():
+                    break
+                continue
+            if item is None:
+                break
+            seq, key, msg = item
+            runner.submit(key, msg, lambda ok, error, seq=seq: results.put((seq, ok, error)))
+        await runner.join()
+    finally:
+        if purge is not None:
+            purge.cancel()
+        if report is not None:
+            report.cancel()
+        await close_write_behind()
+        await close_external_api()
+        await dispose_engines()
+
+
+def run_child(index: int, inbox, results) -> None:
+    # O encerramento é coordenado pelo supervisor (sentinela na caixa de entrada).
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    settings = get_settings()
+    configure_from_settings(settings)
+    asyncio.run(_child_loop(index, inbox, results, settings))
+
+
+async def supervisor_loop(target: ChildTarget = run_child) -> None:
+    settings = get_settings()
+    configure_from_settings(settings)
+    bus = provide_message_bus(settings)
+    retry = provide_retry_scheduler(settings, bus)
+    supervisor = WorkerSupervisor(
+        bus,
+        target,
+        processes=settings.WORKER_PROCESSES or None,
+        prefetch=settings.WORKER_PREFETCH,
+        drain_timeout=settings.WORKER_DRAIN_TIMEOUT,
+        restart_backoff=settings.WORKER_RESTART_BACKOFF,
+        retry=retry,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, supervisor.stop)
+    try:
+        await supervisor.run()
+    finally:
+        if retry is not None:
+            await retry.close()
+        await bus.close()
+        logger.info("Supervisor encerrado")
+
+
+if __name__ == "__main__":
+    asyncio.run(supervisor_loop())
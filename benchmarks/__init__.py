@@ -0,0 +1 @@
+# Benchmarks de ponta a ponta do pipeline de eventos (python -m benchmarks).
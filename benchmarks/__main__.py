@@ -0,0 +1,126 @@
+"""Executa os benchmarks e grava os resultados em JSON.
+
+Uso: python -m benchmarks [--scenario NOME ...] [--iterations N] [--concurrency C]
+                          [--api-latency-ms MS] [--compare resultado_anterior.json]
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+import subprocess
+import tempfile
+import argparse
+import platform
+import asyncio
+import inspect
+import json
+import sys
+import os
+
+SCENARIO_NAMES = ["process_event", "process_item_from_queue", "http_process", "lambda_handler"]
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_table(scenarios: dict) -> None:
+    header = f"{'scenario':<26}{'ops':>8}{'err':>6}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, s in scenarios.items():
+        print(
+            f"{name:<26}{s['ops']:>8}{s['errors']:>6}{s['throughput_ops']:>12.1f}"
+            f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+        )
+
+
+def _print_comparison(current: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text())["scenarios"]
+    print(f"\nComparação com {baseline_path}:")
+    for name, s in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        deltas = []
+        for key in ("throughput_ops", "p50_ms", "p99_ms"):
+            if base[key]:
+                deltas.append(f"{key} {100 * (s[key] - base[key]) / base[key]:+.1f}%")
+        print(f"  {name:<26}" + "  ".join(deltas))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--scenario", action="append", choices=SCENARIO_NAMES)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--lambda-batch-size", type=int, default=10)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", type=Path, help="arquivo JSON de saída")
+    parser.add_argument("--compare", type=Path, help="resultado anterior para comparação")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    db_url = f"sqlite+aiosqlite:///{workdir}/bench.db"
+    # As entradas HTTP e Lambda leem Settings do ambiente: precisa vir antes dos imports.
+    os.environ["DB_URL"] = db_url
+    os.environ["MESSAGE_BROKER"] = "in_memory"
+    os.environ["IN_MEMORY_BUS_MAXSIZE"] = str(args.iterations + 1)
+    os.environ["LOG_LEVEL"] = args.log_level
+
+    from app.infrastructure.logging.logger import configure_logger
+    from benchmarks.scenarios import SCENARIOS, BenchConfig
+
+    configure_logger(args.log_level, use_queue=True)
+
+    config = BenchConfig(
+        db_url=db_url,
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        api_latency_ms=args.api_latency_ms,
+        lambda_batch_size=args.lambda_batch_size,
+    )
+    results = {}
+    for name in args.scenario or SCENARIO_NAMES:
+        scenario = SCENARIOS[name]
+        if inspect.iscoroutinefunction(scenario):
+            result = asyncio.run(scenario(config))
+        else:
+            result = scenario(config)
+        results[name] = result.summary()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(config).items() if k != "db_url"},
+        "env": {
+            k: v
+            for k, v in os.environ.items()
+            if k.startswith(("DB_", "ITEM_", "OUTBOX_", "LAMBDA_", "EXTERNAL_API_"))
+            and k != "DB_URL"
+        },
+        "scenarios": results,
+    }
+    output = args.output or RESULTS_DIR / (
+        datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    _print_table(results)
+    print(f"\nResultados salvos em {output}")
+    if args.compare:
+        _print_comparison(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Gerador de carga: eventos ItemToProcess no broker ou POST /process via HTTP.
+
+Uso: python -m benchmarks.loadgen [--target bus|http] [--rate N] [--count N]
+                                  [--concurrency C] [--url URL] [--consume]
+
+Com `--rate` > 0 a carga é open-loop: cada envio sai no horário planejado,
+sem esperar os anteriores; atraso em relação ao plano aparece em
+`schedule_lag_*`. Com `--rate 0` é closed-loop, com `--concurrency`
+produtores enviando o mais rápido possível. Todo evento leva `produced_at`,
+usado pelo worker para medir o lag fim a fim. O broker e o banco vêm do
+ambiente (Settings), como nas demais entradas.
+"""
+
+from app.infrastructure.persistence.db import dispose_engines, get_session_local, init_db
+from app.infrastructure.observability.throughput import ThroughputRecorder
+from app.infrastructure.persistence.repository import ItemRepository
+from app.infrastructure.logging.logger import configure_logger
+from app.interfaces.worker.main import build_handler
+from app.interfaces.worker.runtime import WorkerRuntime
+from benchmarks.stats import ScenarioResult, percentile, run_concurrent
+from app.infrastructure.providers import provide_message_bus
+from app.config.settings import Settings, get_settings
+from app.domain.entities import Item, Status
+from typing import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+import argparse
+import asyncio
+import httpx
+import json
+import time
+import uuid
+import sys
+
+SEED_CHUNK = 1000
+
+
+@dataclass
+class LoadConfig:
+    target: str = "bus"
+    rate: float = 100.0
+    count: int = 1000
+    concurrency: int = 50
+    url: str = "http://localhost:8000"
+    seed: bool = True
+    consume: bool = False
+    consume_timeout: float = 60.0
+
+
+def _item_id(run_id: str, i: int) -> str:
+    return f"load-{run_id}-{i}"
+
+
+def make_event(run_id: str, i: int) -> dict:
+    return {
+        "type": "ItemToProcess",
+        "item_id": _item_id(run_id, i),
+        "event_id": uuid.uuid4().hex,
+        "produced_at": time.time(),
+    }
+
+
+def make_payload(run_id: str, i: int) -> dict:
+    return {"id": _item_id(run_id, i), "name": "load", "produced_at": time.time()}
+
+
+async def open_loop(
+    send: Callable[[int], Awaitable[object]], count: int, rate: float, max_inflight: int
+) -> tuple[ScenarioResult, list[float]]:
+    """Envia `count` eventos a `rate`/s; devolve o resultado e o atraso de cada envio.
+
+    `max_inflight` só protege a memória do gerador: se for atingido, o envio
+    atrasa e isso aparece no atraso em relação ao plano.
+    """
+    result = ScenarioResult("open_loop")
+    schedule_lag: list[float] = []
+    slots = asyncio.Semaphore(max(max_inflight, 1))
+    tasks: set[asyncio.Task] = set()
+
+    async def one(i: int) -> None:
+        start = time.perf_counter()
+        try:
+            await send(i)
+        except Exception:
+            result.errors += 1
+        else:
+            result.latencies.append(time.perf_counter() - start)
+        finally:
+            slots.release()
+
+    started = time.perf_counter()
+    for i in range(count):
+        due = started + i / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await slots.acquire()
+        schedule_lag.append(max(time.perf_counter() - due, 0.0))
+        task = asyncio.create_task(one(i))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    result.duration = time.perf_counter() - started
+    return result, schedule_lag
+
+
+async def _seed_items(settings: Settings, run_id: str, count: int) -> None:
+    """Cria os itens que os eventos vão referenciar; sem isso o worker só vê falhas."""
+    await init_db(settings.DB_URL)
+    SessionLocal = get_session_local(settings.DB_URL, settings)
+    for start in range(0, count, SEED_CHUNK):
+        async with SessionLocal() as session:
+            await ItemRepository(session).save_many(
+                [
+                    Item(id=_item_id(run_id, i), name="load", status=Status("initialized"))
+                    for i in range(start, min(start + SEED_CHUNK, count))
+                ]
+            )
+
+
+async def _consume(bus, settings: Settings, expected: int, timeout: float) -> dict:
+    recorder = ThroughputRecorder()
+    runtime = WorkerRuntime(
+        bus,
+        build_handler(settings, recorder),
+        concurrency=settings.WORKER_CONCURRENCY,
+        prefetch=settings.WORKER_PREFETCH,
+    )
+    running = asyncio.create_task(runtime.run())
+    deadline = time.monotonic() + timeout
+    while recorder.total < expected and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    runtime.stop()
+    await running
+    return recorder.snapshot()
+
+
+async def run_load(config: LoadConfig, settings: Settings | None = None, bus=None) -> dict:
+    settings = settings or get_settings()
+    run_id = uuid.uuid4().hex[:8]
+    client: httpx.AsyncClient | None = None
+    consumer: asyncio.Task | None = None
+    if config.target == "http":
+        client = httpx.AsyncClient(
+            base_url=config.url,
+            limits=httpx.Limits(max_connections=max(config.concurrency, 1)),
+        )
+
+        async def send(i: int) -> None:
+            resp = await client.post("/process", json=make_payload(run_id, i))
+            resp.raise_for_status()
+
+    else:
+        if config.seed:
+            await _seed_items(settings, run_id, config.count)
+
+        async def send(i: int) -> None:
+            await bus.send(make_event(run_id, i))
+
+    # Só fecha o bus que ela mesma criou; um bus recebido continua com quem o passou.
+    owned_bus = bus is None and (config.target == "bus" or config.consume)
+    if owned_bus:
+        bus = provide_message_bus(settings)
+    try:
+        if config.consume:
+            # O consumidor começa junto com a carga: o lag inclui o tempo em fila.
+            consumer = asyncio.create_task(
+                _consume(bus, settings, config.count, config.consume_timeout)
+            )
+        if config.rate > 0:
+            result, schedule_lag = await open_loop(
+                send, config.count, config.rate, config.concurrency
+            )
+        else:
+            result = await run_concurrent(
+                "closed_loop", send, config.count, config.concurrency
+            )
+            schedule_lag = []
+        lags = sorted(schedule_lag)
+        report = {
+            "target": config.target,
+            "mode": "open_loop" if config.rate > 0 else "closed_loop",
+            "target_rate": config.rate,
+            **result.summary(),
+            "schedule_lag_p50_ms": round(percentile(lags, 50) * 1000, 3),
+            "schedule_lag_p99_ms": round(percentile(lags, 99) * 1000, 3),
+        }
+        if consumer is not None:
+            report["consumer"] = await consumer
+        return report
+    finally:
+        if consumer is not None and not consumer.done():
+            consumer.cancel()
+        if client is not None:
+            await client.aclose()
+        if owned_bus:
+            await bus.close()
+        await dispose_engines()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen")
+    parser.add_argument("--target", choices=["bus", "http"], default="bus")
+    parser.add_argument("--rate", type=float, default=100.0, help="eventos/s; 0 = closed-loop")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--no-seed", dest="seed", action="store_false")
+    parser.add_argument("--consume", action="store_true", help="roda um worker no processo")
+    parser.add_argument("--consume-timeout", type=float, default=60.0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", type=Path, help="arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    configure_logger(args.log_level, use_queue=True, force=True)
+    config = LoadConfig(
+        target=args.target,
+        rate=args.rate,
+        count=args.count,
+        concurrency=args.concurrency,
+        url=args.url,
+        seed=args.seed,
+        consume=args.consume,
+        consume_timeout=args.consume_timeout,
+    )
+    report = asyncio.run(run_load(config))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+from app.application.use_cases.process_item_from_queue import ProcessItemFromQueue
+from app.infrastructure.messaging.in_memory_bus import InMemoryBroker, InMemoryMessageBus
+from app.infrastructure.persistence.db import dispose_engines, get_session_local, init_db
+from app.application.use_cases.process_event import ProcessEvent
+from app.infrastructure.persistence.repository import ItemRepository
+from app.application.dtos import ProcessEventInput
+from app.infrastructure import providers
+from app.domain.entities import Item, Status
+from app.interfaces.http.main import create_app
+from benchmarks.stats import ScenarioResult, run_concurrent
+from app.config.settings import Settings
+from dataclasses import dataclass
+import importlib
+import asyncio
+import httpx
+import json
+import time
+import uuid
+
+
+@dataclass
+class BenchConfig:
+    db_url: str
+    iterations: int = 2000
+    concurrency: int = 50
+    api_latency_ms: float = 0.0
+    lambda_batch_size: int = 10
+
+
+class StubExternalApi:
+    """ExternalApiClient sem rede, com latência fixa opcional."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def _wait(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+
+    async def get(self, path: str, params: dict | None = None):
+        await self._wait()
+        return {"ok": True}
+
+    async def post(self, path: str, data: dict):
+        await self._wait()
+        return {"ok": True}
+
+    async def close(self) -> None:
+        return None
+
+
+def _settings(config: BenchConfig) -> Settings:
+    return Settings(DB_URL=config.db_url, MESSAGE_BROKER="in_memory")
+
+
+def _sink_bus(config: BenchConfig) -> InMemoryMessageBus:
+    # Ninguém consome nos cenários: a fila precisa caber a rodada inteira.
+    return InMemoryMessageBus(InMemoryBroker(maxsize=config.iterations + 1))
+
+
+def _run_id() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+async def bench_process_event(config: BenchConfig) -> ScenarioResult:
+    settings = _settings(config)
+    await init_db(config.db_url)
+    bus = _sink_bus(config)
+    api = StubExternalApi(config.api_latency_ms / 1000)
+    run_id = _run_id()
+
+    async def operation(i: int):
+        use_case = ProcessEvent(providers.provide_unit_of_work(settings), bus, api)
+        await use_case.execute(ProcessEventInput({"id": f"pe-{run_id}-{i}", "name": "bench"}))
+
+    try:
+        return await run_concurrent(
+            "process_event", operation, config.iterations, config.concurrency
+        )
+    finally:
+        await dispose_engines()
+
+
+async def bench_process_item_from_queue(config: BenchConfig) -> ScenarioResult:
+    settings = _settings(config)
+    await init_db(config.db_url)
+    run_id = _run_id()
+    ids = [f"pq-{run_id}-{i}" for i in range(config.iterations)]
+    async with get_session_local(config.db_url, settings)() as session:
+        await ItemRepository(session).save_many(
+            [Item(id=id, name="bench", status=Status("initialized")) for id in ids]
+        )
+
+    async def operation(i: int):
+        await ProcessItemFromQueue(providers.provide_unit_of_work(settings)).execute(ids[i])
+
+    try:
+        return await run_concurrent(
+            "process_item_from_queue", operation, config.iterations, config.concurrency
+        )
+    finally:
+        await dispose_engines()
+
+
+async def bench_http_process(config: BenchConfig) -> ScenarioResult:
+    """POST /process via ASGI, sem socket; usa DB_URL do ambiente."""
+    app = create_app()
+    await init_db(config.db_url)
+    run_id = _run_id()
+    # O cliente externo é compartilhado pelo processo: troca pelo stub durante a rodada.
+    previous_api = providers._external_api
+    providers._external_api = StubExternalApi(config.api_latency_ms / 1000)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def operation(i: int):
+                resp = await client.post(
+                    "/process", json={"id": f"http-{run_id}-{i}", "name": "bench"}
+                )
+                resp.raise_for_status()
+
+            return await run_concurrent(
+                "http_process", operation, config.iterations, config.concurrency
+            )
+    finally:
+        providers._external_api = previous_api
+        await dispose_engines()
+
+
+def bench_lambda_handler(config: BenchConfig) -> ScenarioResult:
+    """Batches SQS pelo handler síncrono; latências são por batch."""
+    handler = importlib.import_module("app.interfaces.lambda.handler")
+    loop = handler._get_loop()
+    loop.run_until_complete(init_db(config.db_url))
+    previous_adapters = dict(handler._adapters)
+    handler._adapters.update(
+        bus=_sink_bus(config), api=StubExternalApi(config.api_latency_ms / 1000)
+    )
+    batch_size = max(config.lambda_batch_size, 1)
+    result = ScenarioResult("lambda_handler", unit_ops=batch_size)
+    run_id = _run_id()
+    try:
+        started = time.perf_counter()
+        for batch in range(max(config.iterations // batch_size, 1)):
+            event = {
+                "Records": [
+                    {
+                        "messageId": f"m-{batch}-{n}",
+                        "body": json.dumps(
+                            {"id": f"lh-{run_id}-{batch}-{n}", "name": "bench"}
+                        ),
+                    }
+                    for n in range(batch_size)
+                ]
+            }
+            start = time.perf_counter()
+            response = handler.handler(event, None)
+            elapsed = time.perf_counter() - start
+            failures = response.get("batchItemFailures")
+            if failures is None:
+                result.errors += batch_size
+            elif failures:
+                result.errors += len(failures)
+            else:
+                result.latencies.append(elapsed)
+        result.duration = time.perf_counter() - started
+        return result
+    finally:
+        handler._adapters.clear()
+        handler._adapters.update(previous_adapters)
+        loop.run_until_complete(dispose_engines())
+
+
+SCENARIOS = {
+    "process_event": bench_process_event,
+    "process_item_from_queue": bench_process_item_from_queue,
+    "http_process": bench_http_process,
+    "lambda_handler": bench_lambda_handler,
+}
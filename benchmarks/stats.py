@@ -0,0 +1,65 @@
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+import asyncio
+import time
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Percentil com interpolação linear sobre valores já ordenados."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    duration: float = 0.0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+    # Operações lógicas por medição (ex.: registros por batch do Lambda).
+    unit_ops: int = 1
+
+    def summary(self) -> dict:
+        values = sorted(self.latencies)
+        ops = len(values) * self.unit_ops
+        return {
+            "ops": ops,
+            "errors": self.errors,
+            "duration_s": round(self.duration, 4),
+            "throughput_ops": round(ops / self.duration, 2) if self.duration else 0.0,
+            "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+        }
+
+
+async def run_concurrent(
+    name: str,
+    operation: Callable[[int], Awaitable[object]],
+    iterations: int,
+    concurrency: int,
+) -> ScenarioResult:
+    """Executa `operation(i)` para i em [0, iterations) com `concurrency` tarefas."""
+    result = ScenarioResult(name)
+    counter = iter(range(iterations))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                await operation(i)
+            except Exception:
+                result.errors += 1
+                continue
+            result.latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    result.duration = time.perf_counter() - start
+    return result
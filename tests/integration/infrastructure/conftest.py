@@ -0,0 +1,20 @@
+from app.infrastructure.persistence.db import dispose_engines, get_session_local, init_db
+import pytest_asyncio
+import tempfile
+import os
+
+
+@pytest_asyncio.fixture
+async def sqlite_url():
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite+aiosqlite:///{db_path}"
+    await init_db(url)
+    yield url
+    await dispose_engines()
+    os.remove(db_path)
+
+
+@pytest_asyncio.fixture
+async def session_local(sqlite_url):
+    return get_session_local(sqlite_url)
@@ -0,0 +1,51 @@
+from app.infrastructure.persistence.db import (
+    TimedAsyncQueuePool,
+    dispose_engines,
+    get_engine,
+    get_pool_stats,
+    get_session_local,
+    init_db,
+)
+from app.config.settings import Settings
+from sqlalchemy.pool import StaticPool
+from sqlalchemy import text
+import tempfile
+import pytest
+import os
+
+
+@pytest.mark.asyncio
+async def test_engine_is_reused_per_url():
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite+aiosqlite:///{db_path}"
+    settings = Settings(DB_URL=url, DB_POOL_SIZE=2, DB_MAX_OVERFLOW=0)
+    try:
+        engine = get_engine(url, settings)
+        assert get_engine(url, settings) is engine
+        assert get_session_local(url, settings) is get_session_local(url, settings)
+        assert isinstance(engine.sync_engine.pool, TimedAsyncQueuePool)
+        assert engine.sync_engine.pool.size() == 2
+
+        await init_db(url)
+        async with get_session_local(url, settings)() as session:
+            await session.execute(text("select 1"))
+
+        stats = next(iter(get_pool_stats().values()))
+        assert stats["checkouts"] >= 2
+        assert stats["max_wait_ms"] >= 0
+    finally:
+        await dispose_engines()
+        os.remove(db_path)
+
+    assert get_engine(url, settings) is not engine
+    await dispose_engines()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_memory_uses_static_pool():
+    engine = get_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        assert isinstance(engine.sync_engine.pool, StaticPool)
+    finally:
+        await dispose_engines()
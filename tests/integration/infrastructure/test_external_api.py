@@ -1,4 +1,8 @@
-from app.infrastructure.external.http_client import HttpExternalApiClient
+from app.infrastructure.external.limiter import AdaptiveLimiter, ApiLimiter, AimdLimit
+from app.infrastructure.external.response_cache import ResponseCache, cache_key
+from app.infrastructure.external.http_client import HttpExternalApiClient, RetryPolicy
+import asyncio
+import httpx
 import pytest
 
 
@@ -7,3 +11,192 @@ async def test_get_json_httpbin():
     client = HttpExternalApiClient(base_url="https://httpbin.org")
     data = await client.get_json("/json")
     assert "slideshow" in data
+
+
+def _client(handler, **policy):
+    return HttpExternalApiClient(
+        base_url="https://api.test",
+        transport=httpx.MockTransport(handler),
+        retry_policy=RetryPolicy(backoff_base=0, **policy),
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_retries_retryable_status():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    client = _client(handler, max_retries=2)
+    assert await client.get("/ref", params={"a": 1}) == {"ok": True}
+    assert len(calls) == 3
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_after_response():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = _client(handler, max_retries=3)
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.post("/post", {"a": 1})
+    assert len(calls) == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_post_retries_when_connection_failed():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    client = _client(handler)
+    assert await client.post("/post", {"a": 1}) == {"ok": True}
+    assert len(calls) == 2
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_caps_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = _client(handler, max_retries=5, budget_ratio=0.0, budget_min_tokens=2)
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("/ref")
+    # 3 tentativas originais + 2 retries permitidos pelo orçamento.
+    assert len(calls) == 5
+    await client.close()
+
+
+def _cached_client(handler, **cache):
+    return HttpExternalApiClient(
+        base_url="https://api.test",
+        transport=httpx.MockTransport(handler),
+        response_cache=ResponseCache(**cache),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_share_one_call():
+    calls = []
+
+    async def handler(request):
+        calls.append(str(request.url))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"ref": request.url.params["id"]})
+
+    client = HttpExternalApiClient(
+        base_url="https://api.test", transport=httpx.MockTransport(handler)
+    )
+    results = await asyncio.gather(
+        *(client.get("/ref", params={"id": "1", "v": "2"}) for _ in range(5)),
+        client.get("/ref", params={"v": "2", "id": "1"}),
+        client.get("/ref", params={"id": "2"}),
+    )
+    assert results == [{"ref": "1"}] * 6 + [{"ref": "2"}]
+    assert len(calls) == 2
+    # Sem cache, a chamada seguinte vai de novo à rede.
+    await client.get("/ref", params={"id": "2"})
+    assert len(calls) == 3
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_get_cache_respects_max_age_and_no_store():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        cache_control = "no-store" if request.url.path == "/live" else "max-age=60"
+        headers = {"Cache-Control": cache_control}
+        return httpx.Response(200, json={"n": len(calls)}, headers=headers)
+
+    client = _cached_client(handler)
+    first = await client.get("/ref")
+    first["n"] = "mutated"
+    assert await client.get("/ref") == {"n": 1}
+    assert await client.get_json("/ref") == {"n": 1}
+    await client.get("/live")
+    await client.get("/live")
+    assert calls == ["/ref", "/live", "/live"]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_revalidated_with_etag(clock):
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"Cache-Control": "max-age=10"})
+        return httpx.Response(
+            200, json={"v": 1}, headers={"ETag": '"v1"', "Cache-Control": "max-age=10"}
+        )
+
+    client = _cached_client(handler, clock=clock)
+    assert await client.get("/ref") == {"v": 1}
+    clock.now = 11
+    assert await client.get("/ref") == {"v": 1}
+    assert await client.get("/ref") == {"v": 1}
+    assert seen == [None, '"v1"']
+    await client.close()
+
+
+def test_cache_control_freshness_rules(clock):
+    cache = ResponseCache(default_ttl=0, max_ttl=100, stale_ttl=0, clock=clock)
+    assert cache.is_fresh(cache.store("a", b"{}", {"cache-control": "max-age=30", "age": "10"}))
+    assert cache.get("a").fresh_until == 20
+    assert cache.store("b", b"{}", {"cache-control": "max-age=9999"}).fresh_until == 100
+    cache.store("c", b"{}", {"cache-control": "no-cache"})
+    cache.store("d", b"{}", {})
+    assert cache.get("c") is None and cache.get("d") is None
+    assert cache_key("/p", {"b": 1, "a": 2}) == cache_key("/p", {"a": 2, "b": 1}) == "/p?a=2&b=1"
+
+
+@pytest.mark.asyncio
+async def test_limiter_only_sees_network_calls():
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={}, headers={"Cache-Control": "max-age=60"})
+
+    limiter = ApiLimiter(AdaptiveLimiter(AimdLimit(initial=5, max_limit=100)))
+    seen = []
+    call = limiter.call
+
+    async def counting(send):
+        seen.append(1)
+        return await call(send)
+
+    limiter.call = counting
+    client = HttpExternalApiClient(
+        base_url="https://api.test",
+        transport=httpx.MockTransport(handler),
+        response_cache=ResponseCache(),
+        limiter=limiter,
+    )
+    # Coalescidos e acertos de cache não gastam vaga nem viram amostra do AIMD.
+    await asyncio.gather(*(client.get("/ref") for _ in range(5)))
+    await client.get_json("/ref")
+    assert len(seen) == 1
+    assert limiter.limiter.limit.limit == pytest.approx(5.2)
+    await client.post_json("/post", {})
+    assert len(seen) == 2
+    await client.close()
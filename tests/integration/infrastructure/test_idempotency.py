@@ -0,0 +1,57 @@
+from app.application.use_cases.process_item_from_queue import ProcessItemFromQueue
+from app.infrastructure.persistence.db import get_session_local
+from app.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
+from app.infrastructure.persistence.idempotency import IdempotencyStore
+from app.infrastructure.persistence.repository import ItemRepository
+from app.interfaces.worker.main import build_handler
+from app.domain.entities import Item, Status
+from app.infrastructure.cache import TTLCache
+from app.config.settings import Settings
+import pytest
+
+
+async def _seed(url, *ids):
+    async with get_session_local(url)() as session:
+        await ItemRepository(session).save_many(
+            [Item(id=id, name="A", status=Status("initialized")) for id in ids]
+        )
+
+
+@pytest.mark.asyncio
+async def test_processed_key_commits_with_the_unit_of_work(sqlite_url):
+    session_local = get_session_local(sqlite_url)
+    store = IdempotencyStore(session_local, TTLCache())
+
+    async with SqlAlchemyUnitOfWork(session_local) as uow:
+        await uow.processed.add("event:rolled-back")
+    assert not await store.seen("event:rolled-back")
+
+    async with SqlAlchemyUnitOfWork(session_local) as uow:
+        await uow.processed.add("event:1")
+        await uow.processed.add("event:1")
+        await uow.commit()
+    # Outra instância (outro worker): cache vazio, encontra no banco.
+    other = IdempotencyStore(session_local, TTLCache())
+    assert await other.seen("event:1")
+    assert other.cache.get("event:1") is True
+
+    assert await other.purge(retention=3600) == 0
+    assert await other.purge(retention=-1) == 1
+    assert not await IdempotencyStore(session_local, TTLCache()).seen("event:1")
+
+
+@pytest.mark.asyncio
+async def test_worker_skips_redelivered_messages(sqlite_url, monkeypatch):
+    await _seed(sqlite_url, "d1")
+    settings = Settings(DB_URL=sqlite_url, MESSAGE_BROKER="in_memory", DEDUP_ENABLED=True)
+    handler = build_handler(settings)
+    message = {"body": {"item_id": "d1", "event_id": "e-1"}, "message_id": "m-1"}
+    await handler(message)
+
+    async def fail(self, *args, **kwargs):
+        raise AssertionError("duplicate reprocessed")
+
+    monkeypatch.setattr(ProcessItemFromQueue, "execute", fail)
+    await handler(message)
+    # Mesmo evento republicado (ex.: pelo relay) chega com outro message_id.
+    await handler({"body": {"item_id": "d1", "event_id": "e-1"}, "message_id": "m-2"})
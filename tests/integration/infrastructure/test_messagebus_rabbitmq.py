@@ -1,6 +1,10 @@
 from app.infrastructure.messaging.rabbitmq_bus import RabbitMQMessageBus
+from app.infrastructure.messaging.codec import MessageCodec
 from unittest.mock import AsyncMock, patch
+import aio_pika
+import asyncio
 import pytest
+import json
 
 
 @pytest.mark.asyncio
@@ -21,3 +25,212 @@ async def test_rabbitmq_bus_send_receive_mock():
         received = await bus.receive()
         assert "body" in received
         assert "hello" in received["body"]
+
+
+class FakeIncomingMessage:
+    def __init__(self, body: bytes, message_id: str, headers=None):
+        self.body = body
+        self.message_id = message_id
+        self.headers = headers or {}
+        self.state = None
+
+    async def ack(self):
+        self.state = "ack"
+
+    async def nack(self, requeue=True):
+        self.state = "nack"
+
+    async def reject(self, requeue=False):
+        self.state = "reject"
+
+
+class FakeExchange:
+    def __init__(self, fail_every=0):
+        self.published = []
+        self.fail_every = fail_every
+
+    async def publish(self, message, routing_key):
+        try:
+            body = json.loads(message.body)
+        except ValueError:
+            body = message.body
+        self.published.append((body, routing_key))
+        self.headers = message.headers
+        if self.fail_every and len(self.published) % self.fail_every == 0:
+            raise RuntimeError("nack do broker")
+
+
+class FakeQueue:
+    def __init__(self):
+        self.callback = None
+        self.consume_calls = 0
+
+    async def consume(self, callback, no_ack=False):
+        assert no_ack is False
+        self.consume_calls += 1
+        self.callback = callback
+        return "ctag"
+
+    async def cancel(self, consumer_tag):
+        self.callback = None
+
+
+class FakeChannel:
+    def __init__(self, exchange):
+        self.default_exchange = exchange
+        self.queue = FakeQueue()
+        self.prefetch = None
+        self.declare_calls = 0
+        self.declared = {}
+
+    async def set_qos(self, prefetch_count):
+        self.prefetch = prefetch_count
+
+    async def declare_queue(self, name, durable, arguments=None):
+        self.declare_calls += 1
+        self.declared[name] = arguments
+        return self.queue
+
+
+class FakeConnection:
+    def __init__(self, channel):
+        self._channel = channel
+        self.publisher_confirms = None
+        self.closed = False
+
+    async def channel(self, publisher_confirms=True):
+        self.publisher_confirms = publisher_confirms
+        return self._channel
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_rabbit(monkeypatch):
+    channel = FakeChannel(FakeExchange(fail_every=3))
+    conn = FakeConnection(channel)
+
+    async def connect_robust(url):
+        return conn
+
+    monkeypatch.setattr(aio_pika, "connect_robust", connect_robust)
+    return conn, channel
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_persistent_consumer_with_manual_ack(fake_rabbit):
+    conn, channel = fake_rabbit
+    bus = RabbitMQMessageBus(url="amqp://fake/", prefetch_count=7)
+    receiving = asyncio.create_task(bus.receive())
+    await asyncio.sleep(0)
+    while channel.queue.callback is None:
+        await asyncio.sleep(0)
+
+    bad = FakeIncomingMessage(b"not json", "m0")
+    good = [FakeIncomingMessage(json.dumps({"n": i}).encode(), f"m{i}") for i in (1, 2, 3)]
+    for message in [bad, *good]:
+        await channel.queue.callback(message)
+
+    first = await receiving
+    assert first["body"] == {"n": 1}
+    assert bad.state == "reject"
+    assert good[0].state is None
+
+    rest = await bus.receive_many(max_messages=10)
+    assert [m["body"] for m in rest] == [{"n": 2}, {"n": 3}]
+    assert channel.queue.consume_calls == 1
+    assert channel.declare_calls == 1
+    assert channel.prefetch == 7
+    assert conn.publisher_confirms is True
+
+    await bus.ack(first["receipt"])
+    await bus.nack(rest[0]["receipt"])
+    assert good[0].state == "ack"
+    assert good[1].state == "nack"
+
+    await bus.close()
+    assert conn.closed
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_send_many_reports_unconfirmed(fake_rabbit):
+    _, channel = fake_rabbit
+    bus = RabbitMQMessageBus(url="amqp://fake/", publish_batch_size=4)
+    events = [{"n": i} for i in range(6)]
+    failed = await bus.send_many(events)
+    assert [body for body, _ in channel.default_exchange.published] == events
+    assert failed == [{"n": 2}, {"n": 5}]
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_envelope_is_validated_and_decoded_lazily(fake_rabbit):
+    _, channel = fake_rabbit
+    bus = RabbitMQMessageBus(url="amqp://fake/")
+    receiving = asyncio.create_task(bus.receive())
+    while channel.queue.callback is None:
+        await asyncio.sleep(0)
+
+    envelope = MessageCodec(compress_threshold=1).encode({"type": "T", "item_id": "7", "n": 1})
+    future = FakeIncomingMessage(envelope.body, "m0", {**envelope.headers, "x-codec-version": "2"})
+    good = FakeIncomingMessage(envelope.body, "m1", envelope.headers)
+    await channel.queue.callback(future)
+    await channel.queue.callback(good)
+
+    message = await receiving
+    assert future.state == "reject"
+    assert message["body"].event_type == "T"
+    assert message["body"]["item_id"] == "7"
+    assert message["body"] == {"type": "T", "item_id": "7", "n": 1}
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_undecodable_message_is_copied_to_the_dlq(fake_rabbit):
+    _, channel = fake_rabbit
+    channel.default_exchange.fail_every = 0
+    bus = RabbitMQMessageBus(url="amqp://fake/", dead_letter_queue="events.dlq")
+    receiving = asyncio.create_task(bus.receive())
+    while channel.queue.callback is None:
+        await asyncio.sleep(0)
+
+    bad = FakeIncomingMessage(b"not json", "m0", {"x-trace": "t1"})
+    await channel.queue.callback(bad)
+    await channel.queue.callback(FakeIncomingMessage(b'{"n": 1}', "m1"))
+    await receiving
+
+    assert bad.state == "reject"
+    assert channel.default_exchange.published == [(b"not json", "events.dlq")]
+    assert channel.default_exchange.headers["x-trace"] == "t1"
+    assert "x-error" in channel.default_exchange.headers
+    assert channel.declared["events.dlq"] is None
+
+    # Sem a cópia confirmada na DLQ, a mensagem volta para a fila.
+    channel.default_exchange.fail_every = 1
+    receiving = asyncio.create_task(bus.receive())
+    await channel.queue.callback(bad)
+    await asyncio.sleep(0)
+    assert bad.state == "nack"
+    receiving.cancel()
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_send_delayed_goes_through_ttl_queues(fake_rabbit):
+    _, channel = fake_rabbit
+    channel.default_exchange.fail_every = 0
+    bus = RabbitMQMessageBus(url="amqp://fake/", queue_name="events")
+    await bus.send_delayed({"n": 1}, 3)
+    await bus.send_delayed({"n": 2}, 4)
+    await bus.send_delayed({"n": 3}, 0.2)
+    assert [key for _, key in channel.default_exchange.published] == [
+        "events.delay.4s",
+        "events.delay.4s",
+        "events.delay.1s",
+    ]
+    assert channel.declared["events.delay.4s"] == {
+        "x-message-ttl": 4000,
+        "x-dead-letter-exchange": "",
+        "x-dead-letter-routing-key": "events",
+    }
+    assert channel.declare_calls == 3
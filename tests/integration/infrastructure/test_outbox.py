@@ -0,0 +1,53 @@
+from app.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
+from app.infrastructure.persistence.outbox import OutboxRelay
+from app.infrastructure.persistence.models import OutboxModel
+from app.domain.entities import Item, Status
+from sqlalchemy import func, select
+import pytest
+
+
+class BatchBus:
+    def __init__(self, reject=()):
+        self.batches = []
+        self.reject = set(reject)
+
+    async def send_many(self, events):
+        self.batches.append(events)
+        return [e for e in events if e["item_id"] in self.reject]
+
+
+async def _outbox_count(session_local):
+    async with session_local() as session:
+        return await session.scalar(select(func.count()).select_from(OutboxModel))
+
+
+@pytest.mark.asyncio
+async def test_outbox_written_with_item_and_relayed_in_batches(session_local):
+    async with SqlAlchemyUnitOfWork(session_local) as uow:
+        for i in range(5):
+            await uow.items.save(Item(id=f"o{i}", name="A", status=Status("initialized")))
+            await uow.outbox.add({"type": "ItemToProcess", "item_id": f"o{i}"})
+        await uow.commit()
+    assert await _outbox_count(session_local) == 5
+
+    bus = BatchBus(reject={"o3"})
+    relay = OutboxRelay(session_local, bus, batch_size=2)
+    assert await relay.relay_once() == 2
+    assert await relay.relay_once() == 1
+    assert await relay.relay_once() == 1
+    assert [len(b) for b in bus.batches] == [2, 2, 2]
+    # o3 foi rejeitado pelo broker e volta na próxima rodada.
+    assert await _outbox_count(session_local) == 1
+    bus.reject.clear()
+    assert await relay.relay_once() == 1
+    assert await relay.relay_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_outbox_discarded_on_rollback(session_local):
+    with pytest.raises(RuntimeError):
+        async with SqlAlchemyUnitOfWork(session_local) as uow:
+            await uow.outbox.add({"type": "ItemToProcess", "item_id": "x"})
+            await uow.flush()
+            raise RuntimeError("falha")
+    assert await _outbox_count(session_local) == 0
@@ -1,4 +1,9 @@
-from app.infrastructure.persistence.db import get_engine, get_session_local, init_db
+from app.infrastructure.persistence.db import (
+    dispose_engines,
+    get_engine,
+    get_session_local,
+    init_db,
+)
 from app.infrastructure.persistence.repository import ItemRepository
 from app.domain.entities import Item, Status
 import tempfile
@@ -29,3 +34,66 @@ async def test_item_repository_crud():
         await engine.dispose()
     finally:
         pass
+
+
+@pytest.mark.asyncio
+async def test_item_repository_bulk_get_and_upsert():
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    SQLITE_URL = f"sqlite+aiosqlite:///{db_path}"
+    try:
+        await init_db(SQLITE_URL)
+        SessionLocal = get_session_local(SQLITE_URL)
+        async with SessionLocal() as session:
+            repo = ItemRepository(session)
+            items = [
+                Item(id=f"b{i}", name=f"Item {i}", status=Status("pending"))
+                for i in range(700)
+            ]
+            await repo.save_many(items)
+            loaded = await repo.get_many([i.id for i in items] + ["missing"])
+            assert len(loaded) == 700
+
+            await repo.save_many(
+                [
+                    Item(id="b1", name="Item 1", status=Status("initialized")),
+                    Item(id="b1", name="Item 1", status=Status("processed")),
+                    Item(id="b2", name="Renamed", status=Status("failed")),
+                ]
+            )
+            by_id = {i.id: i for i in await repo.get_many(["b1", "b2", "b3"])}
+            assert by_id["b1"].status == Status("processed")
+            assert by_id["b2"].name == "Renamed"
+            assert by_id["b3"].status == Status("pending")
+    finally:
+        await dispose_engines()
+        os.remove(db_path)
+
+
+@pytest.mark.asyncio
+async def test_iter_by_status_keyset_pages():
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    SQLITE_URL = f"sqlite+aiosqlite:///{db_path}"
+    try:
+        await init_db(SQLITE_URL)
+        async with get_session_local(SQLITE_URL)() as session:
+            repo = ItemRepository(session)
+            await repo.save_many(
+                [Item(id=f"i{n:03d}", name="A", status=Status("processed")) for n in range(25)]
+                + [Item(id=f"p{n:03d}", name="B", status=Status("pending")) for n in range(5)]
+            )
+            ids = [item.id async for item in repo.iter_by_status("processed", page_size=10)]
+            assert ids == [f"i{n:03d}" for n in range(25)]
+
+            resumed = [
+                item.id
+                async for item in repo.iter_by_status(
+                    Status("processed"), page_size=7, after_id="i019"
+                )
+            ]
+            assert resumed == [f"i{n:03d}" for n in range(20, 25)]
+            assert [item.id async for item in repo.iter_by_status("failed")] == []
+    finally:
+        await dispose_engines()
+        os.remove(db_path)
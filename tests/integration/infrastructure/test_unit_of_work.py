@@ -0,0 +1,60 @@
+from app.infrastructure.persistence.db import get_session_local
+from app.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
+from app.domain.entities import Item, Status
+from app.infrastructure.cache import TTLCache
+from sqlalchemy import event
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_once(sqlite_url):
+    session_local = get_session_local(sqlite_url)
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    engine = session_local.kw["bind"].sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        async with SqlAlchemyUnitOfWork(session_local) as uow:
+            await uow.items.save(Item(id="u1", name="A", status=Status("pending")))
+            assert (await uow.items.get("u1")).status == Status("pending")
+            await uow.items.save(Item(id="u1", name="A", status=Status("initialized")))
+            await uow.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert statements.count("INSERT") == 1
+
+    async with SqlAlchemyUnitOfWork(session_local) as uow:
+        loaded = await uow.items.get("u1")
+    assert loaded.status == Status("initialized")
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_without_commit(sqlite_url):
+    session_local = get_session_local(sqlite_url)
+    with pytest.raises(RuntimeError):
+        async with SqlAlchemyUnitOfWork(session_local) as uow:
+            await uow.items.save(Item(id="u2", name="A", status=Status("pending")))
+            await uow.flush()
+            raise RuntimeError("falha no meio do caso de uso")
+
+    async with SqlAlchemyUnitOfWork(session_local) as uow:
+        assert await uow.items.get("u2") is None
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_invalidates_shared_cache_on_commit(sqlite_url):
+    session_local = get_session_local(sqlite_url)
+    cache = TTLCache()
+    async with SqlAlchemyUnitOfWork(session_local, item_cache=cache) as uow:
+        assert await uow.items.get("c1") is None
+        await uow.items.save(Item(id="c1", name="A", status=Status("pending")))
+        await uow.commit()
+    assert "c1" not in cache._data
+
+    async with SqlAlchemyUnitOfWork(session_local, item_cache=cache) as uow:
+        assert (await uow.items.get("c1")).status == Status("pending")
+        await uow.items.get("c1")
+    assert cache.hits >= 1
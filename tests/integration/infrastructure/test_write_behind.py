@@ -0,0 +1,74 @@
+from app.infrastructure.persistence.unit_of_work import SqlAlchemyUnitOfWork
+from app.infrastructure.persistence.write_behind import WriteBehindBuffer
+from app.infrastructure.persistence.repository import ItemRepository
+from app.domain.entities import Item, Status
+from sqlalchemy import event
+import asyncio
+import pytest
+
+
+def _item(id, status):
+    return Item(id=id, name="A", status=Status(status))
+
+
+@pytest.mark.asyncio
+async def test_write_behind_coalesces_concurrent_saves(session_local):
+    engine = session_local.kw["bind"].sync_engine
+    inserts = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("INSERT"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    buffer = WriteBehindBuffer(session_local, max_batch=1000, max_delay=0.02)
+    try:
+        await asyncio.gather(
+            *(buffer.submit_many([_item(f"w{i}", "pending")]) for i in range(50)),
+            buffer.submit_many([_item("w0", "initialized")]),
+            buffer.submit_many([_item("w0", "processed")]),
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert len(inserts) == 1
+
+    async with session_local() as session:
+        repo = ItemRepository(session)
+        assert len(await repo.get_many([f"w{i}" for i in range(50)])) == 50
+        assert (await repo.get("w0")).status == Status("processed")
+
+
+@pytest.mark.asyncio
+async def test_write_behind_flushes_on_size(session_local):
+    buffer = WriteBehindBuffer(session_local, max_batch=3, max_delay=60)
+    await asyncio.wait_for(
+        asyncio.gather(*(buffer.submit_many([_item(f"s{i}", "pending")]) for i in range(3))),
+        timeout=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_write_behind_propagates_flush_errors():
+    def broken_session():
+        raise RuntimeError("db down")
+
+    buffer = WriteBehindBuffer(broken_session, max_delay=0.001)
+    with pytest.raises(RuntimeError):
+        await buffer.submit_many([_item("e1", "pending")])
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_in_write_behind_mode(session_local):
+    buffer = WriteBehindBuffer(session_local, max_delay=0.001)
+
+    async def run(i):
+        async with SqlAlchemyUnitOfWork(session_local, write_behind=buffer) as uow:
+            await uow.items.save(_item(f"u{i}", "pending"))
+            await uow.items.save(_item(f"u{i}", "initialized"))
+            await uow.commit()
+
+    await asyncio.gather(*(run(i) for i in range(10)))
+    async with SqlAlchemyUnitOfWork(session_local) as uow:
+        items = await uow.items.get_many([f"u{i}" for i in range(10)])
+    assert {str(i.status) for i in items} == {"initialized"}
+    assert len(items) == 10
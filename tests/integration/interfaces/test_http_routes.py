@@ -1,6 +1,10 @@
+from app.interfaces.http.streaming import StreamFormatError, iter_json_array
 from fastapi.testclient import TestClient
 from app.interfaces.http.main import create_app
+from app.config.settings import get_settings
+from app.interfaces.http import routers
 import pytest
+import json
 
 
 @pytest.fixture
@@ -32,3 +36,138 @@ def test_process_mock(monkeypatch, client):
     assert resp.status_code == 200
     assert resp.json()["success"] is True
     assert resp.json()["item_id"] == "abc"
+
+
+class StubApi:
+    async def get(self, path, params=None):
+        return {}
+
+    async def post(self, path, data):
+        return {}
+
+
+class RecordingBus:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, event):
+        self.sent.append(event)
+
+    async def send_many(self, events):
+        self.sent.extend(events)
+        return []
+
+
+def test_process_forwards_producer_timestamp(monkeypatch):
+    bus = RecordingBus()
+    monkeypatch.setattr(routers, "provide_external_api", lambda settings: StubApi())
+    monkeypatch.setattr(routers, "provide_message_bus", lambda settings: bus)
+    with TestClient(create_app()) as client:
+        resp = client.post("/process", json={"id": "p1", "name": "A", "produced_at": 123.5})
+        assert resp.json()["success"] is True
+        client.post(
+            "/process/batch",
+            json=[{"id": "p2", "name": "A", "produced_at": 124.0}, {"id": "p3", "name": "B"}],
+        )
+    stamps = {event["item_id"]: event.get("produced_at") for event in bus.sent}
+    assert stamps == {"p1": 123.5, "p2": 124.0, "p3": None}
+
+
+@pytest.fixture
+def batch_client(monkeypatch):
+    monkeypatch.setenv("BATCH_CHUNK_SIZE", "2")
+    get_settings.cache_clear()
+    monkeypatch.setattr(routers, "provide_external_api", lambda settings: StubApi())
+    with TestClient(create_app()) as client:
+        yield client
+    get_settings.cache_clear()
+
+
+def test_process_batch_ndjson(batch_client):
+    body = b'{"id": "b1", "name": "A"}\n{"id": "b2"}\nnot-json\n{"id": "b3", "name": "C"}\n'
+    resp = batch_client.post(
+        "/process/batch", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in resp.text.splitlines()]
+    assert sorted(r["index"] for r in results) == [0, 1, 2, 3]
+    by_index = {r["index"]: r for r in results}
+    assert by_index[0]["success"] and by_index[0]["item_id"] == "b1"
+    assert not by_index[1]["success"]
+    assert not by_index[2]["success"]
+    assert by_index[3]["success"] and by_index[3]["item_id"] == "b3"
+
+
+def test_process_batch_json_array(batch_client):
+    records = [{"id": f"a{i}", "name": "A"} for i in range(5)]
+    resp = batch_client.post("/process/batch", json=records)
+    results = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["item_id"] for r in results] == [f"a{i}" for i in range(5)]
+    assert all(r["success"] for r in results)
+
+    resp = batch_client.post(
+        "/process/batch", content=b'[{"id": "x1", "name": "A"}, {"id": ',
+        headers={"content-type": "application/json"},
+    )
+    results = [json.loads(line) for line in resp.text.splitlines()]
+    assert results[0]["success"] and results[0]["item_id"] == "x1"
+    assert not results[-1]["success"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'[{"id": "m1", "name": "A"} {"id": "m2", "name": "B"}]',
+        b'[{"id": "m1", "name": "A"},, {"id": "m2", "name": "B"}]',
+        b'[{"id": "m1", "name": "A"},]',
+        b'[{"id": "m1", "name": "A"}] garbage',
+    ],
+)
+def test_process_batch_json_array_rejects_malformed(batch_client, body):
+    resp = batch_client.post(
+        "/process/batch", content=body, headers={"content-type": "application/json"}
+    )
+    results = [json.loads(line) for line in resp.text.splitlines()]
+    assert results[0]["success"] and results[0]["item_id"] == "m1"
+    assert len(results) == 2 and not results[1]["success"]
+
+
+def test_process_batch_json_array_fails_fast_on_early_error(batch_client):
+    tail = b", ".join(b'{"id": "t%d", "name": "A"}' % i for i in range(5000))
+    body = b'[{"id": "m1", "name": "A"}, {"id": tru e}, ' + tail + b"]"
+    resp = batch_client.post(
+        "/process/batch", content=body, headers={"content-type": "application/json"}
+    )
+    results = [json.loads(line) for line in resp.text.splitlines()]
+    assert results[0]["success"] and results[0]["item_id"] == "m1"
+    assert len(results) == 2 and not results[1]["success"]
+
+
+@pytest.mark.asyncio
+async def test_iter_json_array_caps_buffered_element():
+    async def chunks(data):
+        for i in range(0, len(data), 16):
+            yield data[i:i + 16]
+
+    body = b'["ok", "' + b"x" * 200 + b'"]'
+    values = iter_json_array(chunks(body), max_element_size=64)
+    assert await values.__anext__() == "ok"
+    with pytest.raises(StreamFormatError):
+        await values.__anext__()
+
+
+def test_list_items_streams_ndjson(batch_client):
+    records = [{"id": f"l{i}", "name": "A"} for i in range(5)]
+    batch_client.post("/process/batch", json=records)
+
+    resp = batch_client.get("/items", params={"status": "initialized", "page_size": 2})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    ids = [json.loads(line)["id"] for line in resp.text.splitlines()]
+    assert [i for i in ids if i.startswith("l")] == [f"l{i}" for i in range(5)]
+
+    resp = batch_client.get(
+        "/items", params={"status": "initialized", "after": "l1", "limit": 2}
+    )
+    assert [json.loads(line)["id"] for line in resp.text.splitlines()] == ["l2", "l3"]
+    assert batch_client.get("/items", params={"status": "bogus"}).status_code == 400
@@ -0,0 +1,101 @@
+from app.infrastructure.observability.instrumentation import (
+    InstrumentedExternalApi,
+    InstrumentedMessageBus,
+)
+from app.application.use_cases.process_event import ProcessEvent
+from app.infrastructure.messaging.in_memory_bus import InMemoryMessageBus
+from app.infrastructure.observability.tracing import InMemorySpanExporter, tracer
+from app.infrastructure.persistence.db import dispose_engines, init_db
+from app.infrastructure.observability.metrics import registry
+from app.infrastructure.providers import (
+    provide_unit_of_work,
+    provide_message_bus,
+    instrument_use_case,
+)
+from app.interfaces.worker.main import build_handler
+from app.application.dtos import ProcessEventInput
+from app.interfaces.http.main import create_app
+from fastapi.testclient import TestClient
+from app.config.settings import Settings, get_settings
+import tempfile
+import pytest_asyncio
+import pytest
+import os
+
+
+class StubApi:
+    async def get(self, path, params=None):
+        return {}
+
+    async def post(self, path, data):
+        return {}
+
+
+@pytest_asyncio.fixture
+async def otel_settings():
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    settings = Settings(
+        DB_URL=f"sqlite+aiosqlite:///{db_path}",
+        MESSAGE_BROKER="in_memory",
+        OTEL_ENABLED=True,
+    )
+    await init_db(settings.DB_URL)
+    exporter = InMemorySpanExporter()
+    tracer.add_exporter(exporter)
+    registry.clear()
+    yield settings, exporter
+    tracer.remove_exporter(exporter)
+    await dispose_engines()
+    os.remove(db_path)
+
+
+def test_providers_skip_instrumentation_when_disabled():
+    settings = Settings(MESSAGE_BROKER="in_memory", OTEL_ENABLED=False)
+    assert isinstance(provide_message_bus(settings), InMemoryMessageBus)
+    use_case = object()
+    assert instrument_use_case(use_case, settings) is use_case
+
+
+@pytest.mark.asyncio
+async def test_trace_propagates_from_process_event_to_worker(otel_settings):
+    settings, exporter = otel_settings
+    bus = InstrumentedMessageBus(InMemoryMessageBus())
+    api = InstrumentedExternalApi(StubApi())
+    use_case = instrument_use_case(
+        ProcessEvent(provide_unit_of_work(settings), bus, api), settings
+    )
+    await use_case.execute(ProcessEventInput({"id": "t1", "name": "A"}))
+
+    message = await bus.receive()
+    assert message["body"]["item_id"] == "t1"
+    assert "traceparent" in message["body"]
+    await build_handler(settings)(message)
+
+    spans = {span.name: span for span in exporter.spans}
+    producer = spans["use_case.ProcessEvent"]
+    consumer = spans["use_case.ProcessItemFromQueue"]
+    assert consumer.trace_id == producer.trace_id
+    assert spans["bus.send"].parent_id == producer.span_id
+    assert spans["external_api.post"].trace_id == producer.trace_id
+    assert {"repository.save", "repository.get", "uow.commit"} <= set(spans)
+
+    hist = registry.get("app_operation_duration_seconds")
+    assert hist.count("uow", "commit", "ok") == 2
+    assert hist.count("use_case", "ProcessEvent", "ok") == 1
+
+
+def test_metrics_endpoint_only_when_enabled(monkeypatch):
+    monkeypatch.setenv("OTEL_ENABLED", "true")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        client.get("/health")
+        resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert "# TYPE app_operation_duration_seconds histogram" in resp.text
+
+    monkeypatch.setenv("OTEL_ENABLED", "false")
+    get_settings.cache_clear()
+    assert TestClient(create_app()).get("/metrics").status_code == 404
+    get_settings.cache_clear()
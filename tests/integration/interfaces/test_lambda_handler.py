@@ -0,0 +1,68 @@
+from app.infrastructure.startup import startup_report
+from app.application.dtos import ProcessEventOutput
+import importlib
+import asyncio
+import json
+
+lambda_handler = importlib.import_module("app.interfaces.lambda.handler")
+
+
+def _records(*ids):
+    return {
+        "Records": [
+            {"messageId": f"msg-{i}", "body": json.dumps({"id": i, "name": "Test"})}
+            for i in ids
+        ]
+    }
+
+
+def test_sqs_batch_reports_partial_failures(monkeypatch):
+    running = 0
+    peak = 0
+
+    async def fake_execute(self, dto):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if dto.payload["id"] == "bad":
+            raise ValueError("boom")
+        return ProcessEventOutput(success=True, message="ok", item_id=dto.payload["id"])
+
+    monkeypatch.setattr(
+        "app.application.use_cases.process_event.ProcessEvent.execute", fake_execute
+    )
+    monkeypatch.setattr(lambda_handler.settings, "LAMBDA_BATCH_CONCURRENCY", 2)
+
+    result = lambda_handler.handler(_records("a", "bad", "b", "c"), None)
+    assert result == {"batchItemFailures": [{"itemIdentifier": "msg-bad"}]}
+    assert peak == 2
+
+
+def test_loop_and_adapters_survive_invocations(monkeypatch):
+    async def fake_execute(self, dto):
+        return ProcessEventOutput(success=True, message="ok", item_id=dto.payload["id"])
+
+    monkeypatch.setattr(
+        "app.application.use_cases.process_event.ProcessEvent.execute", fake_execute
+    )
+    lambda_handler.handler(_records("a"), None)
+    loop = lambda_handler._loop
+    adapters = dict(lambda_handler._adapters)
+
+    result = lambda_handler.handler({"body": json.dumps({"id": "x", "name": "T"})}, None)
+    assert result["statusCode"] == 200
+    assert json.loads(result["body"]) == {"success": True, "item_id": "x"}
+    assert lambda_handler._loop is loop
+    assert lambda_handler._adapters == adapters
+
+
+def test_cold_start_skips_unused_broker_sdks():
+    report = startup_report(env={"MESSAGE_BROKER": "in_memory", "OTEL_ENABLED": "false"})
+    assert "app.interfaces.lambda.handler" in report["modules"]
+    assert "app.config.settings" in report["modules"]
+    assert "aioboto3" not in report["modules"]
+    assert "aio_pika" not in report["modules"]
+    assert report["total_ms"] > 0
+    assert report["packages"]
@@ -0,0 +1,167 @@
+from app.infrastructure.messaging.retry import RetryPolicy, RetryScheduler
+from app.infrastructure.messaging.in_memory_bus import InMemoryDeadLetterBus, InMemoryMessageBus
+from app.interfaces.worker.runtime import WorkerRuntime
+from app.interfaces.worker.main import build_handler
+from app.config.settings import Settings
+import asyncio
+import pytest
+
+
+class FakeBus:
+    def __init__(self, messages):
+        self.pending = list(messages)
+        self.acked = []
+        self.nacked = []
+
+    async def send(self, event):
+        pass
+
+    async def receive(self):
+        if self.pending:
+            return self.pending.pop(0)
+        await asyncio.sleep(0.01)
+        return {}
+
+    async def ack(self, message_id):
+        self.acked.append(message_id)
+
+    async def nack(self, message_id):
+        self.nacked.append(message_id)
+
+
+def _messages(n):
+    return [{"body": {"item_id": str(i)}, "receipt": f"r{i}"} for i in range(n)]
+
+
+async def _run_until(runtime, predicate, timeout=2.0):
+    task = asyncio.create_task(runtime.run())
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+    runtime.stop()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_runtime_acks_success_and_nacks_failure():
+    bus = FakeBus(_messages(6))
+
+    async def handler(msg):
+        if msg["body"]["item_id"] == "3":
+            raise ValueError("boom")
+
+    runtime = WorkerRuntime(bus, handler, concurrency=3, prefetch=2)
+    await _run_until(runtime, lambda: len(bus.acked) + len(bus.nacked) == 6)
+    assert sorted(bus.acked) == ["r0", "r1", "r2", "r4", "r5"]
+    assert bus.nacked == ["r3"]
+
+
+@pytest.mark.asyncio
+async def test_runtime_respects_concurrency_limit():
+    bus = FakeBus(_messages(20))
+    running = 0
+    peak = 0
+
+    async def handler(msg):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    runtime = WorkerRuntime(bus, handler, concurrency=4, prefetch=8)
+    await _run_until(runtime, lambda: len(bus.acked) == 20)
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_runtime_drains_buffer_on_stop():
+    bus = FakeBus(_messages(5))
+    release = asyncio.Event()
+
+    async def handler(msg):
+        await release.wait()
+
+    runtime = WorkerRuntime(bus, handler, concurrency=1, prefetch=10, drain_timeout=2)
+    task = asyncio.create_task(runtime.run())
+    while bus.pending:
+        await asyncio.sleep(0.01)
+    runtime.stop()
+    release.set()
+    await task
+    assert len(bus.acked) == 5
+
+
+@pytest.mark.asyncio
+async def test_runtime_nacks_undrained_messages_after_timeout():
+    bus = FakeBus(_messages(3))
+
+    async def handler(msg):
+        await asyncio.sleep(10)
+
+    runtime = WorkerRuntime(bus, handler, concurrency=1, prefetch=10, drain_timeout=0.05)
+    task = asyncio.create_task(runtime.run())
+    while bus.pending:
+        await asyncio.sleep(0.01)
+    runtime.stop()
+    await task
+    assert sorted(bus.nacked) == ["r0", "r1", "r2"]
+    assert bus.acked == []
+
+
+@pytest.mark.asyncio
+async def test_runtime_retries_with_backoff_then_dead_letters():
+    bus = InMemoryMessageBus(receive_timeout=0.01)
+    dlq = InMemoryDeadLetterBus(bus.broker)
+    retry = RetryScheduler(bus, dlq, RetryPolicy(max_attempts=3, base_delay=0.01))
+    calls = []
+
+    async def handler(msg):
+        calls.append(msg["body"].get("attempts", 0))
+        raise ValueError("Item não encontrado")
+
+    await bus.send({"item_id": "1"})
+    runtime = WorkerRuntime(bus, handler, concurrency=2, retry=retry)
+    await _run_until(runtime, lambda: bus.broker.stats()["events"]["default"]["dead_letters"])
+    await retry.close()
+
+    assert calls == [0, 1, 2]
+    dead = await dlq.receive()
+    assert dead["body"] == {"item_id": "1", "attempts": 3, "error": "Item não encontrado"}
+    assert bus.broker.stats()["events"]["default"] == {
+        "ready": 0,
+        "inflight": 0,
+        "dead_letters": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_runtime_nacks_when_the_retry_cannot_be_published():
+    bus = FakeBus(_messages(1))
+
+    async def send_delayed(event, delay):
+        raise ConnectionError("broker fora")
+
+    bus.send_delayed = send_delayed
+
+    async def handler(msg):
+        raise ValueError("boom")
+
+    runtime = WorkerRuntime(bus, handler, retry=RetryScheduler(bus))
+    await _run_until(runtime, lambda: bus.acked or bus.nacked)
+    # A original só recebe ack depois que a retentativa está no broker.
+    assert bus.nacked == ["r0"] and bus.acked == []
+
+
+@pytest.mark.asyncio
+async def test_runtime_nacks_undecodable_messages():
+    undecodable = {"body": '{"item_id": "1"}', "receipt": "r0", "error": "Versão 9"}
+    bus = FakeBus([undecodable])
+    dlq = InMemoryDeadLetterBus(InMemoryMessageBus().broker)
+    handler = build_handler(Settings(MESSAGE_BROKER="in_memory", DEDUP_ENABLED=False))
+
+    runtime = WorkerRuntime(bus, handler, retry=RetryScheduler(bus, dlq))
+    await _run_until(runtime, lambda: bus.acked or bus.nacked)
+    # Fica com o broker (redrive/DLQ da fila); um ack a apagaria de vez.
+    assert bus.nacked == ["r0"] and bus.acked == []
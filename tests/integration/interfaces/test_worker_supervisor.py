@@ -0,0 +1,189 @@
+from app.interfaces.worker.supervisor import HashRing, KeyedRunner, WorkerSupervisor
+from app.infrastructure.messaging.in_memory_bus import InMemoryBroker, InMemoryMessageBus
+from app.infrastructure.messaging.codec import CodecError, MessageCodec
+import multiprocessing
+import asyncio
+import pytest
+import signal
+import queue
+import time
+import os
+
+ctx = multiprocessing.get_context("fork")
+
+
+def _recording_child(log, crashed):
+    """Filho de teste: registra (slot, item_id, n) e morre uma vez no item "crash"."""
+
+    def target(index, inbox, results):
+        while (item := inbox.get()) is not None:
+            seq, key, msg = item
+            if key == "crash" and not crashed.is_set():
+                crashed.set()
+                os._exit(1)
+            log.put((index, key, msg["body"]["n"]))
+            results.put((seq, True, None))
+
+    return target
+
+
+def _decoding_child(log):
+    """Filho de teste: decodifica o corpo inteiro e registra (item_id, ok)."""
+
+    def target(index, inbox, results):
+        while (item := inbox.get()) is not None:
+            seq, key, msg = item
+            try:
+                dict(msg["body"])
+            except CodecError as e:
+                log.put((key, False))
+                results.put((seq, False, str(e)))
+            else:
+                log.put((key, True))
+                results.put((seq, True, None))
+
+    return target
+
+
+def _stuck_child(index, inbox, results):
+    """Filho de teste: ignora SIGTERM, como run_child, e nunca lê a caixa de entrada."""
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(0.1)
+
+
+async def _drain(log, count, timeout=10.0):
+    entries = []
+    deadline = asyncio.get_running_loop().time() + timeout
+    while len(entries) < count:
+        assert asyncio.get_running_loop().time() < deadline
+        try:
+            entries.append(log.get_nowait())
+        except queue.Empty:
+            await asyncio.sleep(0.01)
+    return entries
+
+
+def test_hash_ring_is_stable_and_balanced():
+    ring = HashRing(4)
+    keys = [f"item-{i}" for i in range(4000)]
+    assert [ring.node(k) for k in keys] == [HashRing(4).node(k) for k in keys]
+    counts = [sum(1 for k in keys if ring.node(k) == n) for n in range(4)]
+    assert min(counts) > 500
+    # Com um nó a mais, só as chaves que vão para o novo nó mudam de lugar.
+    grown = HashRing(5)
+    moved = [k for k in keys if grown.node(k) != ring.node(k)]
+    assert all(grown.node(k) == 4 for k in moved)
+    assert len(moved) < len(keys) / 3
+
+
+@pytest.mark.asyncio
+async def test_keyed_runner_orders_per_key_and_overlaps_keys():
+    seen = {"a": [], "b": []}
+    running = 0
+    peak = 0
+
+    async def handler(msg):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 if msg["n"] % 2 == 0 else 0)
+        seen[msg["key"]].append(msg["n"])
+        running -= 1
+        if msg["n"] == 3:
+            raise ValueError("boom")
+
+    runner = KeyedRunner(handler, concurrency=4)
+    results = []
+    for n in range(6):
+        for key in ("a", "b"):
+            runner.submit(key, {"key": key, "n": n}, lambda ok, error: results.append(ok))
+    await runner.join()
+    assert seen == {"a": list(range(6)), "b": list(range(6))}
+    assert peak == 2
+    assert results.count(False) == 2
+
+
+@pytest.mark.asyncio
+async def test_supervisor_partitions_by_item_and_restarts_children():
+    bus = InMemoryMessageBus(receive_timeout=0.05)
+    log, crashed = ctx.Queue(), ctx.Event()
+    supervisor = WorkerSupervisor(
+        bus,
+        _recording_child(log, crashed),
+        processes=3,
+        prefetch=8,
+        restart_backoff=0.01,
+        context=ctx,
+    )
+    running = asyncio.create_task(supervisor.run())
+
+    events = [{"item_id": f"k{n % 5}", "n": n} for n in range(40)]
+    await bus.send_many([*events[:20], {"item_id": "crash", "n": -1}, *events[20:]])
+    entries = await _drain(log, 41)
+    supervisor.stop()
+    await running
+
+    assert crashed.is_set()
+    by_key = {}
+    for index, key, n in entries:
+        by_key.setdefault(key, []).append((index, n))
+    assert [n for _, n in by_key["crash"]] == [-1]
+    for n in range(5):
+        slots = {index for index, _ in by_key[f"k{n}"]}
+        assert slots == {supervisor.ring.node(f"k{n}")}
+        ordered = [value for _, value in by_key[f"k{n}"]]
+        assert ordered == sorted(ordered)
+    assert bus.broker.stats()["events"]["default"] == {
+        "ready": 0,
+        "inflight": 0,
+        "dead_letters": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_supervisor_survives_corrupt_payloads():
+    bus = InMemoryMessageBus(InMemoryBroker(max_deliveries=1), receive_timeout=0.05)
+    log = ctx.Queue()
+    supervisor = WorkerSupervisor(bus, _decoding_child(log), processes=1, context=ctx)
+    running = asyncio.create_task(supervisor.run())
+
+    codec = MessageCodec()
+    with_key = codec.decode(b"{broken", codec.encode({"item_id": "bad"}).headers)
+    without_key = codec.decode(b"{broken", codec.encode({}).headers)
+    await bus.send_many([with_key, without_key, {"item_id": "ok"}])
+    # O corpo com item_id nos cabeçalhos chega cru ao filho, que falha ao decodificar;
+    # o sem item_id não pode ser roteado e é resolvido já no supervisor.
+    assert sorted(await _drain(log, 2)) == [("bad", False), ("ok", True)]
+    while bus.broker.stats()["events"]["default"]["dead_letters"] < 2:
+        await asyncio.sleep(0.01)
+    supervisor.stop()
+    await asyncio.wait_for(running, 10)
+    assert bus.broker.stats()["events"]["default"]["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_supervisor_stops_when_an_internal_task_dies():
+    bus = InMemoryMessageBus(receive_timeout=0.05)
+    supervisor = WorkerSupervisor(bus, _decoding_child(ctx.Queue()), processes=1, context=ctx)
+
+    async def broken_collect():
+        raise RuntimeError("boom")
+
+    supervisor._collect = broken_collect
+    await asyncio.wait_for(supervisor.run(), 10)
+
+
+@pytest.mark.asyncio
+async def test_supervisor_kills_children_that_never_drain():
+    bus = InMemoryMessageBus(receive_timeout=0.05)
+    supervisor = WorkerSupervisor(
+        bus, _stuck_child, processes=2, drain_timeout=0.3, context=ctx
+    )
+    running = asyncio.create_task(supervisor.run())
+    await asyncio.sleep(0.2)
+    supervisor.stop()
+    started = asyncio.get_running_loop().time()
+    await asyncio.wait_for(running, 5)
+    assert asyncio.get_running_loop().time() - started < 3
+    assert not any(child.process.is_alive() for child in supervisor._children)
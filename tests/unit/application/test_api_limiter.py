@@ -0,0 +1,107 @@
+from app.infrastructure.external.limiter import (
+    AdaptiveLimiter,
+    LimitExceeded,
+    TokenBucket,
+    ApiLimiter,
+    AimdLimit,
+)
+from app.infrastructure.observability.metrics import registry
+import asyncio
+import httpx
+import pytest
+
+
+class SlowApi:
+    def __init__(self, delay=0.01, error=None):
+        self.delay = delay
+        self.error = error
+        self.running = 0
+        self.peak = 0
+
+    async def post(self, path, data):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            return {"ok": True}
+        finally:
+            self.running -= 1
+
+
+
+def _unavailable():
+    request = httpx.Request("POST", "http://api/post")
+    return httpx.HTTPStatusError(
+        "503", request=request, response=httpx.Response(503, request=request)
+    )
+
+
+def test_aimd_increases_additively_and_backs_off_once_per_window():
+    limit = AimdLimit(initial=10, min_limit=2, max_limit=12, latency_threshold=1.0)
+    for _ in range(10):
+        limit.on_sample(limit.epoch, latency=0.1, dropped=False)
+    assert 10.9 < limit.limit < 11.0
+    epoch = limit.epoch
+    limit.on_sample(epoch, latency=0.1, dropped=True)
+    after_first = limit.limit
+    # Outras falhas da mesma janela não derrubam o limite de novo.
+    limit.on_sample(epoch, latency=5.0, dropped=False)
+    assert limit.limit == after_first
+    for _ in range(50):
+        limit.on_sample(limit.epoch, latency=0.1, dropped=True)
+    assert limit.limit == 2
+
+
+def test_token_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.1)
+    clock.now = 0.1
+    assert bucket.try_acquire() == 0
+
+
+@pytest.mark.asyncio
+async def test_api_limiter_caps_concurrency_and_exposes_metrics():
+    api = SlowApi()
+    limited = ApiLimiter(AdaptiveLimiter(AimdLimit(initial=3, max_limit=3)))
+    results = await asyncio.gather(
+        *(limited.call(lambda i=i: api.post("/post", {"n": i})) for i in range(12))
+    )
+    assert results == [{"ok": True}] * 12
+    assert api.peak == 3
+    assert registry.get("external_api_concurrency_limit").value() == 3
+    assert registry.get("external_api_inflight").value() == 0
+    assert "external_api_queued 0" in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_api_limiter_backs_off_on_overload_and_rejects_long_waits():
+    limiter = AdaptiveLimiter(AimdLimit(initial=4, max_limit=4), queue_timeout=0.01)
+    api = SlowApi(delay=0.05, error=_unavailable())
+    limited = ApiLimiter(limiter)
+    results = await asyncio.gather(
+        *(limited.call(lambda: api.post("/post", {})) for _ in range(6)),
+        return_exceptions=True,
+    )
+    assert sum(isinstance(r, LimitExceeded) for r in results) == 2
+    assert sum(isinstance(r, httpx.HTTPStatusError) for r in results) == 4
+    assert limiter.limit.limit == pytest.approx(3.6)
+    assert limiter.in_flight == 0
+    assert registry.get("external_api_limiter_rejections_total").value() >= 2
+
+
+@pytest.mark.asyncio
+async def test_api_limiter_counts_overloaded_responses_as_drops():
+    limiter = AdaptiveLimiter(AimdLimit(initial=10, max_limit=10))
+    limited = ApiLimiter(limiter)
+
+    async def respond(status):
+        return httpx.Response(status)
+
+    assert (await limited.call(lambda: respond(200))).status_code == 200
+    assert limiter.limit.limit == 10
+    assert (await limited.call(lambda: respond(503))).status_code == 503
+    assert limiter.limit.limit == pytest.approx(9.0)
@@ -0,0 +1,65 @@
+from benchmarks.scenarios import BenchConfig, bench_process_event, bench_process_item_from_queue
+from app.infrastructure.observability.throughput import ThroughputRecorder
+from app.infrastructure.messaging.in_memory_bus import InMemoryMessageBus
+from app.infrastructure.observability.metrics import registry
+from benchmarks.stats import ScenarioResult, percentile
+from benchmarks.loadgen import LoadConfig, run_load
+from app.config.settings import Settings
+import pytest
+
+
+def test_percentile_and_summary():
+    values = [0.001 * i for i in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(0.0505)
+    assert percentile(values, 100) == pytest.approx(0.1)
+    assert percentile([], 99) == 0.0
+
+    summary = ScenarioResult("x", duration=2.0, latencies=values).summary()
+    assert summary["ops"] == 100
+    assert summary["throughput_ops"] == pytest.approx(50.0)
+
+
+@pytest.mark.asyncio
+async def test_scenarios_smoke(tmp_path):
+    config = BenchConfig(db_url=f"sqlite+aiosqlite:///{tmp_path}/bench.db", iterations=20, concurrency=4)
+    for scenario in (bench_process_event, bench_process_item_from_queue):
+        summary = (await scenario(config)).summary()
+        assert summary["ops"] == 20
+        assert summary["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_loadgen_open_loop_measures_worker_lag(tmp_path):
+    settings = Settings(
+        DB_URL=f"sqlite+aiosqlite:///{tmp_path}/load.db", RETRY_ENABLED=False
+    )
+    config = LoadConfig(rate=200, count=40, concurrency=8, consume=True, consume_timeout=10)
+    bus = InMemoryMessageBus(receive_timeout=0.05)
+    closed = []
+
+    async def close():
+        closed.append(True)
+
+    bus.close = close
+    report = await run_load(config, settings, bus=bus)
+    # O bus veio de fora: quem o passou é quem fecha.
+    assert closed == []
+    assert report["mode"] == "open_loop"
+    assert report["ops"] == 40
+    assert report["errors"] == 0
+    assert report["consumer"]["processed"] == 40
+    assert report["consumer"]["lag_max_ms"] > 0
+    assert registry.get("worker_end_to_end_lag_seconds").count() >= 40
+
+
+def test_throughput_recorder_windows():
+    clock = iter([0.0, 1.0, 2.0, 2.0, 2.0, 4.0]).__next__
+    recorder = ThroughputRecorder(clock=clock)
+    recorder.record(0.5)
+    recorder.record(None)
+    recorder.record(float("nan"))
+    snapshot = recorder.snapshot()
+    assert snapshot["processed"] == 3
+    assert snapshot["throughput"] == 1.5
+    assert snapshot["lag_max_ms"] == 500.0
+    assert recorder.snapshot()["processed"] == 0
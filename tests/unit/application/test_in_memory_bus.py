@@ -1,4 +1,14 @@
-from app.infrastructure.messaging.in_memory_bus import InMemoryMessageBus
+from app.infrastructure.messaging.factory import get_dead_letter_bus, get_message_bus
+from app.infrastructure.messaging.in_memory_bus import (
+    InMemoryDeadLetterBus,
+    InMemoryMessageBus,
+    InMemoryBroker,
+    BrokerFull,
+    get_broker,
+)
+from app.infrastructure.messaging import in_memory_bus
+from app.config.settings import Settings
+import asyncio
 import pytest
 
 
@@ -8,11 +18,131 @@ async def test_in_memory_bus_send_receive():
     event = {"foo": "bar"}
     await bus.send(event)
     received = await bus.receive()
-    assert received == event
+    assert received["body"] == event
+    assert received["receipt"]
+    await bus.ack(received["receipt"])
 
 
 @pytest.mark.asyncio
 async def test_in_memory_bus_empty():
-    bus = InMemoryMessageBus()
+    bus = InMemoryMessageBus(receive_timeout=0.05)
     result = await bus.receive()
     assert result == {}
+
+
+@pytest.mark.asyncio
+async def test_topics_fan_out_to_groups_and_share_within_group():
+    broker = InMemoryBroker()
+    producer = InMemoryMessageBus(broker, topic="items", group="workers")
+    workers_b = InMemoryMessageBus(broker, topic="items", group="workers")
+    audit = InMemoryMessageBus(broker, topic="items", group="audit")
+    other = InMemoryMessageBus(broker, topic="other", receive_timeout=0.01)
+
+    await producer.send_many([{"n": 1}, {"n": 2}])
+    first = await producer.receive()
+    second = await workers_b.receive()
+    assert {first["body"]["n"], second["body"]["n"]} == {1, 2}
+    assert [m["body"]["n"] for m in await audit.receive_many(10)] == [1, 2]
+    assert await other.receive() == {}
+
+
+@pytest.mark.asyncio
+async def test_nack_redelivers_then_dead_letters():
+    broker = InMemoryBroker(max_deliveries=2)
+    bus = InMemoryMessageBus(broker, receive_timeout=0.01)
+    await bus.send({"n": 1})
+
+    msg = await bus.receive()
+    await bus.nack(msg["receipt"])
+    again = await bus.receive()
+    assert again["body"] == {"n": 1} and again["deliveries"] == 2
+    # Receipt da entrega anterior não confirma a nova.
+    assert await bus.ack_many([msg["receipt"]]) == [msg["receipt"]]
+    await bus.nack(again["receipt"])
+    assert await bus.receive() == {}
+    assert broker.stats()["events"]["default"]["dead_letters"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unacked_message_is_redelivered_after_visibility_timeout():
+    now = [0.0]
+    broker = InMemoryBroker(visibility_timeout=10, clock=lambda: now[0])
+    bus = InMemoryMessageBus(broker, receive_timeout=0.01)
+    await bus.send({"n": 1})
+    msg = await bus.receive()
+    assert await bus.receive() == {}
+    now[0] = 11
+    assert (await bus.receive())["message_id"] == msg["message_id"]
+
+
+@pytest.mark.asyncio
+async def test_send_blocks_when_group_is_full_until_ack():
+    bus = InMemoryMessageBus(InMemoryBroker(maxsize=2))
+    await bus.send({"n": 1})
+    await bus.send({"n": 2})
+    blocked = asyncio.create_task(bus.send({"n": 3}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    msg = await bus.receive()
+    await asyncio.sleep(0.01)
+    assert not blocked.done()  # entregue mas sem ack ainda ocupa espaço
+    await bus.ack(msg["receipt"])
+    await asyncio.wait_for(blocked, 1)
+    assert [m["body"]["n"] for m in await bus.receive_many(10)] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_publish_gives_up_when_a_group_has_no_consumer():
+    broker = InMemoryBroker(maxsize=1, publish_timeout=0.02)
+    bus = InMemoryMessageBus(broker)
+    broker.subscribe("events", "idle")
+    await bus.send({"n": 1})
+    await bus.ack((await bus.receive())["receipt"])
+    # O group "idle" segue cheio: o produtor não fica preso para sempre.
+    with pytest.raises(BrokerFull):
+        await bus.send({"n": 2})
+
+
+def test_get_broker_rejects_conflicting_options(monkeypatch):
+    monkeypatch.setattr(in_memory_bus, "_default_broker", None)
+    broker = get_broker(maxsize=10, max_deliveries=3)
+    assert get_broker(maxsize=10) is broker
+    with pytest.raises(ValueError):
+        get_broker(maxsize=20)
+
+
+@pytest.mark.asyncio
+async def test_send_delayed_holds_the_message_until_due():
+    bus = InMemoryMessageBus(receive_timeout=0.01)
+    await bus.send_delayed({"n": 1}, 0.05)
+    assert await bus.receive() == {}
+    bus.receive_timeout = 1.0
+    assert (await bus.receive())["body"] == {"n": 1}
+
+
+@pytest.mark.asyncio
+async def test_send_delayed_counts_against_capacity():
+    bus = InMemoryMessageBus(InMemoryBroker(maxsize=2, publish_timeout=0.01))
+    await bus.send_delayed({"n": 1}, 0.05)
+    await bus.send({"n": 2})
+    with pytest.raises(BrokerFull):
+        await bus.send_delayed({"n": 3}, 0.05)
+    await asyncio.sleep(0.1)
+    assert bus.broker.stats()["events"]["default"]["ready"] == 2
+
+
+@pytest.mark.asyncio
+async def test_in_memory_dead_letters_never_block(monkeypatch):
+    monkeypatch.setattr(in_memory_bus, "_default_broker", None)
+    settings = Settings(IN_MEMORY_BUS_MAXSIZE=1, IN_MEMORY_BUS_PUBLISH_TIMEOUT=0.01)
+    bus, dlq = get_message_bus(settings), get_dead_letter_bus(settings)
+    assert isinstance(dlq, InMemoryDeadLetterBus) and dlq.broker is bus.broker
+    for n in range(3):
+        await asyncio.wait_for(dlq.send({"n": n}), 1)
+    assert bus.broker.stats()["events"]["default"]["dead_letters"] == 3
+    assert (await dlq.receive())["body"] == {"n": 0}
+    assert bus.broker.pop_dead_letter("events", "default") == {"n": 1}
+    assert (await dlq.receive())["body"] == {"n": 2}
+    assert await dlq.receive() == {}
+    assert bus.broker.pop_dead_letter("events", "default") is None
@@ -0,0 +1,76 @@
+from app.infrastructure.persistence.cache import CachingRepository
+from app.infrastructure.cache import MISS, TTLCache
+from app.domain.entities import Item, Status
+import pytest
+
+
+class CountingRepo:
+    def __init__(self, items=()):
+        self.items = {i.id: i for i in items}
+        self.reads = 0
+
+    async def get(self, id):
+        self.reads += 1
+        return self.items.get(id)
+
+    async def get_many(self, ids):
+        self.reads += 1
+        return [self.items[id] for id in ids if id in self.items]
+
+    async def save(self, obj):
+        self.items[obj.id] = obj
+
+    async def save_many(self, objs):
+        for obj in objs:
+            self.items[obj.id] = obj
+
+
+def _item(id, status="initialized"):
+    return Item(id=id, name="A", status=Status(status))
+
+
+def test_ttl_cache_lru_and_expiry(clock):
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISS
+    clock.now = 11
+    assert cache.get("a") is MISS
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_caching_repository_read_through_and_invalidation(clock):
+    repo = CountingRepo([_item("1")])
+    cached = CachingRepository(repo, TTLCache(ttl=30, clock=clock), negative_ttl=5)
+
+    assert (await cached.get("1")).id == "1"
+    assert (await cached.get("1")).id == "1"
+    assert repo.reads == 1
+
+    await cached.save(_item("1", "processed"))
+    assert (await cached.get("1")).status == Status("processed")
+    assert repo.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_caching_repository_negative_and_bulk(clock):
+    repo = CountingRepo([_item("1"), _item("2")])
+    cached = CachingRepository(repo, TTLCache(ttl=30, clock=clock), negative_ttl=5)
+
+    assert await cached.get("missing") is None
+    assert await cached.get("missing") is None
+    assert repo.reads == 1
+
+    found = await cached.get_many(["1", "2", "missing"])
+    assert sorted(i.id for i in found) == ["1", "2"]
+    assert repo.reads == 2
+    assert len(await cached.get_many(["1", "2", "missing"])) == 2
+    assert repo.reads == 2
+
+    clock.now = 6
+    assert await cached.get("missing") is None
+    assert repo.reads == 3
@@ -1,5 +1,15 @@
-from app.infrastructure.logging.logger import configure_logger
+from app.infrastructure.logging.logger import (
+    RequestIdProcessor,
+    LevelSampler,
+    configure_logger,
+    reset_request_id,
+    set_request_id,
+    stop_log_listener,
+)
+from logging.handlers import QueueHandler
 import structlog
+import logging
+import pytest
 import json
 
 
@@ -15,3 +25,36 @@ def test_structlog_json_format(monkeypatch):
     assert data["event"] == "hello"
     assert data["foo"] == "bar"
     assert data["request_id"] == "req-123"
+
+
+def test_request_id_from_contextvar():
+    processor = RequestIdProcessor()
+    token = set_request_id("ctx-1")
+    try:
+        assert processor(None, "info", {"event": "x"})["request_id"] == "ctx-1"
+        assert processor(None, "info", {"request_id": "own"})["request_id"] == "own"
+    finally:
+        reset_request_id(token)
+    assert "request_id" not in processor(None, "info", {"event": "x"})
+
+
+def test_level_sampler_drops_only_sampled_levels():
+    values = iter([0.05, 0.5])
+    sampler = LevelSampler({"INFO": 0.1}, rand=lambda: next(values))
+    assert sampler(None, "info", {"event": "kept"}) == {"event": "kept"}
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "dropped"})
+    assert sampler(None, "error", {"event": "always"}) == {"event": "always"}
+
+
+def test_queue_handler_writes_from_listener(capsys):
+    logger = configure_logger("INFO", use_queue=True, force=True)
+    try:
+        assert any(isinstance(h, QueueHandler) for h in logging.getLogger().handlers)
+        logger.info("via fila", n=1)
+        stop_log_listener()
+        line = capsys.readouterr().out.strip().splitlines()[-1]
+        assert json.loads(line)["event"] == "via fila"
+    finally:
+        with capsys.disabled():
+            configure_logger("INFO", force=True)
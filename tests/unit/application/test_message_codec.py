@@ -0,0 +1,94 @@
+from app.infrastructure.messaging.codec import (
+    headers_from_attributes,
+    MessageCodec,
+    CodecError,
+    LazyBody,
+)
+import importlib.util
+import pytest
+import pickle
+
+EVENT = {"type": "ItemToProcess", "item_id": "42", "event_id": "e1", "payload": [1, 2, 3]}
+
+
+def test_json_envelope_headers_and_lazy_decode():
+    codec = MessageCodec()
+    envelope = codec.encode(EVENT)
+    assert envelope.headers["x-codec"] == "json"
+    assert envelope.headers["x-codec-version"] == "1"
+    assert envelope.headers["x-item-id"] == "42"
+
+    body = codec.decode(envelope.body, envelope.headers)
+    assert isinstance(body, LazyBody)
+    assert body.get("item_id") == "42"
+    assert body.get("event_id") == "e1"
+    assert body._value is None
+    assert body["payload"] == [1, 2, 3]
+    assert dict(body) == EVENT
+
+
+def test_lazy_body_pickles_without_decoding():
+    codec = MessageCodec(compress_threshold=1)
+    envelope = codec.encode(EVENT)
+    copy = pickle.loads(pickle.dumps(codec.decode(envelope.body, envelope.headers)))
+    assert isinstance(copy, LazyBody) and copy._value is None
+    assert dict(copy) == EVENT
+    assert pickle.loads(pickle.dumps(copy)) == EVENT
+
+
+def test_compression_above_threshold_only():
+    codec = MessageCodec(compress_threshold=32)
+    assert "x-content-encoding" not in codec.encode({"a": 1}).headers
+    envelope = codec.encode({**EVENT, "data": "x" * 1000})
+    assert envelope.content_encoding == "zlib"
+    assert len(envelope.body) < 1000
+    assert codec.decode_payload(envelope.body, envelope.headers)["data"] == "x" * 1000
+
+
+def test_text_envelope_base64_for_binary_bodies():
+    codec = MessageCodec(compress_threshold=1)
+    envelope = codec.encode_text(EVENT)
+    assert isinstance(envelope.body, str)
+    assert envelope.headers["x-transfer-encoding"] == "base64"
+    assert codec.decode_payload(envelope.body, envelope.headers) == EVENT
+
+
+def test_legacy_bodies_and_invalid_envelopes():
+    codec = MessageCodec()
+    assert codec.decode(b'{"item_id": "1"}') == {"item_id": "1"}
+    with pytest.raises(CodecError):
+        codec.decode(b"not json")
+    envelope = codec.encode(EVENT)
+    with pytest.raises(CodecError):
+        codec.decode(envelope.body, {**envelope.headers, "x-codec-version": "9"})
+    with pytest.raises(CodecError):
+        codec.decode(envelope.body, {**envelope.headers, "x-codec": "avro"})
+    # O envelope é válido, mas o payload só falha quando alguém o lê.
+    body = codec.decode(b"{broken", envelope.headers)
+    assert body["item_id"] == "42"
+    assert body.header_fields() == {"type": "ItemToProcess", "item_id": "42", "event_id": "e1"}
+    with pytest.raises(CodecError):
+        body["payload"]
+    # Mapping.get só trata KeyError: o erro de payload chega a quem chamou.
+    with pytest.raises(CodecError):
+        body.get("payload")
+
+
+def test_headers_from_sqs_and_lambda_attributes():
+    assert headers_from_attributes({"x-codec": {"StringValue": "json"}}) == {"x-codec": "json"}
+    assert headers_from_attributes({"x-codec": {"stringValue": "json"}}) == {"x-codec": "json"}
+    assert headers_from_attributes(None) == {}
+
+
+@pytest.mark.skipif(importlib.util.find_spec("msgpack") is not None, reason="msgpack instalado")
+def test_msgpack_requires_optional_dependency():
+    with pytest.raises(ImportError, match="msgpack"):
+        MessageCodec("msgpack")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("msgpack") is None, reason="msgpack ausente")
+def test_msgpack_round_trip():
+    codec = MessageCodec("msgpack")
+    envelope = codec.encode(EVENT)
+    assert envelope.content_type == "application/msgpack"
+    assert codec.decode_payload(envelope.body, envelope.headers) == EVENT
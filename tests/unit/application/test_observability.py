@@ -0,0 +1,46 @@
+from app.infrastructure.observability.tracing import (
+    InMemorySpanExporter,
+    Tracer,
+    extract,
+    inject,
+)
+from app.infrastructure.observability.metrics import MetricsRegistry
+import pytest
+
+
+def test_histogram_and_counter_render():
+    registry = MetricsRegistry()
+    hist = registry.histogram("op_seconds", "Latência.", ("op",), buckets=(0.1, 1.0))
+    counter = registry.counter("op_total", "Chamadas.", ("op",))
+    hist.observe(0.05, "get")
+    hist.observe(0.5, "get")
+    counter.inc("get")
+
+    text = registry.render()
+    assert 'op_seconds_bucket{op="get",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{op="get",le="1.0"} 2' in text
+    assert 'op_seconds_bucket{op="get",le="+Inf"} 2' in text
+    assert 'op_seconds_count{op="get"} 2' in text
+    assert 'op_total{op="get"} 1.0' in text
+    assert hist.sum("get") == pytest.approx(0.55)
+
+
+def test_trace_context_roundtrip():
+    tracer = Tracer()
+    exporter = InMemorySpanExporter()
+    tracer.add_exporter(exporter)
+
+    assert inject({"a": 1}) == {"a": 1}
+    with tracer.start_span("producer") as producer:
+        carrier = inject({"item_id": "1"})
+    parent = extract(carrier)
+    assert parent.trace_id == producer.trace_id
+    assert extract({"traceparent": "lixo"}) is None
+
+    with tracer.start_span("consumer", parent=parent):
+        with tracer.start_span("child"):
+            pass
+    child, consumer = exporter.spans[1:]
+    assert consumer.parent_id == producer.span_id
+    assert child.parent_id == consumer.span_id
+    assert {s.trace_id for s in exporter.spans} == {producer.trace_id}
@@ -0,0 +1,64 @@
+from app.infrastructure.messaging.retry import RetryPolicy, RetryScheduler
+from app.infrastructure.messaging.codec import MessageCodec
+import pytest
+
+
+class RecordingBus:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.delayed = []
+        self.fail = fail
+
+    async def send(self, event):
+        self.sent.append(event)
+
+    async def send_delayed(self, event, delay):
+        if self.fail:
+            raise RuntimeError("broker fora")
+        self.delayed.append((event, delay))
+
+
+def test_policy_grows_exponentially_with_bounded_jitter():
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+    assert policy.delay(1, rand=lambda: 0.0) == 0.5
+    assert policy.delay(3, rand=lambda: 1.0) == 4.0
+    assert policy.delay(10, rand=lambda: 0.0) == 5.0
+    assert policy.delay(10, rand=lambda: 1.0) == 10.0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_publishes_retry_with_broker_side_delay():
+    bus = RecordingBus()
+    scheduler = RetryScheduler(bus, policy=RetryPolicy(max_attempts=3), rand=lambda: 0.0)
+    assert await scheduler.handle_failure({"body": {"item_id": "x", "attempts": 1}}, "boom")
+    # Já publicado quando handle_failure retorna: nada fica só na memória do processo.
+    assert bus.delayed == [({"item_id": "x", "attempts": 2}, 1.0)]
+    with pytest.raises(RuntimeError):
+        await RetryScheduler(RecordingBus(fail=True)).handle_failure(
+            {"body": {"item_id": "x"}}, "boom"
+        )
+
+
+@pytest.mark.asyncio
+async def test_scheduler_dead_letters_after_max_attempts():
+    bus, dlq = RecordingBus(), RecordingBus()
+    scheduler = RetryScheduler(bus, dlq, RetryPolicy(max_attempts=3))
+    assert await scheduler.handle_failure({"body": {"item_id": "1", "attempts": 2}}, "boom")
+    assert dlq.sent == [{"item_id": "1", "attempts": 3, "error": "boom"}]
+    assert bus.delayed == []
+    # Sem DLQ (ou corpo ilegível), a falha fica com o broker.
+    assert not await RetryScheduler(bus, policy=RetryPolicy(max_attempts=1)).handle_failure(
+        {"body": {"item_id": "1"}}, "boom"
+    )
+    assert not await scheduler.handle_failure({"body": "raw"}, "boom")
+
+
+@pytest.mark.asyncio
+async def test_corrupt_payload_goes_straight_to_the_dlq():
+    bus, dlq = RecordingBus(), RecordingBus()
+    scheduler = RetryScheduler(bus, dlq, RetryPolicy(max_attempts=5))
+    headers = MessageCodec().encode({"item_id": "1", "type": "ItemToProcess"}).headers
+    body = MessageCodec().decode(b"{broken", headers)
+    assert await scheduler.handle_failure({"body": body}, "boom")
+    assert bus.delayed == []
+    assert dlq.sent[0]["item_id"] == "1" and dlq.sent[0]["error"].startswith("boom; ")
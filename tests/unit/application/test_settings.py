@@ -1,4 +1,4 @@
-from app.config.settings import Settings
+from app.config.settings import Settings, get_settings
 from pydantic import ValidationError
 import pytest
 
@@ -15,3 +15,18 @@ def test_valid_broker():
 def test_invalid_broker():
     with pytest.raises(ValidationError):
         Settings(DB_URL="sqlite:///:memory:", MESSAGE_BROKER="foo")
+
+
+def test_outbox_and_write_behind_are_exclusive():
+    with pytest.raises(ValidationError):
+        Settings(OUTBOX_ENABLED=True, ITEM_WRITE_BEHIND_ENABLED=True)
+
+
+def test_get_settings_is_cached(monkeypatch):
+    get_settings.cache_clear()
+    first = get_settings()
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    assert get_settings() is first
+    get_settings.cache_clear()
+    assert get_settings().LOG_LEVEL == "DEBUG"
+    get_settings.cache_clear()
@@ -1,6 +1,7 @@
+from app.application.use_cases.process_item_from_queue import ProcessItemFromQueue
 from app.application.use_cases.process_event import ProcessEvent
 from app.application.dtos import ProcessEventInput
-from app.domain.entities import Status
+from app.domain.entities import Item, Status
 import pytest
 
 
@@ -17,6 +18,43 @@ class FakeRepo:
     async def save(self, obj):
         self.saved.append(obj)
 
+    async def get_many(self, ids):
+        latest = {i.id: i for i in self.saved}
+        return [latest[id] for id in ids if id in latest]
+
+    async def save_many(self, objs):
+        self.saved.extend(objs)
+
+
+class FakeOutbox:
+    def __init__(self):
+        self.events = []
+
+    async def add(self, event):
+        self.events.append(event)
+
+
+class FakeUnitOfWork:
+    def __init__(self, repo=None):
+        self.items = repo or FakeRepo()
+        self.outbox = FakeOutbox()
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
 
 class FakeBus:
     def __init__(self):
@@ -25,6 +63,10 @@ class FakeBus:
     async def send(self, event):
         self.events.append(event)
 
+    async def send_many(self, events):
+        self.events.extend(events)
+        return []
+
     async def receive(self):
         return {}
 
@@ -46,12 +88,96 @@ class FakeApi:
 @pytest.mark.asyncio
 async def test_process_event_success():
     repo = FakeRepo()
+    uow = FakeUnitOfWork(repo)
     bus = FakeBus()
     api = FakeApi()
-    use_case = ProcessEvent(repo, bus, api)
+    use_case = ProcessEvent(uow, bus, api)
     dto = ProcessEventInput(payload={"id": "123", "name": "TestItem"})
     out = await use_case.execute(dto)
     assert out.success is True
     assert out.item_id == "123"
     assert any(e["type"] == "ItemToProcess" for e in bus.events)
     assert any(i.status == Status("initialized") for i in repo.saved)
+    assert uow.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_process_event_with_outbox_skips_direct_publish():
+    uow = FakeUnitOfWork()
+    bus = FakeBus()
+    use_case = ProcessEvent(uow, bus, FakeApi(), use_outbox=True)
+    out = await use_case.execute(ProcessEventInput(payload={"id": "9", "name": "X"}))
+    assert out.success is True
+    assert bus.events == []
+    [event] = uow.outbox.events
+    assert event["type"] == "ItemToProcess"
+    assert event["item_id"] == "9"
+    assert event["event_id"]
+    assert uow.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_process_event_batch_isolates_api_failures():
+    class FlakyApi(FakeApi):
+        async def post(self, path, data):
+            if data["item_id"] == "bad":
+                raise RuntimeError("timeout")
+            return {"ok": True}
+
+    repo = FakeRepo()
+    uow = FakeUnitOfWork(repo)
+    bus = FakeBus()
+    use_case = ProcessEvent(uow, bus, FlakyApi())
+    outputs = await use_case.execute_many(
+        [ProcessEventInput(payload={"id": id, "name": "X"}) for id in ("1", "bad", "2")]
+    )
+    assert [o.success for o in outputs] == [True, False, True]
+    assert [i.id for i in repo.saved] == ["1", "2"]
+    assert all(i.status == Status("initialized") for i in repo.saved)
+    assert [e["item_id"] for e in bus.events] == ["1", "2"]
+    assert uow.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_process_event_forwards_producer_timestamp():
+    bus = FakeBus()
+    use_case = ProcessEvent(FakeUnitOfWork(), bus, FakeApi())
+    await use_case.execute(ProcessEventInput(payload={"id": "1", "produced_at": 10.5}))
+    await use_case.execute_many(
+        [
+            ProcessEventInput(payload={"id": "2", "produced_at": 11.0}),
+            ProcessEventInput(payload={"id": "3"}),
+            ProcessEventInput(payload={"id": "4", "produced_at": "yesterday"}),
+            ProcessEventInput(payload={"id": "5", "produced_at": float("inf")}),
+            ProcessEventInput(payload={"id": "6", "produced_at": True}),
+        ]
+    )
+    # Valor vindo do cliente: só número finito entra no evento.
+    assert [e.get("produced_at") for e in bus.events] == [10.5, 11.0, None, None, None, None]
+
+
+@pytest.mark.asyncio
+async def test_process_item_from_queue_batch():
+    repo = FakeRepo()
+    await repo.save_many(
+        [
+            Item(id="1", name="A", status=Status("initialized")),
+            Item(id="2", name="B", status=Status("initialized")),
+        ]
+    )
+    uow = FakeUnitOfWork(repo)
+    use_case = ProcessItemFromQueue(uow)
+    outputs = await use_case.execute_many(["1", "missing", "2"])
+    assert [o.item_id for o in outputs] == ["1", "missing", "2"]
+    assert [o.success for o in outputs] == [True, False, True]
+    latest = {i.id: i for i in repo.saved}
+    assert latest["1"].status == Status("processed")
+    assert latest["2"].status == Status("processed")
+    assert uow.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_process_item_from_queue_missing_item():
+    use_case = ProcessItemFromQueue(FakeUnitOfWork())
+    with pytest.raises(ValueError):
+        await use_case.execute("missing")